@@ -0,0 +1,67 @@
+"""
+提取逻辑微基准
+用FakeDriver加载模拟结果页，不启动浏览器，测量各爬虫提取逻辑每秒能处理的页面数
+
+用法：
+    python benchmarks/bench_extraction.py --pages 500 --rows 20
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from cnki_fixtures import FixtureData, render_results  # noqa: E402
+
+from office_auto.cnki_crawler import CNKICrawler  # noqa: E402
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved  # noqa: E402
+from office_auto.fake_driver import FakeDriver  # noqa: E402
+
+
+def bench(crawler_class, html: str, pages: int) -> dict:
+    """重复提取同一页面并统计吞吐量"""
+    driver = FakeDriver(html=html, url="https://kns.cnki.net/kns8s/search")
+    crawler = crawler_class(driver=driver)
+    rows = 0
+    start = time.perf_counter()
+    # 提取过程中的调试输出不计入结果
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(pages):
+            rows += len(crawler._extract_papers_from_page())
+    elapsed = time.perf_counter() - start
+    return {
+        "pages_per_sec": pages / elapsed,
+        "rows_per_sec": rows / elapsed,
+        "rows_per_page": rows / pages,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="提取逻辑微基准")
+    parser.add_argument("--pages", type=int, default=200, help="提取次数")
+    parser.add_argument("--rows", type=int, default=20, help="每页结果数")
+    args = parser.parse_args(argv)
+
+    data = FixtureData(rows_per_author=args.rows, rows_per_page=args.rows)
+    html = render_results(data, "作者:基准作者", 1)
+
+    for name, crawler_class in (
+        ("classic", CNKICrawler),
+        ("improved", CNKICrawlerImproved),
+    ):
+        result = bench(crawler_class, html, args.pages)
+        print(
+            f"{name}: {result['pages_per_sec']:.1f} 页/秒, "
+            f"{result['rows_per_sec']:.0f} 行/秒（每页 {result['rows_per_page']:.0f} 行）"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+知网页面本地模拟服务
+按知网结果页、分页栏和详情页的结构生成HTML，用于离线基准测试
+"""
+
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+RESULT_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>检索-中国知网</title></head>
+<body>
+<div class="search-result">
+<div class="pagerTitleCell">共找到&nbsp;<em>{total}</em>&nbsp;条结果</div>
+<table class="result-table-list">
+<tr><th>题名</th><th>作者</th><th>来源</th><th>发表时间</th><th>被引</th><th>下载</th></tr>
+{rows}
+</table>
+<div class="pages">{pager}</div>
+</div>
+</body></html>
+"""
+
+RESULT_ROW = """<tr>
+<td class="name"><a class="fz14" href="/kcms/detail?id={paper_id}">{title}</a></td>
+<td class="author">{authors}</td>
+<td class="source"><a href="/knavi/journals/{journal_code}/detail">{journal}</a></td>
+<td class="date">{date}</td>
+<td class="quote"><span class="cite">被引:{citations}</span></td>
+<td class="download"><span class="download">下载:{downloads}</span></td>
+</tr>"""
+
+DETAIL_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} - 中国知网</title></head>
+<body>
+<div class="wx-tit"><h1>{title}</h1></div>
+<div class="row"><span class="rowtit">摘要：</span><span id="ChDivSummary">{abstract}</span></div>
+<p class="keywords">{keywords}</p>
+<div class="top-space"><span class="rowtit">DOI：</span><p>{doi}</p></div>
+<p class="funds">{fund}</p>
+</body></html>
+"""
+
+HOME_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>中国知网</title></head>
+<body>
+<form action="/kns8s/search" method="get" class="search-input">
+<input name="kw" placeholder="请输入检索词">
+</form>
+</body></html>
+"""
+
+ADV_SEARCH_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>高级检索-中国知网</title></head>
+<body>
+<form action="/kns8s/search" method="get">
+<div class="input-box">
+<select name="txt_1_sel"><option value="SU">主题</option><option value="AU">作者</option></select>
+<input name="txt_1_value1">
+<a onclick='addLine()'>+</a>
+<select name="txt_2_sel"><option value="SU">主题</option><option value="AF">作者单位</option></select>
+<input name="txt_2_value1">
+</div>
+<input type="submit" value="检索">
+</form>
+</body></html>
+"""
+
+
+def parse_query(kw: str) -> List[Dict]:
+    """
+    解析检索式中的作者和单位
+
+    支持 "作者:A AND 单位:B" 以及 "作者:A OR 作者:B"
+    """
+    authors = []
+    institution = ""
+    for clause in kw.replace(" OR ", " AND ").split(" AND "):
+        field, _, value = clause.strip().strip("()").partition(":")
+        if field == "作者":
+            authors.append(value.strip())
+        elif field == "单位":
+            institution = value.strip()
+    return [{"name": name, "institution": institution} for name in authors]
+
+
+class FixtureData:
+    """按作者确定性地生成论文数据"""
+
+    def __init__(self, rows_per_author: int = 60, rows_per_page: int = 20):
+        self.rows_per_author = rows_per_author
+        self.rows_per_page = rows_per_page
+
+    def papers_for(self, author_info: Dict) -> List[Dict]:
+        name = author_info["name"]
+        papers = []
+        for n in range(self.rows_per_author):
+            year = 2024 - n // 12
+            month = 12 - n % 12
+            papers.append(
+                {
+                    "id": f"{quote(name)}-{n}",
+                    "title": f"{name}关于离线基准测试的研究（第{n + 1}篇）",
+                    "authors": [name, f"合作者{n % 7}", f"合作者{n % 5 + 10}"],
+                    "journal": f"测试学报{n % 4}",
+                    "journal_code": f"CSXB{n % 4}",
+                    "date": f"{year}-{month:02d}-{(n % 27) + 1:02d}",
+                    "citations": (n * 7) % 50,
+                    "downloads": (n * 37) % 900 + 10,
+                }
+            )
+        return papers
+
+    def paper_by_id(self, paper_id: str) -> Optional[Dict]:
+        name, _, n = paper_id.rpartition("-")
+        if not n.isdigit():
+            return None
+        n = int(n)
+        if n >= self.rows_per_author:
+            return None
+        return self.papers_for({"name": unquote(name)})[n]
+
+
+def render_results(data: FixtureData, kw: str, page: int) -> str:
+    """生成结果页HTML"""
+    papers = []
+    for author_info in parse_query(kw):
+        papers.extend(data.papers_for(author_info))
+
+    per_page = data.rows_per_page
+    page_count = max(1, -(-len(papers) // per_page))
+    page = min(max(1, page), page_count)
+    rows = []
+    for paper in papers[(page - 1) * per_page : page * per_page]:
+        authors = "; ".join(
+            f'<a class="KnowledgeNetLink" href="/kcms/author?name={quote(a)}">{escape(a)}</a>'
+            for a in paper["authors"]
+        )
+        rows.append(
+            RESULT_ROW.format(
+                paper_id=paper["id"],
+                title=escape(paper["title"]),
+                authors=authors,
+                journal=escape(paper["journal"]),
+                journal_code=paper["journal_code"],
+                date=paper["date"],
+                citations=paper["citations"],
+                downloads=paper["downloads"],
+            )
+        )
+
+    pager = []
+    for n in range(1, page_count + 1):
+        if n == page:
+            pager.append(f'<span class="cur current-page">{n}</span>')
+        else:
+            pager.append(f'<a href="/kns8s/search?kw={quote(kw)}&page={n}">{n}</a>')
+    if page < page_count:
+        pager.append(
+            f'<a id="PageNext" title="下页" href="/kns8s/search?kw={quote(kw)}&page={page + 1}">下页</a>'
+        )
+
+    return RESULT_PAGE.format(
+        total=len(papers), rows="\n".join(rows), pager=" ".join(pager)
+    )
+
+
+def render_detail(paper: Dict) -> str:
+    """生成详情页HTML"""
+    return DETAIL_PAGE.format(
+        title=escape(paper["title"]),
+        abstract=escape(f"本文是{paper['authors'][0]}的基准测试样例摘要。" * 5),
+        keywords="".join(f"<a>关键词{i};</a>" for i in range(4)),
+        doi=f"10.12345/csxb.{paper['id']}",
+        fund="<a>国家自然科学基金(12345678);</a>",
+    )
+
+
+class FixtureServer:
+    """在后台线程中运行的知网模拟服务"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rows_per_author: int = 60,
+        rows_per_page: int = 20,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        初始化模拟服务
+
+        Args:
+            latency: 每个请求的额外延迟（秒）
+            rows_per_author: 每个作者的论文数
+            rows_per_page: 每页结果数
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+        """
+        self.latency = latency
+        self.data = FixtureData(rows_per_author, rows_per_page)
+        # (请求时间, 路径) 记录，用于统计页面间隔
+        self.requests: List = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def result_page_times(self) -> List[float]:
+        """结果页请求时间"""
+        with self._lock:
+            return [t for t, path in self.requests if path.startswith("/kns8s/search")]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+
+                parts = urlsplit(self.path)
+                params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                with server._lock:
+                    server.requests.append((time.perf_counter(), parts.path))
+
+                if parts.path == "/kns8s/search":
+                    kw = params.get("kw", "")
+                    if not kw and params.get("txt_1_value1"):
+                        kw = f"作者:{params['txt_1_value1']}"
+                        if params.get("txt_2_value1"):
+                            kw += f" AND 单位:{params['txt_2_value1']}"
+                    body = render_results(server.data, kw, int(params.get("page", 1)))
+                elif parts.path == "/kcms/detail":
+                    paper = server.data.paper_by_id(params.get("id", ""))
+                    if paper is None:
+                        self.send_error(404)
+                        return
+                    body = render_detail(paper)
+                elif parts.path == "/kns8/AdvSearch":
+                    body = ADV_SEARCH_PAGE
+                elif parts.path in ("/", "/kns8s/"):
+                    body = HOME_PAGE
+                else:
+                    self.send_error(404)
+                    return
+
+                encoded = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,315 @@
+"""
+离线基准测试
+在本地知网模拟服务上以无头模式运行各爬虫后端，统计吞吐量、结果页就绪时间和内存峰值
+
+改进版爬虫的搜索/翻页等待时间设为0，结果页就绪时间（ready_search、ready_page）
+是从发起搜索或点击下一页到结果行出现的时间，不包含礼貌等待；
+fake 后端用FakeDriver通过HTTP访问模拟服务，不需要Chrome
+
+用法：
+    python benchmarks/run_benchmarks.py --authors 3 --pages 3 --latency 0.05
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/旧版本.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from cnki_fixtures import FixtureServer  # noqa: E402
+
+from office_auto.cnki_crawler import CNKICrawler  # noqa: E402
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved  # noqa: E402
+from office_auto.delay_tuner import PHASE_PAGE, PHASE_SEARCH, DelayTuner  # noqa: E402
+from office_auto.fake_driver import FakeDriver  # noqa: E402
+from office_auto.metrics import Metrics  # noqa: E402
+from office_auto.process_stats import process_tree_rss_mb  # noqa: E402
+from office_auto.tabs import MultiTabCrawler  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# 就绪时间指标（改进版爬虫和多标签页模式记录）
+READY_TIMINGS = tuple(f"ready_{phase}" for phase in (PHASE_SEARCH, PHASE_PAGE))
+
+# 等待结果行出现时的轮询间隔（秒），决定就绪时间的精度
+READY_POLL = 0.02
+
+
+class PeakRssSampler:
+    """后台采样当前进程及子进程（chromedriver、Chrome）的内存峰值"""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_tree_rss_mb(os.getpid())
+            if rss is not None:
+                self.peak_mb = max(self.peak_mb, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+
+def _point_at(crawler, base_url: str):
+    """让爬虫访问本地模拟服务"""
+    crawler.base_url = base_url
+    crawler.search_url = (
+        f"{base_url}/kns8/AdvSearch"
+        if isinstance(crawler, CNKICrawler)
+        else f"{base_url}/kns8s/"
+    )
+
+
+def run_sequential(crawler, authors: List[Dict], max_pages: int) -> List[List[Dict]]:
+    """逐个作者搜索"""
+    return [
+        crawler.search_papers(a["name"], a["institution"], max_pages=max_pages)
+        for a in authors
+    ]
+
+
+def run_tabs(crawler, authors: List[Dict], max_pages: int, tabs: int = 3):
+    """多标签页并发搜索"""
+    multi_tab = MultiTabCrawler(
+        crawler, tabs=tabs, poll_interval=READY_POLL, page_delay=0
+    )
+    results = [
+        papers
+        for _, _, papers, _ in multi_tab.search_many(
+            enumerate(authors), max_pages=max_pages
+        )
+    ]
+    multi_tab.close_tabs()
+    return results
+
+
+def classic_crawler(metrics: Metrics):
+    return CNKICrawler(headless=True)
+
+
+def improved_crawler(metrics: Metrics):
+    """等待时间为0、快速轮询的改进版爬虫，就绪时间即结果行实际出现的时间"""
+    delays = DelayTuner(
+        initial={PHASE_SEARCH: 0, PHASE_PAGE: 0},
+        bounds={PHASE_SEARCH: (0, 0), PHASE_PAGE: (0, 0)},
+    )
+    crawler = CNKICrawlerImproved(headless=True, metrics=metrics, delays=delays)
+    crawler.wait = WebDriverWait(
+        crawler.driver, crawler.wait_time, poll_frequency=READY_POLL
+    )
+    return crawler
+
+
+def fake_crawler(metrics: Metrics):
+    """FakeDriver通过HTTP读取模拟服务，页面取回即就绪，记录每次请求的耗时"""
+
+    def fetch(url: str) -> str:
+        start = time.perf_counter()
+        with urllib.request.urlopen(quote(url, safe=":/?&=%")) as response:
+            html = response.read().decode("utf-8")
+        phase = PHASE_SEARCH if "crossref=" in url else PHASE_PAGE
+        metrics.observe(f"ready_{phase}", time.perf_counter() - start)
+        return html
+
+    return CNKICrawlerImproved(driver=FakeDriver(loader=fetch), metrics=metrics)
+
+
+# 后端名称 -> (创建爬虫, 运行方式)
+BACKENDS: Dict[str, tuple] = {
+    "classic": (classic_crawler, run_sequential),
+    "improved": (improved_crawler, run_sequential),
+    "tabs": (improved_crawler, run_tabs),
+    "fake": (fake_crawler, run_sequential),
+}
+
+
+def readiness(metrics: Metrics) -> Dict[str, Optional[float]]:
+    """各阶段就绪时间的p50/p95，没有记录的阶段（classic后端）为None"""
+    timings = metrics.summary()["timings"]
+    result = {}
+    for name in READY_TIMINGS:
+        stats = timings.get(name)
+        result[f"{name}_p50"] = stats["p50"] if stats else None
+        result[f"{name}_p95"] = stats["p95"] if stats else None
+    return result
+
+
+def bench_backend(
+    name: str,
+    factory: Callable,
+    runner: Callable,
+    authors: List[Dict],
+    max_pages: int,
+    latency: float,
+    rows_per_page: int,
+) -> Dict:
+    """运行一个后端并统计指标"""
+    metrics = Metrics()
+    with FixtureServer(
+        latency=latency,
+        rows_per_author=max_pages * rows_per_page,
+        rows_per_page=rows_per_page,
+    ) as server:
+        with PeakRssSampler() as sampler:
+            startup_start = time.perf_counter()
+            crawler = factory(metrics)
+            startup = time.perf_counter() - startup_start
+            try:
+                _point_at(crawler, server.base_url)
+                start = time.perf_counter()
+                results = runner(crawler, authors, max_pages)
+                elapsed = time.perf_counter() - start
+            finally:
+                crawler.close()
+
+        pages = sum(1 for t in server.result_page_times() if t >= start)
+
+    rows = sum(len(papers) for papers in results)
+    return {
+        "backend": name,
+        "driver_startup_seconds": startup,
+        "elapsed_seconds": elapsed,
+        "pages": pages,
+        "rows": rows,
+        "pages_per_sec": pages / elapsed if elapsed else 0.0,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        **readiness(metrics),
+        "peak_rss_mb": sampler.peak_mb,
+    }
+
+
+def _seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.3f}s"
+
+
+def git_revision() -> str:
+    """当前提交的短哈希"""
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=BENCH_DIR,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: Dict, baseline_path: str):
+    """与之前的结果比较并打印变化"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\n对比 {baseline.get('revision')} -> {current['revision']}")
+    keys = ["pages_per_sec", "rows_per_sec"]
+    keys += [f"{name}_{q}" for name in READY_TIMINGS for q in ("p50", "p95")]
+    keys.append("peak_rss_mb")
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old or "error" in result:
+            continue
+        print(f"[{name}]")
+        for key in keys:
+            if old.get(key) and result.get(key) is not None:
+                change = (result[key] - old[key]) / old[key] * 100
+                print(f"  {key}: {old[key]:.3f} -> {result[key]:.3f} ({change:+.1f}%)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="知网爬虫离线基准测试")
+    parser.add_argument(
+        "--backends",
+        default=",".join(BACKENDS),
+        help=f"要测试的后端，逗号分隔（可选：{', '.join(BACKENDS)}）",
+    )
+    parser.add_argument("--authors", type=int, default=3, help="作者数量")
+    parser.add_argument("--pages", type=int, default=3, help="每个作者的页数")
+    parser.add_argument("--rows", type=int, default=20, help="每页结果数")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="每个请求的延迟（秒）"
+    )
+    parser.add_argument(
+        "--output", help="结果JSON路径（默认 benchmarks/results/<提交>.json）"
+    )
+    parser.add_argument("--compare", metavar="JSON", help="与之前的结果JSON比较")
+    args = parser.parse_args(argv)
+
+    authors = [
+        {"name": f"基准作者{i}", "institution": "测试大学"} for i in range(args.authors)
+    ]
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": {
+            "authors": args.authors,
+            "pages": args.pages,
+            "rows_per_page": args.rows,
+            "latency": args.latency,
+        },
+        "results": {},
+    }
+
+    for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        if name not in BACKENDS:
+            print(f"未知后端: {name}")
+            return 2
+        factory, runner = BACKENDS[name]
+        print(f"▶ 正在测试 {name} ...")
+        try:
+            result = bench_backend(
+                name, factory, runner, authors, args.pages, args.latency, args.rows
+            )
+        except Exception as e:
+            # 例如没有安装Chrome，其它后端照常测试
+            message = str(e).strip() or repr(e)
+            print(f"  ❌ 无法运行：{message.splitlines()[0]}")
+            report["results"][name] = {"backend": name, "error": str(e)}
+            continue
+        report["results"][name] = result
+        print(
+            f"  {result['pages_per_sec']:.2f} 页/秒, {result['rows_per_sec']:.1f} 行/秒, "
+            f"搜索就绪 p50 {_seconds(result['ready_search_p50'])} "
+            f"p95 {_seconds(result['ready_search_p95'])}, "
+            f"翻页就绪 p50 {_seconds(result['ready_page_p50'])} "
+            f"p95 {_seconds(result['ready_page_p95'])}, "
+            f"峰值内存 {result['peak_rss_mb']:.0f} MB"
+        )
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存至 {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
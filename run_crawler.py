@@ -1,6 +1,8 @@
 """
 知网爬虫快速启动脚本
 运行此脚本可以快速开始爬取论文
+带参数运行时等同于命令行工具，例如：
+    python run_crawler.py crawl --input authors.csv
 """
 
 import sys
@@ -13,6 +15,7 @@ sys.path.insert(0, src_dir)
 
 # 必须在路径设置后导入
 try:
+    from office_auto.cli import main as cli_main
     from office_auto.example import main
 except ImportError as e:
     print(f"导入错误: {e}")
@@ -21,6 +24,9 @@ except ImportError as e:
     sys.exit(1)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli_main())
+
     try:
         main()
     except KeyboardInterrupt:
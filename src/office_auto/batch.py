@@ -0,0 +1,1064 @@
+"""
+批量爬取模块
+按作者列表并发爬取论文，支持断点续跑、搜索结果缓存和拦截冷却；
+可选流水线模式，浏览器线程只负责取页面，解析、整理和写出在其它线程中进行
+"""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .cnki_crawler import CNKICrawler
+from .cnki_crawler_improved import (
+    STATUS_EMPTY,
+    STATUS_ERROR,
+    STATUS_PARTIAL,
+    CNKICrawlerImproved,
+)
+from .batch_input import author_key
+from .browser_profiles import ProfilePool
+from .config import CRAWLER_CONFIG, FROM_CONFIG
+from .deadline import Deadline
+from .delay_tuner import DelayTuner
+from .dedup import DedupIndex, paper_fingerprint, unique_papers
+from .fake_driver import FakeDriver
+from .metrics import Metrics
+from .page_archive import PageRecorder
+from .page_classifier import BLOCKING_STATUSES, PAGE_OK
+from .pipeline import Pipeline, Stage
+from .prewarm import Prewarmer
+from .profiling import Profiler
+from .query_batch import build_or_query, demultiplex, plan_groups
+from .sinks import BackgroundSink, OutputSink
+from .tabs import MultiTabCrawler
+from .work_queue import (
+    TASK_LEASED,
+    TASK_PENDING,
+    LeaseKeeper,
+    WorkQueue,
+    default_worker_id,
+)
+
+# 批量处理状态
+STATUS_SUCCESS = "成功"
+STATUS_NO_RESULT = "无结果"
+STATUS_BLOCKED = "被拦截"
+STATUS_INCOMPLETE = "部分"
+STATUS_FAILED = "错误"
+STATUS_SKIPPED = "未处理"
+STATUS_WRITE_FAILED = "写出失败"
+
+# 续跑时视为已完成的状态
+FINISHED_STATUSES = (STATUS_SUCCESS, STATUS_NO_RESULT)
+
+BACKENDS = ("improved", "classic")
+
+
+def create_crawler(
+    backend: str = "improved",
+    headless: Optional[bool] = None,
+    metrics: Optional[Metrics] = None,
+    recorder: Optional[PageRecorder] = None,
+    profile_pool: Optional[ProfilePool] = None,
+    delays: Optional[DelayTuner] = None,
+):
+    """按后端名称创建爬虫"""
+    if backend == "classic":
+        return CNKICrawler(headless=headless)
+    if backend == "improved":
+        return CNKICrawlerImproved(
+            headless=headless,
+            metrics=metrics,
+            recorder=recorder,
+            profile_pool=profile_pool,
+            delays=delays,
+        )
+    raise ValueError(f"未知的爬虫后端: {backend}")
+
+
+class SearchCache:
+    """按（作者, 单位, 页数）缓存搜索结果，命中时无需启动浏览器"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, author_info: Dict, max_pages: int) -> str:
+        key = f"{author_key(author_info)}\t{max_pages}".encode("utf-8")
+        return os.path.join(self.cache_dir, hashlib.sha1(key).hexdigest() + ".json")
+
+    def get(self, author_info: Dict, max_pages: int) -> Optional[List[Dict]]:
+        """读取缓存，未命中返回None"""
+        try:
+            with open(self._path(author_info, max_pages), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, author_info: Dict, max_pages: int, papers: List[Dict]):
+        """写入缓存"""
+        path = self._path(author_info, max_pages)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(papers, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class BatchJournal:
+    """记录每个作者的处理结果，用于断点续跑"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def finished_keys(self) -> set:
+        """已完成的作者标识"""
+        keys = set()
+        if not os.path.exists(self.path):
+            return keys
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                # 以最后一条记录为准，例如后台写出失败会追加一条失败记录
+                if entry.get("status") in FINISHED_STATUSES:
+                    keys.add(entry["key"])
+                else:
+                    keys.discard(entry["key"])
+        return keys
+
+    def record(self, author_info: Dict, result: Dict):
+        """追加一条处理结果"""
+        entry = {"key": author_key(author_info), **result}
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class _Cooldown:
+    """被拦截后所有工作线程共享的冷却期"""
+
+    def __init__(self):
+        self._until = 0.0
+        self._lock = threading.Lock()
+
+    def trigger(self, seconds: float):
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + seconds)
+
+    def wait(self, deadline: Deadline):
+        remaining = self._until - time.monotonic()
+        if remaining > 0:
+            deadline.sleep(remaining)
+
+
+def run_batch(
+    authors: List[Dict],
+    sink: OutputSink,
+    max_pages: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    backend: str = "improved",
+    headless: Optional[bool] = None,
+    journal_path: Optional[str] = None,
+    resume: bool = False,
+    cache_dir: Optional[str] = FROM_CONFIG,
+    author_budget: Optional[float] = FROM_CONFIG,
+    run_budget: Optional[float] = FROM_CONFIG,
+    tabs: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
+    profile: Optional[str] = None,
+    profile_dir: str = FROM_CONFIG,
+    record_path: Optional[str] = None,
+    dedup: bool = False,
+    dedup_path: Optional[str] = None,
+    incremental: bool = False,
+    refresh_days: Optional[int] = None,
+    parse_workers: int = 0,
+    queue_size: Optional[int] = None,
+    background_write: bool = False,
+    or_batch: int = 1,
+    work_queue: Optional[WorkQueue] = None,
+    worker_id: Optional[str] = None,
+    lease_seconds: Optional[float] = None,
+    browser_profiles: Optional[str] = None,
+    warm_spare: bool = False,
+    delay_state: Optional[str] = None,
+) -> List[Dict]:
+    """
+    批量爬取作者论文
+
+    未指定的页数、无头模式、并发、时间预算、缓存、队列容量、租约期限和剖析结果目录
+    取当前配置（CRAWLER_CONFIG）
+
+    Args:
+        authors: 作者列表，每项包含 name 和 institution
+        sink: 输出对象
+        max_pages: 每个作者的最大搜索页数
+        concurrency: 并发浏览器数量
+        backend: 爬虫后端（improved / classic）
+        headless: 是否使用无头模式
+        journal_path: 处理记录文件路径
+        resume: 是否跳过处理记录中已完成的作者
+        cache_dir: 搜索结果缓存目录，None表示不缓存
+        author_budget: 单个作者的时间预算（秒），None表示不限
+        run_budget: 整个批次的时间预算（秒），None表示不限
+        tabs: 每个浏览器中的标签页数量，大于1时每个标签页执行一个作者的搜索
+        metrics: 运行指标收集器，所有爬虫共用
+        profile: 剖析模式（cpu / memory / sample，可用逗号组合），覆盖所有工作线程
+        profile_dir: 剖析结果目录，默认为配置 output_dir 下的 profile 目录
+        record_path: 页面录制归档路径（.jsonl.gz），可用 replay 离线回放
+        dedup: 是否跨作者去重，重复的论文只输出一次
+        dedup_path: 去重索引的SQLite路径，指定时自动开启去重并跨运行保留
+        incremental: 增量模式，按发表时间排序，遇到去重索引中该作者已有的旧论文即停止翻页；
+            需要 dedup_path 和合并写入的输出（sink.merges，即论文库），不使用搜索结果缓存
+        refresh_days: 增量模式下仍重新获取被引/下载次数的时间窗口（天）
+        parse_workers: 大于0时开启流水线模式：浏览器线程只取结果页HTML，
+            由这么多个线程解析，再经整理、写出阶段输出
+        queue_size: 流水线各阶段的队列容量，队列满时上游等待
+        background_write: 在后台线程中写出结果，浏览器不等待保存即处理下一个作者；
+            写出失败的作者状态改为“写出失败”
+        or_batch: 大于1时把同一单位的最多这么多个作者合并为一个 "作者:A OR 作者:B" 检索，
+            按作者字段分回结果；结果超过 max_pages 页或搜索不完整时改为逐个检索
+        work_queue: 分布式任务队列，指定时 authors 先加入队列（已有的忽略），
+            再从队列领取作者处理，多个进程可共享同一个队列；返回本进程处理的作者
+        worker_id: 在队列中标识本进程，默认 主机名:进程号
+        lease_seconds: 作者租约的期限（秒），处理期间后台线程定期续租
+        browser_profiles: 持久浏览器配置目录池所在目录，每个浏览器独占其中一个目录，
+            Cookie和缓存在多次运行之间保留
+        warm_spare: 在后台保持一个已启动的备用浏览器，工作线程启动或浏览器达到重启阈值时
+            直接换用备用浏览器，不必等待Chrome冷启动
+        delay_state: 指定时开启自适应等待时间并保存到该JSON文件，所有爬虫共用一组等待时间，
+            运行结束后写回，下次运行从调整后的值开始；不指定时使用固定的等待时间
+
+    Returns:
+        每个作者的处理结果
+    """
+    if max_pages is None:
+        max_pages = CRAWLER_CONFIG["max_pages"]
+    if headless is None:
+        headless = CRAWLER_CONFIG["headless"]
+    if concurrency is None:
+        concurrency = CRAWLER_CONFIG["concurrency"]
+    if tabs is None:
+        tabs = CRAWLER_CONFIG["tabs"]
+    if cache_dir is FROM_CONFIG:
+        cache_dir = CRAWLER_CONFIG["cache_dir"]
+    if author_budget is FROM_CONFIG:
+        author_budget = CRAWLER_CONFIG["author_budget"]
+    if run_budget is FROM_CONFIG:
+        run_budget = CRAWLER_CONFIG["run_budget"]
+    if refresh_days is None:
+        refresh_days = CRAWLER_CONFIG["refresh_days"]
+    if queue_size is None:
+        queue_size = CRAWLER_CONFIG["pipeline_queue_size"]
+    if lease_seconds is None:
+        lease_seconds = CRAWLER_CONFIG["lease_seconds"]
+    if tabs > 1 and backend != "improved":
+        raise ValueError("多标签页模式只支持 improved 后端")
+    if record_path and (tabs > 1 or backend != "improved"):
+        raise ValueError("页面录制只支持 improved 后端的单标签页模式")
+    if incremental and not dedup_path:
+        raise ValueError("增量模式需要指定去重索引路径（dedup_path）")
+    if incremental and not sink.merges:
+        # 按作者的Excel/CSV会被本次的新论文替换，丢失之前的结果
+        raise ValueError("增量模式只输出新论文，需要写入论文库（.db）")
+    if incremental and (tabs > 1 or backend != "improved"):
+        raise ValueError("增量模式只支持 improved 后端的单标签页模式")
+    if incremental and record_path:
+        # 回放时没有上次运行的论文，无法重现提前停止
+        raise ValueError("增量模式不能与页面录制同时使用")
+    if parse_workers > 0 and (tabs > 1 or backend != "improved" or incremental):
+        raise ValueError("流水线模式只支持 improved 后端的单标签页、非增量模式")
+    if warm_spare and backend != "improved":
+        raise ValueError("备用浏览器只支持 improved 后端")
+    if delay_state and backend != "improved":
+        raise ValueError("自适应等待时间只支持 improved 后端")
+    if browser_profiles and backend != "improved":
+        raise ValueError("持久浏览器配置目录只支持 improved 后端")
+    if or_batch > 1 and (
+        tabs > 1
+        or backend != "improved"
+        or incremental
+        or record_path
+        or parse_workers > 0
+    ):
+        raise ValueError(
+            "合并检索只支持 improved 后端的单标签页模式，不能与增量、录制或流水线模式同时使用"
+        )
+
+    batch = _BatchRun(
+        sink,
+        metrics if metrics is not None else Metrics(),
+        max_pages=max_pages,
+        concurrency=concurrency,
+        backend=backend,
+        headless=headless,
+        journal=BatchJournal(journal_path) if journal_path else None,
+        # 增量结果只是上次运行之后的部分，不能作为完整结果缓存
+        cache=SearchCache(cache_dir) if cache_dir and not incremental else None,
+        dedup_index=DedupIndex(dedup_path) if dedup or dedup_path else None,
+        author_budget=author_budget,
+        run_deadline=Deadline(run_budget),
+        tabs=tabs,
+        profiler=Profiler(profile, profile_dir, "batch"),
+        recorder=PageRecorder(record_path) if record_path else None,
+        incremental=incremental,
+        refresh_days=refresh_days,
+        parse_workers=parse_workers,
+        queue_size=queue_size,
+        background_write=background_write,
+        or_batch=or_batch,
+        work_queue=work_queue,
+        worker_id=worker_id,
+        lease_seconds=lease_seconds,
+        profile_pool=ProfilePool(browser_profiles) if browser_profiles else None,
+        warm_spare=warm_spare,
+        # 自适应等待时间需要显式开启，否则各爬虫使用固定的等待时间
+        delays=DelayTuner(delay_state) if delay_state else None,
+    )
+    return batch.run(authors, resume)
+
+
+class _BatchRun:
+    """
+    一次批量爬取的共享状态
+
+    负责领取作者、输出和记录结果；工作线程（_Worker 或多标签页）和流水线各阶段
+    都通过它完成作者。参数含义见 run_batch()
+    """
+
+    def __init__(
+        self,
+        sink: OutputSink,
+        metrics: Metrics,
+        *,
+        max_pages: int,
+        concurrency: int,
+        backend: str,
+        headless: bool,
+        journal: Optional[BatchJournal],
+        cache: Optional[SearchCache],
+        dedup_index: Optional[DedupIndex],
+        author_budget: Optional[float],
+        run_deadline: Deadline,
+        tabs: int,
+        profiler: Profiler,
+        recorder: Optional[PageRecorder],
+        incremental: bool,
+        refresh_days: int,
+        parse_workers: int,
+        queue_size: int,
+        background_write: bool,
+        or_batch: int,
+        work_queue: Optional[WorkQueue],
+        worker_id: Optional[str],
+        lease_seconds: float,
+        profile_pool: Optional[ProfilePool],
+        warm_spare: bool,
+        delays: Optional[DelayTuner],
+    ):
+        self.metrics = metrics
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.backend = backend
+        self.headless = headless
+        self.journal = journal
+        self.cache = cache
+        self.dedup_index = dedup_index
+        self.author_budget = author_budget
+        self.run_deadline = run_deadline
+        self.tabs = tabs
+        self.profiler = profiler
+        self.recorder = recorder
+        self.incremental = incremental
+        self.refresh_days = refresh_days
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        self.or_batch = or_batch
+        self.work_queue = work_queue
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.profile_pool = profile_pool
+        self.warm_spare = warm_spare
+        self.delays = delays
+
+        self.writer = None
+        if background_write:
+            self.writer = BackgroundSink(
+                sink,
+                close_inner=False,
+                on_write=lambda seconds: metrics.observe("save_background", seconds),
+            )
+            sink = self.writer
+        self.sink = sink
+        self.sink_lock = threading.Lock()
+
+        self.pending: "queue.Queue" = queue.Queue()
+        self.keeper: Optional[LeaseKeeper] = None
+        self.leases: Dict = {}
+        self.total = 0
+        self.results: List = []
+        self.results_lock = threading.Lock()
+        self.cooldown = _Cooldown()
+        self.spare: Optional[Prewarmer] = None
+        self.pipeline: Optional[Pipeline] = None
+        # 流水线解析阶段每个线程一个离线爬虫
+        self._parsers = threading.local()
+        # 整理阶段只有一个线程，按作者序号收集已解析的页面
+        self._assembling: Dict[int, Dict] = {}
+
+    def run(self, authors: List[Dict], resume: bool) -> List[Dict]:
+        """处理全部作者，返回按序号排列的结果"""
+        try:
+            remaining = self._enqueue(authors, resume)
+            if self.warm_spare and remaining:
+                # 工作线程启动前就开始在后台启动浏览器
+                self.spare = Prewarmer(self._create_crawler)
+            if self.parse_workers > 0:
+                self.pipeline = Pipeline(
+                    [
+                        Stage(
+                            "parse",
+                            self._parse_stage,
+                            self.parse_workers,
+                            self.queue_size,
+                        ),
+                        Stage("normalize", self._normalize_stage, 1, self.queue_size),
+                        # 输出对象不是线程安全的，写出阶段只用一个线程
+                        Stage("write", self._write_stage, 1, self.queue_size),
+                    ],
+                    self.metrics,
+                    thread_context=self.profiler.thread,
+                )
+            self._run_workers(max(1, min(self.concurrency, remaining)))
+        finally:
+            self._close()
+
+        results = [result for _, result in sorted(self.results, key=lambda i: i[0])]
+        if self.writer is not None and self.writer.errors:
+            _mark_write_failures(
+                results, self.writer.errors, self.journal, self.metrics
+            )
+            if self.work_queue is not None:
+                # 后台写出在提交租约之后才失败，这些作者重新放回队列
+                self.work_queue.requeue(
+                    keys=[author_key(a) for a, _ in self.writer.errors]
+                )
+        skipped = sum(1 for r in results if r["status"] == STATUS_SKIPPED)
+        if skipped:
+            print(f"\n⏱ 批次时间预算已耗尽，跳过 {skipped} 个作者")
+        return results
+
+    def _enqueue(self, authors: List[Dict], resume: bool) -> int:
+        """把作者放入本地队列或分布式任务队列，返回待处理的作者数"""
+        if resume and self.journal:
+            finished = self.journal.finished_keys()
+            skipped = [a for a in authors if author_key(a) in finished]
+            authors = [a for a in authors if author_key(a) not in finished]
+            if skipped:
+                print(f"⏭ 跳过 {len(skipped)} 个已完成的作者")
+
+        if self.work_queue is not None:
+            self.worker_id = self.worker_id or default_worker_id()
+            added = self.work_queue.enqueue(authors)
+            counts = self.work_queue.counts()
+            print(f"📋 任务队列：新加入 {added} 个作者，当前 {counts}")
+            # 序号使用队列中的任务编号，各进程的输出可以对应到同一个作者
+            self.total = sum(counts.values())
+            self.keeper = LeaseKeeper(self.work_queue, self.lease_seconds)
+            return counts[TASK_PENDING] + counts[TASK_LEASED]
+
+        numbered = {id(author_info): i for i, author_info in enumerate(authors, 1)}
+        # 合并检索时同一单位的作者排在一起，以便连续取出凑成一组
+        groups = plan_groups(authors, self.or_batch) if self.or_batch > 1 else [authors]
+        for group in groups:
+            for author_info in group:
+                self.pending.put((numbered[id(author_info)], author_info))
+        self.total = len(authors)
+        return len(authors)
+
+    def _run_workers(self, workers: int):
+        target = self._tab_worker if self.tabs > 1 else lambda: _Worker(self).run()
+
+        def run_worker():
+            with self.profiler.thread():
+                target()
+
+        with self.profiler:
+            if self.pipeline is not None:
+                self.pipeline.start()
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for future in [executor.submit(run_worker) for _ in range(workers)]:
+                        future.result()
+            finally:
+                if self.pipeline is not None:
+                    self.pipeline.close()
+                    print(f"🔀 流水线各阶段：{self.pipeline.stats()}")
+
+    def _close(self):
+        # 退出前写完队列中剩余的结果
+        if self.writer is not None:
+            self.writer.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.dedup_index is not None:
+            self.dedup_index.close()
+        if self.keeper is not None:
+            self.keeper.close()
+        if self.spare is not None:
+            self.spare.close()
+            self.metrics.incr("prewarm_hits", self.spare.hits)
+        if self.delays is not None:
+            self.delays.save()
+            print(f"⏲ 等待时间：{self.delays.snapshot()}")
+
+    def _create_crawler(self):
+        return create_crawler(
+            self.backend,
+            self.headless,
+            self.metrics,
+            self.recorder,
+            self.profile_pool,
+            self.delays,
+        )
+
+    def new_crawler(self):
+        """创建爬虫；开启备用浏览器时取用后台已启动的浏览器"""
+        if self.spare is not None:
+            return self.spare.take()
+        return self._create_crawler()
+
+    def finish(self, index: int, author_info: Dict, result: Dict):
+        """记录一个作者的结果：写入处理记录，提交任务队列中的租约"""
+        result = {
+            "author": author_info["name"],
+            "institution": author_info.get("institution", ""),
+            **result,
+        }
+        self.metrics.incr(f"authors_{result['status']}")
+        with self.results_lock:
+            self.results.append((index, result))
+            lease = self.leases.pop(index, None)
+        if self.journal and result["status"] != STATUS_SKIPPED:
+            self.journal.record(author_info, result)
+        if lease is not None:
+            self._settle(lease, result)
+
+    def _settle(self, lease, result: Dict):
+        """提交租约：已完成或出错的作者标记为已处理，被拦截、超时的作者放回队列"""
+        self.keeper.remove(lease)
+        if result["status"] in FINISHED_STATUSES + (STATUS_FAILED,):
+            owned = self.work_queue.complete(lease, result["status"], result["count"])
+        else:
+            owned = self.work_queue.release(lease, result["status"])
+        if not owned:
+            self.metrics.incr("leases_lost")
+            print(f"⚠ {lease.author_info['name']} 的租约已被其它进程接管")
+
+    def _claim(self):
+        """领取下一个作者：本地队列，或分布式任务队列中的租约"""
+        if self.work_queue is None:
+            try:
+                return self.pending.get_nowait()
+            except queue.Empty:
+                return None
+        while not self.run_deadline.expired():
+            lease = self.work_queue.claim(self.worker_id, self.lease_seconds)
+            if lease is not None:
+                with self.results_lock:
+                    self.leases[lease.task_id] = lease
+                self.keeper.add(lease)
+                return lease.task_id, lease.author_info
+            # 其它进程持有的租约可能因崩溃而过期，等待后重新领取
+            if not self.work_queue.counts()[TASK_LEASED]:
+                return None
+            self.run_deadline.sleep(CRAWLER_CONFIG["lease_poll"])
+        return None
+
+    def output(self, author_info: Dict, papers: List[Dict], status: str) -> Dict:
+        """去重后写出一个作者的论文"""
+        if not papers:
+            if self.incremental and status == STATUS_SUCCESS:
+                print("✅ 没有新论文")
+                return {"count": 0, "status": STATUS_SUCCESS}
+            if status == STATUS_INCOMPLETE:
+                print("⏱ 时间预算耗尽，未获取到论文")
+                return {"count": 0, "status": STATUS_INCOMPLETE}
+            print("❌ 未找到相关论文")
+            return {"count": 0, "status": STATUS_NO_RESULT}
+
+        dedup_index = self.dedup_index
+        result = {"count": len(papers), "status": status}
+        unique = papers
+        reservation = None
+        if dedup_index is not None:
+            known = dedup_index.links_for(author_info) if self.incremental else set()
+            # 合著论文只输出一次，其余作者只在索引中记录关联；
+            # 写出成功后才登记到索引，写出失败的论文续跑时重新输出
+            unique, reservation = dedup_index.reserve(author_info, papers)
+            if known:
+                # 增量模式下该作者已有的论文重新输出，以更新被引和下载次数
+                unique += [p for p in papers if paper_fingerprint(p) in known]
+            result["duplicates"] = len(papers) - len(unique)
+            self.metrics.incr("duplicates", result["duplicates"])
+
+        message = f"✅ 找到 {len(papers)} 篇论文"
+        if unique:
+            try:
+                with self.sink_lock, self.metrics.timer("save"):
+                    if self.writer is not None and reservation is not None:
+                        result["output"] = self.writer.write(
+                            author_info,
+                            unique,
+                            on_done=lambda error, reserved=reservation: (
+                                dedup_index.commit(reserved)
+                                if error is None
+                                else dedup_index.rollback(reserved)
+                            ),
+                        )
+                        reservation = None
+                    else:
+                        result["output"] = self.sink.write(author_info, unique)
+            except Exception:
+                if reservation is not None:
+                    dedup_index.rollback(reservation)
+                raise
+            message += f"，已保存至 {result['output']}"
+        if reservation is not None:
+            dedup_index.commit(reservation)
+        if len(unique) < len(papers):
+            message += f"（{len(papers) - len(unique)} 篇已由其他作者输出）"
+        if status == STATUS_INCOMPLETE:
+            message += "（时间预算耗尽，结果不完整）"
+        print(message)
+        return result
+
+    def handle(
+        self,
+        author_info: Dict,
+        papers: List[Dict],
+        last_status,
+        blocked,
+        cache_empty: bool = True,
+    ):
+        """
+        按搜索状态处理一个作者的结果，返回该作者的结果记录
+
+        Args:
+            cache_empty: 是否缓存空结果；合并检索分回的空结果不缓存
+        """
+        # 遇到验证码/封禁页面时冷却，避免后续作者继续撞墙
+        if blocked:
+            seconds = CRAWLER_CONFIG["block_cooldown"]
+            print(f"⛔ 被知网拦截（{last_status}），冷却 {seconds} 秒")
+            self.cooldown.trigger(seconds)
+            return {"count": 0, "status": STATUS_BLOCKED}
+
+        if last_status == STATUS_ERROR:
+            print(f"❌ {author_info['name']} 搜索失败")
+            return {"count": 0, "status": STATUS_FAILED}
+
+        status = STATUS_SUCCESS
+        if last_status == STATUS_PARTIAL:
+            status = STATUS_INCOMPLETE
+        elif self.cache and (papers or (last_status == STATUS_EMPTY and cache_empty)):
+            self.cache.put(author_info, self.max_pages, papers)
+        return self.output(author_info, papers, status)
+
+    def finish_handled(self, index: int, author_info: Dict, *outcome, **options):
+        """处理并记录一个作者的搜索结果，处理出错时记为失败"""
+        try:
+            result = self.handle(author_info, *outcome, **options)
+        except Exception as e:
+            print(f"❌ 处理 {author_info['name']} 时出错：{str(e)}")
+            result = {"count": 0, "status": STATUS_FAILED}
+        self.finish(index, author_info, result)
+
+    def next_author(self):
+        """取下一个需要访问知网的作者，超时跳过和缓存命中的作者直接完成"""
+        while True:
+            item = self._claim()
+            if item is None:
+                return None
+            index, author_info = item
+
+            self.cooldown.wait(self.run_deadline)
+            if self.run_deadline.expired():
+                self.finish(index, author_info, {"count": 0, "status": STATUS_SKIPPED})
+                continue
+
+            print(
+                f"\n[{index}/{self.total}] 正在处理：{author_info['name']} - {author_info.get('institution', '')}"
+            )
+            papers = self.cache.get(author_info, self.max_pages) if self.cache else None
+            if papers is None:
+                return index, author_info
+
+            print(f"📦 使用缓存结果：{len(papers)} 篇论文")
+            try:
+                result = self.output(author_info, papers, STATUS_SUCCESS)
+            except Exception as e:
+                print(f"❌ 处理 {author_info['name']} 时出错：{str(e)}")
+                result = {"count": 0, "status": STATUS_FAILED}
+            self.finish(index, author_info, result)
+
+    def next_group(self, first):
+        """
+        合并检索：继续从队列中取同一单位的作者凑成一组
+
+        Returns:
+            (本组作者, 单位不同、留给下一组的作者或None)
+        """
+        group = [first]
+        institution = first[1].get("institution", "").strip()
+        while len(group) < self.or_batch:
+            item = self.next_author()
+            if item is None:
+                break
+            if item[1].get("institution", "").strip() != institution:
+                return group, item
+            group.append(item)
+        return group, None
+
+    def _tab_worker(self):
+        """多标签页工作线程：一个浏览器中同时检索多个作者"""
+        first = self.next_author()
+        if first is None:
+            return
+
+        def feed():
+            yield first
+            while (item := self.next_author()) is not None:
+                yield item
+
+        crawler = self.new_crawler()
+        multi_tab = MultiTabCrawler(crawler, tabs=self.tabs)
+        try:
+            for index, author_info, papers, status in multi_tab.search_many(
+                feed(),
+                self.max_pages,
+                lambda: self.run_deadline.child(self.author_budget),
+            ):
+                self.finish_handled(
+                    index, author_info, papers, status, status in BLOCKING_STATUSES
+                )
+        finally:
+            multi_tab.close_tabs()
+            crawler.close()
+
+    def _parse_stage(self, item):
+        """流水线解析阶段：提取结果页中的论文"""
+        if item[0] == "done":
+            return [item]
+        _, index, author_info, seq, url, html = item
+        try:
+            if not hasattr(self._parsers, "crawler"):
+                self._parsers.crawler = CNKICrawlerImproved(driver=FakeDriver())
+            self._parsers.crawler.driver.load_html(html, url)
+            papers = self._parsers.crawler._extract_papers_from_page()
+        except Exception as e:
+            # 整理阶段要收齐每一页才能完成作者，解析失败的页面以None交给下一阶段
+            print(f"❌ 解析 {author_info['name']} 的第 {seq + 1} 页失败：{str(e)}")
+            self.metrics.incr("parse_errors")
+            papers = None
+        return [("page", index, author_info, seq, papers)]
+
+    def _normalize_stage(self, item):
+        """流水线整理阶段：收齐一个作者的所有页面后去重合并"""
+        state = self._assembling.setdefault(item[1], {"pages": {}, "done": None})
+        if item[0] == "page":
+            state["pages"][item[3]] = item[4]
+        else:
+            state["done"] = item
+        done = state["done"]
+        if done is None or len(state["pages"]) < done[3]:
+            return None
+
+        del self._assembling[item[1]]
+        _, index, author_info, _, last_status, blocked = done
+        pages = [state["pages"][seq] for seq in sorted(state["pages"])]
+        if any(page is None for page in pages):
+            # 有页面解析失败，结果不完整，记为失败以便续跑时重新处理
+            return [(index, author_info, [], STATUS_ERROR, blocked)]
+        # 翻页过程中结果列表可能移动，跳过前面页面已出现的论文
+        seen: set = set()
+        papers = []
+        for page in pages:
+            papers.extend(unique_papers(page, seen))
+        self.metrics.incr("rows", len(papers))
+        if not papers and last_status == PAGE_OK:
+            last_status = STATUS_EMPTY
+        return [(index, author_info, papers, last_status, blocked)]
+
+    def _write_stage(self, item):
+        """流水线写出阶段"""
+        self.finish_handled(*item)
+
+
+class _Worker:
+    """单标签页工作线程：持有一个爬虫，逐个或合并检索领取到的作者"""
+
+    def __init__(self, batch: _BatchRun):
+        self.batch = batch
+        self.crawler = None
+
+    def run(self):
+        try:
+            for index, author_info in self._individual():
+                self._search(index, author_info)
+                self._maybe_recycle()
+        finally:
+            if self.crawler is not None:
+                self.crawler.close()
+
+    def _maybe_recycle(self):
+        # 长时间运行时按页面数或内存阈值在作者之间重启浏览器
+        crawler = self.crawler
+        if not hasattr(crawler, "maybe_recycle"):
+            return
+        try:
+            if self.batch.spare is not None and crawler.needs_recycle():
+                # 换用后台已启动的备用浏览器，并带上原浏览器的Cookie
+                print(f"♻️ 换用备用浏览器（已加载 {crawler.pages_served} 个页面）")
+                cookies = crawler.export_cookies()
+                crawler.close()
+                self.crawler = None
+                self.crawler = self.batch.new_crawler()
+                self.crawler.restore_cookies(cookies)
+            else:
+                crawler.maybe_recycle()
+        except Exception as e:
+            print(f"❌ 重启浏览器失败：{str(e)}")
+            self.crawler = None
+
+    def _individual(self):
+        """需要单独检索的作者；开启合并检索时先合并检索，只交出需要退回逐个检索的作者"""
+        batch = self.batch
+        carry = None
+        while (item := carry or batch.next_author()) is not None:
+            if batch.or_batch <= 1:
+                yield item
+                continue
+            group, carry = batch.next_group(item)
+            if len(group) > 1:
+                group = self._search_group(group)
+                self._maybe_recycle()
+            yield from group
+
+    def _search_group(self, group):
+        """
+        合并检索一组作者，按作者字段分回结果
+
+        Returns:
+            需要逐个检索的作者：结果超出翻页上限、不完整或出错时为整组；
+            有论文没能分给任何作者时，为没有分到论文的作者
+        """
+        batch = self.batch
+        names = [author_info["name"] for _, author_info in group]
+        institution = group[0][1].get("institution", "")
+        budget = (
+            None if batch.author_budget is None else batch.author_budget * len(group)
+        )
+        try:
+            if self.crawler is None:
+                self.crawler = batch.new_crawler()
+            print(f"🔗 合并检索 {len(group)} 个作者：{'、'.join(names)}")
+            batch.metrics.incr("or_queries")
+            papers = self.crawler.search_papers(
+                " / ".join(names),
+                institution,
+                max_pages=batch.max_pages,
+                deadline=batch.run_deadline.child(budget),
+                query=build_or_query(names, institution),
+                abort_if_truncated=True,
+            )
+        except Exception as e:
+            print(f"❌ 合并检索出错：{str(e)}")
+            batch.metrics.incr("or_fallbacks")
+            return group
+
+        crawler = self.crawler
+        if crawler.is_blocked():
+            for index, author_info in group:
+                batch.finish(
+                    index,
+                    author_info,
+                    batch.handle(author_info, [], crawler.last_status, True),
+                )
+            return []
+        if crawler.truncated or crawler.last_status not in (PAGE_OK, STATUS_EMPTY):
+            print("↩ 合并检索结果超出翻页上限或不完整，改为逐个检索")
+            batch.metrics.incr("or_fallbacks")
+            return group
+
+        by_author, unmatched = demultiplex(papers, names)
+        if unmatched:
+            batch.metrics.incr("or_unmatched", len(unmatched))
+        fallback = []
+        for index, author_info in group:
+            own = by_author[author_info["name"]]
+            if not own and unmatched:
+                # 作者字段的写法可能与姓名不同，没分到论文不代表没有结果
+                fallback.append((index, author_info))
+                continue
+            print(f"👤 {author_info['name']}")
+            batch.finish_handled(
+                index,
+                author_info,
+                own,
+                PAGE_OK if own else STATUS_EMPTY,
+                False,
+                cache_empty=False,
+            )
+        if fallback:
+            print(
+                f"↩ {len(unmatched)} 篇论文没能分给任何作者，没有分到论文的作者改为逐个检索"
+            )
+            batch.metrics.incr("or_fallbacks")
+        return fallback
+
+    def _search(self, index: int, author_info: Dict):
+        """检索一个作者；流水线模式下页面交给流水线，由写出阶段完成该作者"""
+        batch = self.batch
+        pipeline = batch.pipeline
+        sent = []
+        try:
+            # 全部命中缓存时不必启动浏览器
+            if self.crawler is None:
+                self.crawler = batch.new_crawler()
+            known = (
+                batch.dedup_index.links_for(author_info) if batch.incremental else None
+            )
+            on_page = None
+            if pipeline is not None:
+
+                def on_page(url, html):
+                    pipeline.put(("page", index, author_info, len(sent), url, html))
+                    sent.append(url)
+
+            papers = _search(
+                self.crawler,
+                author_info,
+                batch.max_pages,
+                batch.run_deadline.child(batch.author_budget),
+                known,
+                batch.refresh_days,
+                on_page,
+            )
+            last_status = getattr(self.crawler, "last_status", None)
+            blocked = getattr(self.crawler, "is_blocked", lambda: False)()
+        except Exception as e:
+            print(f"❌ 处理 {author_info['name']} 时出错：{str(e)}")
+            if pipeline is not None:
+                pipeline.put(
+                    ("done", index, author_info, len(sent), STATUS_ERROR, False)
+                )
+            else:
+                batch.finish(index, author_info, {"count": 0, "status": STATUS_FAILED})
+            return
+
+        if pipeline is not None:
+            # 结果在整理阶段收齐所有页面后处理
+            pipeline.put(("done", index, author_info, len(sent), last_status, blocked))
+        else:
+            batch.finish_handled(index, author_info, papers, last_status, blocked)
+
+
+def _mark_write_failures(
+    results: List[Dict],
+    errors: List,
+    journal: Optional[BatchJournal],
+    metrics: Metrics,
+):
+    """把后台写出失败的作者标记为失败，续跑时重新处理"""
+    failed = {author_key(author_info): message for author_info, message in errors}
+    for result in results:
+        author_info = {"name": result["author"], "institution": result["institution"]}
+        message = failed.get(author_key(author_info))
+        if message is None or result["status"] == STATUS_WRITE_FAILED:
+            continue
+        result.update(status=STATUS_WRITE_FAILED, error=message)
+        result.pop("output", None)
+        metrics.incr("write_errors")
+        if journal:
+            journal.record(author_info, result)
+    print(f"\n❌ {len(failed)} 个作者的结果写出失败")
+
+
+def _search(
+    crawler,
+    author_info: Dict,
+    max_pages: int,
+    deadline: Deadline,
+    known: Optional[set] = None,
+    refresh_days: Optional[int] = None,
+    on_page=None,
+):
+    """调用爬虫搜索，改进版爬虫同时传入单个作者的时间预算、增量模式的已有论文和流水线回调"""
+    if refresh_days is None:
+        refresh_days = CRAWLER_CONFIG["refresh_days"]
+    if isinstance(crawler, CNKICrawlerImproved):
+        return crawler.search_papers(
+            author_info["name"],
+            author_info.get("institution", ""),
+            max_pages=max_pages,
+            deadline=deadline,
+            known=known,
+            refresh_days=refresh_days,
+            on_page=on_page,
+        )
+    return crawler.search_papers(
+        author_info["name"], author_info.get("institution", ""), max_pages=max_pages
+    )
+
+
+def write_metrics(metrics: Metrics, metrics_dir: str, results: List[Dict]):
+    """写入JSON运行汇总和Prometheus textfile"""
+    os.makedirs(metrics_dir, exist_ok=True)
+    metrics.write_json(
+        os.path.join(metrics_dir, "run_summary.json"),
+        extra={
+            "authors": len(results),
+            "papers": sum(r["count"] for r in results),
+        },
+    )
+    metrics.write_prometheus(os.path.join(metrics_dir, "office_auto.prom"))
+    print(f"📈 运行指标已写入 {metrics_dir}")
+
+
+def print_summary(results: List[Dict]):
+    """打印批量处理结果汇总"""
+    print("\n" + "=" * 50)
+    print("📊 批量处理结果汇总：")
+    print("-" * 50)
+
+    total_papers = 0
+    duplicates = 0
+    for result in results:
+        line = f"{result['author']}: {result['count']} 篇论文 - {result['status']}"
+        if result.get("duplicates"):
+            line += f"，{result['duplicates']} 篇已在其他作者的输出中"
+        if result.get("error"):
+            line += f"（{result['error']}）"
+        print(line)
+        total_papers += result["count"]
+        duplicates += result.get("duplicates", 0)
+
+    print("-" * 50)
+    print(f"总计：{total_papers} 篇论文")
+    print(
+        f"成功率：{sum(1 for r in results if r['status'] == STATUS_SUCCESS)}/{len(results)}"
+    )
+    if duplicates:
+        print(
+            f"去重：{duplicates} 篇合著论文只输出在最先处理的作者名下，"
+            "后续作者的输出中不包含这些论文，完整的作者-论文关联保存在去重索引中"
+        )
@@ -0,0 +1,95 @@
+"""
+批量输入模块
+从CSV或Excel文件读取（作者姓名, 作者单位）列表
+"""
+
+import csv
+import os
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# 可识别的列名（按优先级）
+NAME_COLUMNS = ["name", "author", "姓名", "作者", "作者姓名"]
+INSTITUTION_COLUMNS = ["institution", "affiliation", "单位", "机构", "作者单位"]
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+
+
+def author_key(author_info: Dict) -> str:
+    """作者唯一标识"""
+    return f"{author_info['name']}\t{author_info.get('institution', '')}"
+
+
+def _pick_column(
+    columns: List[str], candidates: List[str], explicit: Optional[str] = None
+) -> Optional[str]:
+    """从表头中选出匹配的列名"""
+    if explicit:
+        if explicit not in columns:
+            raise ValueError(f"输入文件中没有列: {explicit}")
+        return explicit
+
+    normalized = {str(col).strip().lower(): col for col in columns}
+    for candidate in candidates:
+        if candidate.lower() in normalized:
+            return normalized[candidate.lower()]
+    return None
+
+
+def _iter_rows(path: str, sheet: Optional[str] = None) -> Iterator[Dict]:
+    """逐行读取CSV或Excel文件"""
+    if path.lower().endswith(EXCEL_EXTENSIONS):
+        df = pd.read_excel(path, sheet_name=sheet or 0, dtype=str).fillna("")
+        yield from df.to_dict("records")
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+
+
+def read_authors(
+    path: str,
+    name_column: Optional[str] = None,
+    institution_column: Optional[str] = None,
+    sheet: Optional[str] = None,
+) -> List[Dict]:
+    """
+    读取作者列表
+
+    Args:
+        path: CSV或Excel文件路径
+        name_column: 作者姓名列名，默认自动识别
+        institution_column: 作者单位列名，默认自动识别
+        sheet: Excel工作表名，默认第一个工作表
+
+    Returns:
+        作者列表，每项包含 name 和 institution，已去除空行和重复项
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"输入文件不存在: {path}")
+
+    authors = []
+    seen = set()
+    name_key = institution_key = None
+
+    for i, row in enumerate(_iter_rows(path, sheet)):
+        if i == 0:
+            columns = list(row.keys())
+            name_key = _pick_column(columns, NAME_COLUMNS, name_column)
+            if name_key is None:
+                raise ValueError(f"无法识别作者姓名列，可用列: {columns}")
+            institution_key = _pick_column(
+                columns, INSTITUTION_COLUMNS, institution_column
+            )
+
+        name = str(row.get(name_key) or "").strip()
+        institution = (
+            str(row.get(institution_key) or "").strip() if institution_key else ""
+        )
+        if not name or (name, institution) in seen:
+            continue
+
+        seen.add((name, institution))
+        authors.append({"name": name, "institution": institution})
+
+    return authors
@@ -0,0 +1,172 @@
+"""
+浏览器配置目录池
+Chrome默认每次以全新的配置目录启动，Cookie、缓存和站点预热都会丢失；
+这里维护一组持久的 --user-data-dir 目录，用文件锁保证同一时刻只有一个浏览器使用某个目录，
+并限制磁盘缓存大小，后续运行可以跳过冷启动
+"""
+
+import os
+import shutil
+import threading
+import time
+from typing import List, Optional
+
+from .config import CRAWLER_CONFIG, FROM_CONFIG
+
+try:
+    import fcntl
+except ImportError:  # Windows下没有fcntl，改用msvcrt
+    fcntl = None
+    import msvcrt
+
+# Chrome在配置目录中创建的单实例锁，浏览器崩溃后会残留并阻止下次启动
+_SINGLETON_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+# 可以随时删除的缓存目录（相对于配置目录）
+_CACHE_DIRS = (
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "GPUCache"),
+    "ShaderCache",
+    "GrShaderCache",
+)
+
+
+def _try_lock(handle) -> bool:
+    """非阻塞地锁定文件，已被其它进程锁定时返回False"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def dir_size(path: str) -> int:
+    """目录下所有文件的大小（字节）"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+class BrowserProfile:
+    """已锁定的配置目录，close() 后其它浏览器才能使用"""
+
+    def __init__(self, path: str, lock_handle):
+        self.path = path
+        self._lock_handle = lock_handle
+
+    @property
+    def locked(self) -> bool:
+        return self._lock_handle is not None
+
+    def chrome_arguments(self, cache_mb: Optional[int]) -> List[str]:
+        """启动Chrome时需要添加的参数"""
+        arguments = [f"--user-data-dir={os.path.abspath(self.path)}"]
+        if cache_mb:
+            arguments.append(f"--disk-cache-size={cache_mb * 1024 * 1024}")
+        return arguments
+
+    def close(self):
+        if self._lock_handle is not None:
+            _unlock(self._lock_handle)
+            self._lock_handle.close()
+            self._lock_handle = None
+
+
+class ProfilePool:
+    """
+    持久浏览器配置目录池
+
+    目录为 root/profile-00、root/profile-01 …，锁文件放在目录旁边（root/profile-00.lock），
+    同一台机器上的多个线程和进程都通过锁文件互斥；没有空闲目录时新建，最多 size 个
+    """
+
+    def __init__(
+        self,
+        root: str,
+        size: Optional[int] = None,
+        cache_mb: Optional[int] = FROM_CONFIG,
+    ):
+        """
+        Args:
+            root: 配置目录池所在目录
+            size: 最多创建的配置目录数，None表示不限
+            cache_mb: 每个配置目录的磁盘缓存上限（MB），启动前超出的缓存会被清除；None表示不限，
+                默认取配置 profile_cache_mb
+        """
+        if cache_mb is FROM_CONFIG:
+            cache_mb = CRAWLER_CONFIG["profile_cache_mb"]
+        self.root = root
+        self.size = size
+        self.cache_mb = cache_mb
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, n: int) -> str:
+        return os.path.join(self.root, f"profile-{n:02d}")
+
+    def acquire(self, timeout: Optional[float] = None) -> BrowserProfile:
+        """
+        锁定一个空闲的配置目录
+
+        Args:
+            timeout: 目录数已满且都在使用时最多等待的秒数，None表示一直等待
+
+        Raises:
+            TimeoutError: 等待超时
+        """
+        start = time.monotonic()
+        while True:
+            profile = self._try_acquire()
+            if profile is not None:
+                return profile
+            if timeout is not None and time.monotonic() - start >= timeout:
+                raise TimeoutError(f"{self.root} 中没有空闲的浏览器配置目录")
+            time.sleep(0.5)
+
+    def _try_acquire(self) -> Optional[BrowserProfile]:
+        with self._lock:
+            n = 0
+            while self.size is None or n < self.size:
+                path = self._path(n)
+                n += 1
+                handle = open(path + ".lock", "a+")
+                if not _try_lock(handle):
+                    handle.close()
+                    continue
+                os.makedirs(path, exist_ok=True)
+                self._prepare(path)
+                return BrowserProfile(path, handle)
+        return None
+
+    def _prepare(self, path: str):
+        """启动前清理：锁已归我们所有，残留的单实例锁一定来自崩溃的浏览器"""
+        for name in _SINGLETON_FILES:
+            try:
+                os.unlink(os.path.join(path, name))
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"⚠ 无法删除残留的浏览器锁 {name}：{str(e)}")
+        if not self.cache_mb:
+            return
+        cache_dirs = [os.path.join(path, name) for name in _CACHE_DIRS]
+        if sum(dir_size(d) for d in cache_dirs) > self.cache_mb * 1024 * 1024:
+            print(f"🧹 浏览器缓存超过 {self.cache_mb} MB，清除 {path} 的缓存")
+            for cache_dir in cache_dirs:
+                shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,574 @@
+"""
+命令行入口
+用法：office-auto crawl --input authors.csv --output batch_output
+      office-auto replay pages.jsonl.gz --output replay.csv
+      office-auto reextract saved_pages/ --output papers.csv
+      office-auto enrich papers.csv --output enriched.csv
+      office-auto export papers.db --output papers.xlsx --author 张三
+      office-auto search papers.db 深度学习 --years 2020-2023
+      office-auto queue tasks.db --requeue
+      office-auto --config settings.toml crawl --input authors.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+from .batch import (
+    BACKENDS,
+    STATUS_BLOCKED,
+    STATUS_FAILED,
+    STATUS_INCOMPLETE,
+    STATUS_SKIPPED,
+    STATUS_WRITE_FAILED,
+    print_summary,
+    run_batch,
+    write_metrics,
+)
+from .batch_input import read_authors
+from .cnki_crawler_improved import CNKICrawlerImproved
+from .config import CRAWLER_CONFIG, apply_settings, load_settings
+from .enrich import Enricher, HttpDetailFetcher, TabDetailFetcher, enrich_output
+from .metrics import Metrics
+from .page_archive import replay_archive
+from .reextract import reextract
+from .sinks import open_sink
+from .store import AUTHOR_COLUMN, PaperStore
+from .work_queue import SQLiteWorkQueue, open_work_queue
+
+
+def _add_show_browser_argument(parser, help_text: str):
+    """--show-browser / --no-show-browser，都不指定时按配置 headless"""
+    parser.add_argument(
+        "--show-browser",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=f"{help_text}（默认按配置 headless，当前"
+        f"{'无头模式' if CRAWLER_CONFIG['headless'] else '显示窗口'}）",
+    )
+
+
+def _headless(args) -> Optional[bool]:
+    """命令行指定的无头模式，None表示按配置"""
+    return None if args.show_browser is None else not args.show_browser
+
+
+def _add_crawl_parser(subparsers):
+    parser = subparsers.add_parser("crawl", help="从CSV/Excel批量爬取作者论文")
+    parser.add_argument(
+        "-i", "--input", help="作者列表（CSV或Excel），使用 --queue 时可省略"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="batch_output",
+        help="输出位置：.csv/.jsonl文件、.db论文库，或每个作者一个Excel的目录（默认batch_output）",
+    )
+    parser.add_argument("--name-column", help="作者姓名列名（默认自动识别）")
+    parser.add_argument("--institution-column", help="作者单位列名（默认自动识别）")
+    parser.add_argument("--sheet", help="Excel工作表名（默认第一个）")
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=CRAWLER_CONFIG["max_pages"],
+        help="每个作者的最大搜索页数（默认%(default)s）",
+    )
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=CRAWLER_CONFIG["concurrency"],
+        help=f"并发浏览器数量（默认{CRAWLER_CONFIG['concurrency']}）",
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default="improved", help="爬虫后端"
+    )
+    parser.add_argument(
+        "--tabs",
+        type=int,
+        default=CRAWLER_CONFIG["tabs"],
+        help="每个浏览器的标签页数量，大于1时在同一Chrome进程中并发搜索"
+        f"（默认{CRAWLER_CONFIG['tabs']}）",
+    )
+    _add_show_browser_argument(parser, "显示浏览器窗口")
+    parser.add_argument(
+        "--journal",
+        default="batch_journal.jsonl",
+        help="处理记录文件（默认batch_journal.jsonl）",
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="跳过处理记录中已完成的作者"
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        default=CRAWLER_CONFIG["cache_dir"],
+        help="搜索结果缓存目录",
+    )
+    parser.add_argument(
+        "--author-budget",
+        type=float,
+        default=CRAWLER_CONFIG["author_budget"],
+        help="单个作者的时间预算（秒）",
+    )
+    parser.add_argument(
+        "--run-budget",
+        type=float,
+        default=CRAWLER_CONFIG["run_budget"],
+        help="整个批次的时间预算（秒）",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        metavar="DIR",
+        help="写入运行指标：run_summary.json 和 Prometheus textfile office_auto.prom",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="MODES",
+        help="开启剖析：cpu（cProfile）、memory（tracemalloc）、sample（低开销栈采样），"
+        "可用逗号组合，结果写入输出旁边的 profile 目录",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="ARCHIVE",
+        help="录制每次搜索经过的页面到压缩归档（.jsonl.gz），可用 replay 命令离线回放",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="跨作者去重：合著论文只输出一次（按 标题+期刊+日期 判断），后续作者的输出中不再包含这些论文",
+    )
+    parser.add_argument(
+        "--dedup-db",
+        metavar="FILE",
+        help="去重索引的SQLite文件，记录作者与论文的关联并在多次运行间保留（隐含 --dedup）",
+    )
+    parser.add_argument(
+        "--background-write",
+        action="store_true",
+        help="在后台线程中保存结果，浏览器不等待写出即处理下一个作者",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="流水线模式：浏览器线程只取页面，由N个线程解析，整理和写出也在单独的线程中进行（默认0，不开启）",
+    )
+    parser.add_argument(
+        "--or-batch",
+        type=int,
+        default=1,
+        metavar="N",
+        help="合并检索：同一单位的最多N个作者合并为一个 作者:A OR 作者:B 检索，"
+        "结果超出 --max-pages 页时改为逐个检索（默认1，不合并）",
+    )
+    parser.add_argument(
+        "--browser-profiles",
+        metavar="DIR",
+        help="在该目录中维护持久的浏览器配置目录池，每个浏览器独占一个，"
+        "Cookie和缓存在多次运行之间保留，省去冷启动后的预热",
+    )
+    parser.add_argument(
+        "--warm-spare",
+        action="store_true",
+        help="在后台保持一个已启动的备用浏览器，工作线程启动和浏览器重启时直接换用，不用等待冷启动",
+    )
+    parser.add_argument(
+        "--delay-state",
+        metavar="FILE",
+        help="开启自适应等待：按结果页实际就绪时间自动调整搜索/翻页等待时间，"
+        "保存到该JSON文件（按站点记录），下次运行从调整后的值开始；不指定时使用固定的等待时间",
+    )
+    parser.add_argument(
+        "--queue",
+        metavar="FILE",
+        help="分布式任务队列（SQLite文件，可放在共享存储上）：--input 中的作者先加入队列，"
+        "多台机器上的进程各自领取作者处理，崩溃进程的作者在租约过期后由其它进程接手；"
+        "memory 表示只在本进程内使用的队列",
+    )
+    parser.add_argument(
+        "--worker-id", help="在任务队列中标识本进程（默认 主机名:进程号）"
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=CRAWLER_CONFIG["lease_seconds"],
+        help="任务队列中作者租约的期限（秒，默认%(default)s）",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量刷新：按发表时间排序，只获取 --dedup-db 中该作者最近保存的论文之后的新论文；"
+        "--output 需要是论文库（.db）",
+    )
+    parser.add_argument(
+        "--refresh-days",
+        type=int,
+        default=CRAWLER_CONFIG["refresh_days"],
+        help="增量模式下仍重新获取被引/下载次数的天数（默认%(default)s）",
+    )
+    parser.set_defaults(func=_run_crawl)
+
+
+def _profile_dir(output: str) -> str:
+    """剖析结果放在输出旁边：单文件输出写到同一目录，Excel目录输出写到目录内"""
+    if output.lower().endswith((".csv", ".jsonl", ".ndjson")):
+        return os.path.join(os.path.dirname(output) or ".", "profile")
+    return os.path.join(output, "profile")
+
+
+def _run_crawl(args) -> int:
+    if not args.input and not args.queue:
+        print("需要指定 --input 或 --queue")
+        return 1
+    authors = []
+    if args.input:
+        authors = read_authors(
+            args.input, args.name_column, args.institution_column, args.sheet
+        )
+        if not authors and not args.queue:
+            print("输入文件中没有作者")
+            return 1
+
+    if args.incremental and not args.output.lower().endswith(".db"):
+        # 在打开输出之前检查，避免覆盖已有的输出文件
+        print("增量模式只输出新论文，--output 需要是论文库（.db）")
+        return 1
+
+    metrics = Metrics()
+    work_queue = open_work_queue(args.queue) if args.queue else None
+    if work_queue is None:
+        print(f"将批量处理 {len(authors)} 个作者...")
+    # 多个进程共用SQLite队列时，论文库也由这些进程共同写入
+    shared = isinstance(work_queue, SQLiteWorkQueue)
+    with open_sink(args.output, append=args.resume, shared=shared) as sink:
+        results = run_batch(
+            authors,
+            sink,
+            max_pages=args.max_pages,
+            concurrency=args.concurrency,
+            backend=args.backend,
+            headless=_headless(args),
+            journal_path=args.journal,
+            resume=args.resume,
+            cache_dir=args.cache,
+            author_budget=args.author_budget,
+            run_budget=args.run_budget,
+            tabs=args.tabs,
+            metrics=metrics,
+            profile=args.profile,
+            profile_dir=_profile_dir(args.output),
+            record_path=args.record,
+            dedup=args.dedup,
+            dedup_path=args.dedup_db,
+            incremental=args.incremental,
+            refresh_days=args.refresh_days,
+            parse_workers=args.parse_workers,
+            background_write=args.background_write,
+            or_batch=args.or_batch,
+            work_queue=work_queue,
+            worker_id=args.worker_id,
+            lease_seconds=args.lease_seconds,
+            browser_profiles=args.browser_profiles,
+            warm_spare=args.warm_spare,
+            delay_state=args.delay_state,
+        )
+    if work_queue is not None:
+        print(f"📋 任务队列：{work_queue.counts()}")
+        work_queue.close()
+
+    print_summary(results)
+    if args.metrics_dir:
+        write_metrics(metrics, args.metrics_dir, results)
+    failed = (STATUS_FAILED, STATUS_WRITE_FAILED)
+    return 1 if any(r["status"] in failed for r in results) else 0
+
+
+def _add_replay_parser(subparsers):
+    parser = subparsers.add_parser(
+        "replay", help="用录制的页面归档离线重新运行爬取流程（无需浏览器和网络）"
+    )
+    parser.add_argument("archive", help="crawl --record 生成的页面归档")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="replay_output",
+        help="输出位置：.csv/.jsonl文件，或每个作者一个Excel的目录（默认replay_output）",
+    )
+    parser.set_defaults(func=_run_replay)
+
+
+def _run_replay(args) -> int:
+    start = time.perf_counter()
+    searches = papers_total = diverged = 0
+    with open_sink(args.output) as sink:
+        for author_info, papers, status, off_track in replay_archive(args.archive):
+            searches += 1
+            papers_total += len(papers)
+            if off_track:
+                diverged += 1
+                print(f"⚠️ {author_info['name']} 的回放与录制不一致（状态 {status}）")
+            if papers:
+                sink.write(author_info, papers)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"\n回放 {searches} 次搜索，得到 {papers_total} 篇论文，用时 {elapsed:.1f} 秒"
+    )
+    if diverged:
+        print(f"其中 {diverged} 次搜索与录制时的页面顺序不一致")
+    return 0
+
+
+def _add_reextract_parser(subparsers):
+    parser = subparsers.add_parser(
+        "reextract", help="用多进程对保存的HTML目录或页面归档重新提取论文"
+    )
+    parser.add_argument("source", help="HTML文件目录，或 crawl --record 生成的页面归档")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="reextract_output",
+        help="输出位置：.csv/.jsonl文件，或每个作者一个Excel的目录（默认reextract_output）",
+    )
+    parser.add_argument("-j", "--workers", type=int, help="进程数（默认CPU核数）")
+    parser.set_defaults(func=_run_reextract)
+
+
+def _run_reextract(args) -> int:
+    if not os.path.exists(args.source):
+        print(f"找不到输入：{args.source}")
+        return 1
+    with open_sink(args.output) as sink:
+        stats = reextract(args.source, sink, workers=args.workers)
+
+    seconds = stats["seconds"]
+    print(
+        f"重新提取 {stats['authors']} 个作者、{stats['pages']} 个页面，得到 {stats['papers']} 篇论文，"
+        f"用时 {seconds:.1f} 秒（{stats['pages'] / seconds if seconds else 0:.1f} 页/秒）"
+    )
+    return 0
+
+
+def _add_enrich_parser(subparsers):
+    parser = subparsers.add_parser(
+        "enrich", help="为 crawl 的输出补充详情页的摘要、关键词、DOI和基金信息"
+    )
+    parser.add_argument("input", help="crawl 的输出（.csv/.jsonl 文件或Excel目录）")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="enriched_output",
+        help="输出位置：.csv/.jsonl文件，或每个作者一个Excel的目录（默认enriched_output）",
+    )
+    parser.add_argument(
+        "--fetcher",
+        choices=("http", "tabs"),
+        default="http",
+        help="http：直接请求详情页；tabs：在浏览器的多个标签页中加载（默认http）",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=CRAWLER_CONFIG["detail_workers"],
+        help="同时获取的详情页数量",
+    )
+    parser.add_argument("--cache", metavar="DIR", help="详情页缓存目录")
+    _add_show_browser_argument(parser, "tabs 模式下显示浏览器窗口")
+    parser.set_defaults(func=_run_enrich)
+
+
+def _run_enrich(args) -> int:
+    crawler = None
+    if args.fetcher == "tabs":
+        crawler = CNKICrawlerImproved(headless=_headless(args))
+        fetcher = TabDetailFetcher(crawler, tabs=args.workers)
+    else:
+        fetcher = HttpDetailFetcher(workers=args.workers)
+
+    try:
+        with open_sink(args.output) as sink:
+            stats = enrich_output(
+                args.input, sink, Enricher(fetcher, cache_dir=args.cache)
+            )
+    finally:
+        fetcher.close()
+        if crawler is not None:
+            crawler.close()
+
+    print(
+        f"\n补充 {stats['authors']} 个作者：获取 {stats['fetched']} 个详情页，"
+        f"缓存命中 {stats['cached']}，失败 {stats['failed']}，"
+        f"被拦截 {stats['blocked']}，无链接 {stats['no_url']}"
+    )
+    return 1 if stats["failed"] or stats["blocked"] else 0
+
+
+def _add_export_parser(subparsers):
+    parser = subparsers.add_parser("export", help="把论文库（.db）中的论文导出为Excel")
+    parser.add_argument("store", help="crawl --output papers.db 生成的论文库")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="papers.xlsx",
+        help="输出的Excel文件（默认papers.xlsx）",
+    )
+    parser.add_argument("--author", help="只导出该检索作者的论文")
+    parser.add_argument("--institution", help="只导出该检索单位的论文")
+    parser.add_argument("--from", dest="date_from", metavar="DATE", help="最早发表日期")
+    parser.add_argument("--to", dest="date_to", metavar="DATE", help="最晚发表日期")
+    parser.set_defaults(func=_run_export)
+
+
+def _run_export(args) -> int:
+    if not os.path.exists(args.store):
+        print(f"找不到论文库：{args.store}")
+        return 1
+    with PaperStore(args.store) as store:
+        count = store.export_excel(
+            args.output,
+            author=args.author,
+            institution=args.institution,
+            date_from=args.date_from,
+            date_to=args.date_to,
+        )
+    print(f"导出 {count} 行至 {args.output}")
+    return 0
+
+
+def _add_queue_parser(subparsers):
+    parser = subparsers.add_parser(
+        "queue", help="查看或维护 crawl --queue 使用的分布式任务队列"
+    )
+    parser.add_argument("queue", help="任务队列文件")
+    parser.add_argument("-i", "--input", help="把作者列表（CSV或Excel）加入队列")
+    parser.add_argument("--name-column", help="作者姓名列名（默认自动识别）")
+    parser.add_argument("--institution-column", help="作者单位列名（默认自动识别）")
+    parser.add_argument("--sheet", help="Excel工作表名（默认第一个）")
+    parser.add_argument(
+        "--requeue",
+        action="store_true",
+        help="把未成功完成（被拦截、部分、错误、写出失败）和多次崩溃的作者放回队列",
+    )
+    parser.set_defaults(func=_run_queue)
+
+
+def _run_queue(args) -> int:
+    with open_work_queue(args.queue) as work_queue:
+        if args.input:
+            authors = read_authors(
+                args.input, args.name_column, args.institution_column, args.sheet
+            )
+            print(f"新加入 {work_queue.enqueue(authors)} 个作者")
+        if args.requeue:
+            statuses = (
+                STATUS_BLOCKED,
+                STATUS_INCOMPLETE,
+                STATUS_FAILED,
+                STATUS_SKIPPED,
+                STATUS_WRITE_FAILED,
+            )
+            print(f"放回队列 {work_queue.requeue(statuses=statuses)} 个作者")
+        for state, count in work_queue.counts().items():
+            print(f"{state}: {count}")
+    return 0
+
+
+def _year_range(text: str):
+    """解析 2020-2023、2020-、-2023 或 2021"""
+    start, sep, end = text.partition("-")
+    try:
+        start = int(start) if start.strip() else None
+        end = int(end) if end.strip() else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"年份范围格式应为 2020-2023：{text}"
+        ) from None
+    return (start, end) if sep else (start, start)
+
+
+def _add_search_parser(subparsers):
+    parser = subparsers.add_parser(
+        "search", help="在论文库（.db）的标题、摘要和关键词中全文检索"
+    )
+    parser.add_argument("store", help="crawl --output papers.db 生成的论文库")
+    parser.add_argument("query", help="检索词，空格分隔的多个词需同时出现")
+    parser.add_argument("--author", help="只检索该检索作者的论文")
+    parser.add_argument(
+        "--years", type=_year_range, metavar="RANGE", help="发表年份范围，如 2020-2023"
+    )
+    parser.add_argument(
+        "-n", "--limit", type=int, default=20, help="最多显示的条数（默认20）"
+    )
+    parser.set_defaults(func=_run_search)
+
+
+def _run_search(args) -> int:
+    if not os.path.exists(args.store):
+        print(f"找不到论文库：{args.store}")
+        return 1
+    start = time.perf_counter()
+    with PaperStore(args.store) as store:
+        papers = store.search_local(
+            args.query, author=args.author, year_range=args.years, limit=args.limit
+        )
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for rank, paper in enumerate(papers, 1):
+        print(f"{rank:>3}. {paper['标题']}")
+        print(
+            f"     {paper['期刊']} {paper['发表日期']}  检索作者：{paper[AUTHOR_COLUMN]}"
+        )
+    print(f"\n找到 {len(papers)} 条结果，用时 {elapsed:.0f} 毫秒")
+    return 0 if papers else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构造命令行解析器"""
+    parser = argparse.ArgumentParser(prog="office-auto", description="办公自动化工具")
+    parser.add_argument(
+        "--config",
+        metavar="FILE",
+        help="TOML配置文件，参数名同 config.Settings（默认读取环境变量 OFFICE_AUTO_CONFIG），"
+        "OFFICE_AUTO_<参数名大写> 环境变量优先于配置文件",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_crawl_parser(subparsers)
+    _add_replay_parser(subparsers)
+    _add_reextract_parser(subparsers)
+    _add_enrich_parser(subparsers)
+    _add_export_parser(subparsers)
+    _add_search_parser(subparsers)
+    _add_queue_parser(subparsers)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行主函数"""
+    # 先加载配置，命令行参数的默认值和之后创建的爬虫都使用加载后的配置
+    pre_parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    pre_parser.add_argument("--config")
+    config_args, _ = pre_parser.parse_known_args(argv)
+    try:
+        apply_settings(load_settings(config_args.config))
+    except (OSError, ValueError) as e:
+        print(f"❌ 无法加载配置：{str(e)}")
+        return 2
+
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        print("\n\n⚠️ 用户中断操作")
+        return 130
+    except (OSError, ValueError) as e:
+        print(f"❌ {str(e)}")
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,25 +14,39 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+
+from .config import CRAWLER_CONFIG
+from .prewarm import chromedriver_path
 
 
 class CNKICrawler:
     """知网论文爬虫类"""
 
-    def __init__(self, headless: bool = True, wait_time: int = 10):
+    def __init__(
+        self,
+        headless: Optional[bool] = None,
+        wait_time: Optional[int] = None,
+        driver=None,
+    ):
         """
         初始化爬虫
 
         Args:
-            headless: 是否使用无头模式
-            wait_time: 页面加载等待时间
+            headless: 是否使用无头模式，默认取配置 headless
+            wait_time: 页面加载等待时间，默认取配置 wait_time
+            driver: 使用已有的WebDriver（如测试用的FakeDriver），不再启动Chrome
         """
-        self.base_url = "https://kns.cnki.net"
-        self.search_url = "https://kns.cnki.net/kns8/AdvSearch"
-        self.wait_time = wait_time
+        self.base_url = CRAWLER_CONFIG["base_url"]
+        self.search_url = CRAWLER_CONFIG["search_url"]
+        self.wait_time = CRAWLER_CONFIG["wait_time"] if wait_time is None else wait_time
         self.driver = None
-        self.setup_driver(headless)
+        if driver is not None:
+            self.driver = driver
+            self.wait = WebDriverWait(self.driver, self.wait_time)
+        else:
+            self.setup_driver(
+                CRAWLER_CONFIG["headless"] if headless is None else headless
+            )
 
     def setup_driver(self, headless: bool = True):
         """设置Chrome驱动"""
@@ -42,18 +56,17 @@ class CNKICrawler:
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument(
-            "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
+        chrome_options.add_argument(f"--window-size={CRAWLER_CONFIG['window_size']}")
+        chrome_options.add_argument(f"--user-agent={CRAWLER_CONFIG['user_agent']}")
 
         # 自动下载并设置Chrome驱动
-        service = Service(ChromeDriverManager().install())
+        service = Service(chromedriver_path())
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.driver.set_page_load_timeout(CRAWLER_CONFIG["page_load_timeout"])
         self.wait = WebDriverWait(self.driver, self.wait_time)
 
     def search_papers(
-        self, author_name: str, institution: str = "", max_pages: int = 5
+        self, author_name: str, institution: str = "", max_pages: Optional[int] = None
     ) -> List[Dict]:
         """
         搜索论文
@@ -61,11 +74,13 @@ class CNKICrawler:
         Args:
             author_name: 作者姓名
             institution: 作者单位
-            max_pages: 最大搜索页数
+            max_pages: 最大搜索页数，默认取配置 max_pages
 
         Returns:
             论文信息列表
         """
+        if max_pages is None:
+            max_pages = CRAWLER_CONFIG["max_pages"]
         papers = []
 
         try:
@@ -145,7 +160,7 @@ class CNKICrawler:
             search_button.click()
 
             # 等待搜索结果页面加载
-            time.sleep(5)
+            time.sleep(CRAWLER_CONFIG["search_delay"])
 
         except Exception as e:
             print(f"执行搜索时出错: {str(e)}")
@@ -175,7 +190,7 @@ class CNKICrawler:
                     break
 
                 current_page += 1
-                time.sleep(2)
+                time.sleep(CRAWLER_CONFIG["page_delay"])
 
             except Exception as e:
                 print(f"爬取第 {current_page} 页时出错: {str(e)}")
@@ -213,6 +228,8 @@ class CNKICrawler:
             # 论文标题
             title_element = item_element.find_element(By.XPATH, ".//a[@class='fz14']")
             title = title_element.text.strip()
+            # 详情页链接，供后续补充摘要等信息
+            url = title_element.get_attribute("href") or ""
 
             # 作者信息
             authors = ""
@@ -274,6 +291,7 @@ class CNKICrawler:
                 "发表日期": date,
                 "被引次数": citations,
                 "下载次数": downloads,
+                "链接": url,
             }
 
         except Exception as e:
@@ -6,36 +6,145 @@
 
 import re
 import time
-from typing import Dict, List, Optional
+from contextlib import contextmanager, nullcontext
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
 
-import pandas as pd
 from selenium import webdriver
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+
+from .config import CRAWLER_CONFIG, FROM_CONFIG
+from .deadline import Deadline
+from .delay_tuner import PHASE_PAGE, PHASE_SEARCH, DelayTuner
+from .dedup import normalize_date, paper_fingerprint, unique_papers
+from .metrics import Metrics
+from .page_classifier import (
+    BLOCKING_STATUSES,
+    PAGE_OK,
+    classify_driver_page,
+    classify_page,
+)
+from .prewarm import chromedriver_path
+from .process_stats import driver_rss_mb
+from .profiling import Profiler
+from .rate_limit import PAGE_REQUESTS
+from .sinks import papers_to_dataframe
+
+# 搜索结果状态（除页面状态外）
+STATUS_EMPTY = "empty"  # 搜索完成但没有结果
+STATUS_ERROR = "error"  # 搜索过程出错
+STATUS_PARTIAL = "partial"  # 时间预算耗尽，只返回了部分结果
+
+# 结果列表"发表时间"排序选项（知网默认按相关度排序）
+SORT_BY_DATE_SELECTORS = [
+    "#orderList [data-sort='PT']",
+    "#orderList [sort='PT']",
+    ".order-group [data-sort='PT']",
+    "[data-sort='PT']",
+]
+
+# 每页结果数选项，{n} 为每页条数
+PAGE_SIZE_SELECTORS = [
+    "#perPageDiv [data-val='{n}']",
+    ".perpage-content [data-val='{n}']",
+    "[data-val='{n}'][data-type='pagesize']",
+]
+
+# 结果总数（"共找到 1,234 条结果"）
+RESULT_COUNT_SELECTORS = [".pagerTitleCell em", ".pagerTitleCell"]
+
+# 结果列表容器选择器
+RESULT_CONTAINER_SELECTOR = ".result-table-list, .searchResult, .search-result"
+
+# 结果列表项选择器（按优先级）
+RESULT_ITEM_SELECTORS = [
+    ".result-table-list tr:not(:first-child)",  # 传统表格形式
+    ".searchResult .result-item",  # 新版结果项
+    ".search-result .item",  # 另一种结果项
+    ".literature-item",  # 文献项
+    "[data-index]",  # 带索引的项目
+]
+
+
+def build_search_query(author_name: str, institution: str = "") -> str:
+    """构造知网检索式"""
+    search_query = f"作者:{author_name}"
+    if institution:
+        search_query += f" AND 单位:{institution}"
+    return search_query
 
 
 class CNKICrawlerImproved:
     """知网论文爬虫类 - 改进版"""
 
-    def __init__(self, headless: bool = True, wait_time: int = 15):
+    def __init__(
+        self,
+        headless: Optional[bool] = None,
+        wait_time: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+        driver=None,
+        recorder=None,
+        profile_pool=None,
+        delays: Optional[DelayTuner] = None,
+    ):
         """
         初始化爬虫
 
         Args:
-            headless: 是否使用无头模式
-            wait_time: 页面加载等待时间
+            headless: 是否使用无头模式，默认取配置 headless
+            wait_time: 等待页面元素出现的超时时间，默认取配置 wait_time
+            metrics: 运行指标收集器，多个爬虫可以共用一个
+            driver: 使用已有的WebDriver（如测试用的FakeDriver），不再启动Chrome
+            recorder: 页面录制器（PageRecorder），录制每次搜索经过的页面
+            profile_pool: 持久浏览器配置目录池（ProfilePool），Chrome使用其中一个独占的目录，
+                保留上次运行的Cookie和缓存
+            delays: 等待时间调整器（DelayTuner），多个爬虫共用时一起调整；
+                默认不调整，固定使用配置中的 search_delay 和 page_delay
         """
-        self.base_url = "https://kns.cnki.net"
-        self.search_url = "https://kns.cnki.net/kns8s/"  # 更新URL
-        self.wait_time = wait_time
+        self.base_url = CRAWLER_CONFIG["base_url"]
+        self.search_url = f"{self.base_url}/kns8s/"  # 更新URL
+        self.host = urlparse(self.base_url).netloc
+        self.wait_time = CRAWLER_CONFIG["wait_time"] if wait_time is None else wait_time
+        self.headless = CRAWLER_CONFIG["headless"] if headless is None else headless
+        self.page_load_timeout = CRAWLER_CONFIG["page_load_timeout"]
+        self.page_size = CRAWLER_CONFIG["page_size"]
         self.driver = None
-        self.setup_driver(headless)
+        # 当前浏览器已加载的页面数（打开页面和翻页），用于判断是否需要重启浏览器
+        self.pages_served = 0
+        # 最近一次搜索的状态，供批量调度判断是否需要冷却
+        self.last_status = PAGE_OK
+        # 当前搜索的时间预算
+        self.deadline: Optional[Deadline] = None
+        # 增量模式：作者已有论文的指纹，以及需要重新获取计数的最早日期
+        self._known: Optional[Set[int]] = None
+        self._refresh_cutoff = ""
+        # 增量模式下已提取的最后一个发表日期，用于确认结果确实按日期降序
+        self._last_date = ""
+        # 流水线模式：结果页HTML交给该回调解析，浏览器线程不再提取
+        self._on_page: Optional[Callable[[str, str], None]] = None
+        self.pages_handed_off = 0
+        # 最近一次搜索页面显示的结果总数（读不到时为None），以及结果是否超出了翻页上限
+        self.result_count: Optional[int] = None
+        self.truncated = False
+        self._abort_if_truncated = False
+        self.metrics = metrics or Metrics()
+        self.delays = delays or DelayTuner(adaptive=False)
+        self.recorder = recorder
+        self.profile_pool = profile_pool
+        # 当前浏览器使用的持久配置目录
+        self.profile = None
+        # 当前搜索已录制的页面
+        self._recording: Optional[List[Dict]] = None
+        if driver is not None:
+            self.attach_driver(driver)
+        else:
+            self.setup_driver(self.headless)
 
     def setup_driver(self, headless: bool = True):
         """设置Chrome驱动"""
@@ -49,18 +158,117 @@ class CNKICrawlerImproved:
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--disable-web-security")
         chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument(
-            "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
+        chrome_options.add_argument(f"--window-size={CRAWLER_CONFIG['window_size']}")
+        chrome_options.add_argument(f"--user-agent={CRAWLER_CONFIG['user_agent']}")
 
-        # 自动下载并设置Chrome驱动
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, self.wait_time)
+        if self.profile_pool is not None:
+            self.profile = self.profile_pool.acquire()
+            for argument in self.profile.chrome_arguments(self.profile_pool.cache_mb):
+                chrome_options.add_argument(argument)
+
+        try:
+            # 自动下载并设置Chrome驱动
+            with self.metrics.timer("driver_install"):
+                service = Service(chromedriver_path())
+            with self.metrics.timer("driver_startup"):
+                driver = webdriver.Chrome(service=service, options=chrome_options)
+        except Exception:
+            self._release_profile()
+            raise
+        self.attach_driver(driver)
+
+    def attach_driver(self, driver):
+        """使用给定的WebDriver"""
+        self.driver = driver
+        # 内存中的驱动（FakeDriver、回放）不需要等待页面加载和翻页间隔
+        self.offline = getattr(driver, "offline", False)
+        if self.offline:
+            self.wait = WebDriverWait(self.driver, 0, poll_frequency=0.001)
+        else:
+            self.wait = WebDriverWait(self.driver, self.wait_time)
+        self._page_load_timeout = None
+        self.pages_served = 0
+
+    def browser_rss_mb(self) -> Optional[float]:
+        """浏览器进程树当前的内存占用（MB），无法统计时返回None"""
+        return driver_rss_mb(self.driver)
+
+    def needs_recycle(
+        self,
+        max_pages: Optional[int] = FROM_CONFIG,
+        max_rss_mb: Optional[float] = FROM_CONFIG,
+    ) -> bool:
+        """
+        浏览器是否已超过页面数或内存阈值
+
+        Args:
+            max_pages: 页面数阈值，None表示不检查，默认取配置 recycle_pages
+            max_rss_mb: 内存阈值（MB），None表示不检查，默认取配置 recycle_rss_mb
+        """
+        if max_pages is FROM_CONFIG:
+            max_pages = CRAWLER_CONFIG["recycle_pages"]
+        if max_rss_mb is FROM_CONFIG:
+            max_rss_mb = CRAWLER_CONFIG["recycle_rss_mb"]
+        if max_pages and self.pages_served >= max_pages:
+            return True
+        if max_rss_mb:
+            rss = self.browser_rss_mb()
+            if rss is not None and rss >= max_rss_mb:
+                return True
+        return False
+
+    def export_cookies(self) -> List[Dict]:
+        """当前浏览器的Cookie，浏览器不可用时返回空列表"""
+        try:
+            return self.driver.get_cookies()
+        except Exception:
+            return []
+
+    def restore_cookies(self, cookies: List[Dict]):
+        """打开知网首页并写入Cookie"""
+        if not cookies:
+            return
+        try:
+            self._navigate(self.base_url)
+            for cookie in cookies:
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception:
+                    continue
+        except Exception as e:
+            print(f"恢复Cookie时出错: {str(e)}")
+
+    def recycle(self, keep_cookies: bool = True):
+        """关闭并重新创建浏览器，可选恢复Cookie"""
+        cookies = self.export_cookies() if keep_cookies else []
+
+        print(f"♻️ 重启浏览器（已加载 {self.pages_served} 个页面）")
+        try:
+            self.close()
+        except Exception as e:
+            print(f"关闭浏览器时出错: {str(e)}")
+        self.setup_driver(self.headless)
+        self.restore_cookies(cookies)
+
+    def maybe_recycle(self) -> bool:
+        """超过阈值时重启浏览器，应在两个作者之间调用"""
+        if self.needs_recycle():
+            self.recycle()
+            return True
+        return False
 
     def search_papers(
-        self, author_name: str, institution: str = "", max_pages: int = 5
+        self,
+        author_name: str,
+        institution: str = "",
+        max_pages: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        profile: Optional[str] = None,
+        known: Optional[Set[int]] = None,
+        refresh_days: Optional[int] = None,
+        on_page: Optional[Callable[[str, str], None]] = None,
+        query: Optional[str] = None,
+        abort_if_truncated: bool = False,
     ) -> List[Dict]:
         """
         搜索论文
@@ -68,78 +276,325 @@ class CNKICrawlerImproved:
         Args:
             author_name: 作者姓名
             institution: 作者单位
-            max_pages: 最大搜索页数
+            max_pages: 最大搜索页数，默认取配置 max_pages
+            deadline: 时间预算，耗尽后返回已获取的部分结果
+            profile: 剖析模式（cpu / memory / sample，可用逗号组合），
+                结果写入输出目录下的 profile 目录
+            known: 增量模式，该作者已保存论文的指纹（paper_fingerprint）；
+                结果按发表时间降序排列，遇到早于刷新窗口的已有论文即停止翻页
+            refresh_days: 增量模式下仍重新获取被引/下载次数的时间窗口（天），默认取配置
+            on_page: 流水线模式，每个结果页的 (URL, HTML) 交给该回调在其它线程解析，
+                此时返回空列表，pages_handed_off 为交出的页数；不能与 known 同时使用
+            query: 直接使用的检索式（例如多个作者的合并检索），默认由作者和单位构造
+            abort_if_truncated: 结果总数超过 max_pages 页时不再翻页，truncated 置为True
 
         Returns:
             论文信息列表
         """
+        if profile:
+            with Profiler(profile, name=f"search_{author_name}"):
+                return self.search_papers(
+                    author_name,
+                    institution,
+                    max_pages,
+                    deadline,
+                    known=known,
+                    refresh_days=refresh_days,
+                    on_page=on_page,
+                    query=query,
+                    abort_if_truncated=abort_if_truncated,
+                )
+        if max_pages is None:
+            max_pages = CRAWLER_CONFIG["max_pages"]
+        if refresh_days is None:
+            refresh_days = CRAWLER_CONFIG["refresh_days"]
+        if on_page is not None and known is not None:
+            raise ValueError("增量模式需要在浏览器线程中提取论文，不能使用流水线")
+
         papers = []
+        self.last_status = PAGE_OK
+        self.deadline = deadline
+        self._on_page = on_page
+        self.pages_handed_off = 0
+        self.result_count = None
+        self.truncated = False
+        self._abort_if_truncated = abort_if_truncated
+        search_query = query or build_search_query(author_name, institution)
+        if self.recorder is not None:
+            self._recording = []
 
         try:
             print(f"正在搜索作者: {author_name}, 单位: {institution}")
 
             # 方法1：尝试直接搜索URL构造
-            success = self._try_direct_search(author_name, institution)
+            with self.metrics.timer("search_direct"):
+                success = self._try_direct_search(search_query)
 
-            if not success:
+            if not success and not self.is_blocked() and not self._out_of_time():
                 # 方法2：尝试访问搜索页面填写表单
-                success = self._try_form_search(author_name, institution)
+                self.metrics.incr("form_fallbacks")
+                with self.metrics.timer("search_form"):
+                    success = self._try_form_search(search_query)
+
+            if success and self.page_size:
+                self._set_page_size(self.page_size)
+                success = not self.is_blocked()
+
+            if success and known is not None:
+                # 只有按日期排序后才能在遇到旧论文时停止，否则退回完整爬取
+                if self._sort_by_date():
+                    self._known = known
+                    self._last_date = ""
+                    self._refresh_cutoff = (
+                        date.today() - timedelta(days=refresh_days)
+                    ).isoformat()
+                success = not self.is_blocked()
 
             if success:
                 # 爬取搜索结果
                 papers = self._crawl_search_results(max_pages)
+                self.metrics.incr("rows", len(papers))
+                if (
+                    not papers
+                    and not self.pages_handed_off
+                    and self.last_status == PAGE_OK
+                ):
+                    self.last_status = STATUS_EMPTY
+            elif self.is_blocked():
+                print(f"⛔ 知网返回了拦截页面（{self.last_status}），放弃本次搜索")
+            elif self._out_of_time():
+                self.last_status = STATUS_PARTIAL
+                print("⏱ 时间预算已耗尽，放弃本次搜索")
             else:
+                self.last_status = STATUS_ERROR
                 print("❌ 无法完成搜索，请检查网络连接或知网可访问性")
 
         except Exception as e:
+            self.last_status = STATUS_PARTIAL if self._out_of_time() else STATUS_ERROR
             print(f"搜索过程中出现错误: {str(e)}")
+        finally:
+            self.deadline = None
+            self._known = None
+            self._on_page = None
+            self.metrics.incr(f"search_{self.last_status}")
+            if self._recording is not None:
+                self.recorder.write_search(
+                    author_name,
+                    institution,
+                    max_pages,
+                    self.last_status,
+                    self._recording,
+                )
+                self._recording = None
 
         return papers
 
-    def _try_direct_search(self, author_name: str, institution: str = "") -> bool:
-        """尝试通过直接构造搜索URL进行搜索"""
+    def _out_of_time(self) -> bool:
+        """当前搜索的时间预算是否已耗尽"""
+        return self.deadline is not None and self.deadline.expired()
+
+    def _sleep(self, seconds: float):
+        """受时间预算约束的休眠"""
+        if self.offline:
+            return
+        if self.deadline is not None:
+            self.deadline.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    def _waiter(self) -> WebDriverWait:
+        """返回受时间预算约束的WebDriverWait"""
+        if self.deadline is None or self.offline:
+            return self.wait
+        return WebDriverWait(self.driver, self.deadline.cap(self.wait_time))
+
+    @contextmanager
+    def _checkpoint(self, label: str):
+        """
+        录制/回放同步点
+
+        录制时在with块执行后保存当前页面；回放时在with块执行前载入录制的页面，
+        两种模式下爬虫按相同顺序经过同步点，因此回放结果与录制时一致
+        """
+        replay = getattr(self.driver, "replay_checkpoint", None)
+        if replay is not None:
+            replay(label)
         try:
-            print("尝试直接搜索方式...")
+            yield
+        finally:
+            if self._recording is not None:
+                self.recorder.snapshot(self.driver, label, self._recording)
+
+    def _reserve_request(self) -> float:
+        """
+        按配置 min_request_interval 预约一次页面请求（本进程所有浏览器共用）
+
+        Returns:
+            发出请求前还需等待的秒数，离线时为0
+        """
+        if self.offline:
+            return 0.0
+        return PAGE_REQUESTS.reserve()
+
+    def _throttle(self):
+        """预约页面请求并等待到预约的时刻"""
+        wait = self._reserve_request()
+        if wait > 0:
+            self._sleep(wait)
+
+    def _navigate(self, url: str):
+        """打开页面，页面加载超时同样受时间预算约束"""
+        timeout = self.page_load_timeout
+        if self.deadline is not None:
+            timeout = max(1, self.deadline.cap(self.page_load_timeout))
+        self._throttle()
+        if timeout != self._page_load_timeout:
+            self.driver.set_page_load_timeout(timeout)
+            self._page_load_timeout = timeout
+        with self._checkpoint("navigate"):
+            self.driver.get(url)
+        self.pages_served += 1
+
+    def is_blocked(self) -> bool:
+        """最近一次搜索是否遇到验证码、登录墙或封禁页面"""
+        return self.last_status in BLOCKING_STATUSES
+
+    def _check_page_status(self) -> bool:
+        """
+        检查当前页面是否为验证码、登录墙或封禁页面
+
+        Returns:
+            页面正常返回True，被拦截返回False
+        """
+        status = classify_driver_page(self.driver)
+        if status in BLOCKING_STATUSES:
+            self.last_status = status
+            return False
+        return True
+
+    def _wait_for_results(self) -> bool:
+        """
+        等待搜索结果出现，遇到拦截页面时立即返回
+
+        Returns:
+            结果列表已加载返回True，超时或被拦截返回False
+        """
+        return self._poll_results() is not None
+
+    def _poll_results(
+        self, signature: Optional[str] = None, require_rows: bool = False
+    ) -> Optional[int]:
+        """
+        等待结果列表出现，遇到拦截页面时立即返回
 
-            # 构造搜索参数
-            search_query = f"作者:{author_name}"
-            if institution:
-                search_query += f" AND 单位:{institution}"
+        Args:
+            signature: 翻页前第一条结果的文本，第一条结果变化后才算新页面已加载
+            require_rows: 结果列表中出现结果行才算已加载；容器先于结果行渲染，
+                容器出现后 search_delay 秒仍没有结果行时认为没有结果
+
+        Returns:
+            结果列表已加载时返回检查的次数（1表示第一次检查时已就绪），超时或被拦截返回None
+        """
+        checks = 0
+        start = time.monotonic()
+        settle = 0 if self.offline else CRAWLER_CONFIG["search_delay"]
+
+        def results_or_blocked(driver):
+            nonlocal checks
+            checks += 1
+            if driver.find_elements(By.CSS_SELECTOR, RESULT_CONTAINER_SELECTOR):
+                if signature is not None:
+                    if self._result_signature() != signature:
+                        return True
+                elif not require_rows or self._result_signature() is not None:
+                    return True
+                elif time.monotonic() - start >= settle:
+                    return True
+            return not self._check_page_status()
+
+        # 翻页后的页面由提取前的 "page" 同步点录制，这里不再单独录制
+        checkpoint = self._checkpoint("results") if signature is None else nullcontext()
+        try:
+            with checkpoint:
+                self._waiter().until(results_or_blocked)
+        except TimeoutException:
+            return None
+        return None if self.is_blocked() else checks
 
-            # 构造搜索URL（基于知网的搜索参数）
-            search_url = f"{self.base_url}/kns8s/search?crossref=N&kw={search_query}"
+    def _result_signature(self) -> Optional[str]:
+        """当前页面第一条结果的文本"""
+        for selector in RESULT_ITEM_SELECTORS:
+            items = self.driver.find_elements(By.CSS_SELECTOR, selector)
+            if items:
+                return items[0].text[:200]
+        return None
+
+    def _await_ready(self, phase: str, signature: Optional[str] = None) -> bool:
+        """
+        按自适应的等待时间等待结果页，把等待结束时页面是否已就绪反馈给调整器
+
+        Args:
+            phase: 等待阶段（PHASE_SEARCH、PHASE_PAGE）
+            signature: 翻页前第一条结果的文本
+
+        Returns:
+            结果列表已加载返回True，超时或被拦截返回False
+        """
+        delay = self.delays.delay(self.host, phase)
+        start = time.monotonic()
+        with self.metrics.timer("page_wait"):
+            self._sleep(delay)
+            checks = self._poll_results(signature, require_rows=phase == PHASE_SEARCH)
+        # 超时、被拦截和没有结果行的页面不说明页面快慢；时间预算截短了等待时同样不计
+        if (
+            checks is not None
+            and not self.offline
+            and not self._out_of_time()
+            and self._result_signature() is not None
+        ):
+            self.delays.observe(self.host, phase, ready=checks == 1)
+            self.metrics.observe(f"ready_{phase}", time.monotonic() - start)
+        return checks is not None
+
+    def build_search_url(self, author_name: str, institution: str = "") -> str:
+        """构造直接搜索URL（基于知网的搜索参数）"""
+        return self.build_query_url(build_search_query(author_name, institution))
+
+    def build_query_url(self, search_query: str) -> str:
+        """构造检索式对应的搜索URL"""
+        return f"{self.base_url}/kns8s/search?crossref=N&kw={search_query}"
+
+    def _try_direct_search(self, search_query: str) -> bool:
+        """尝试通过直接构造搜索URL进行搜索"""
+        try:
+            print("尝试直接搜索方式...")
 
-            self.driver.get(search_url)
-            time.sleep(5)
+            self._navigate(self.build_query_url(search_query))
+            if not self._check_page_status():
+                return False
 
             # 检查是否成功进入搜索结果页面
-            try:
-                self.wait.until(
-                    EC.presence_of_element_located(
-                        (
-                            By.CSS_SELECTOR,
-                            ".result-table-list, .searchResult, .search-result",
-                        )
-                    )
-                )
+            if self._await_ready(PHASE_SEARCH):
                 print("✅ 直接搜索成功")
                 return True
-            except TimeoutException:
+            if not self.is_blocked():
                 print("直接搜索未成功，尝试其他方式...")
-                return False
+            return False
 
         except Exception as e:
             print(f"直接搜索方式失败: {str(e)}")
             return False
 
-    def _try_form_search(self, author_name: str, institution: str = "") -> bool:
+    def _try_form_search(self, search_query: str) -> bool:
         """尝试通过填写搜索表单进行搜索"""
         try:
             print("尝试表单搜索方式...")
 
             # 访问知网主页
-            self.driver.get(self.base_url)
-            time.sleep(3)
+            self._navigate(self.base_url)
+            if not self._check_page_status():
+                return False
+            self._sleep(3)
 
             # 尝试多种搜索框定位策略
             search_input = None
@@ -163,34 +618,20 @@ class CNKICrawlerImproved:
                 print("未找到搜索输入框")
                 return False
 
-            # 构造搜索查询
-            search_query = f"作者:{author_name}"
-            if institution:
-                search_query += f" AND 单位:{institution}"
-
             # 输入搜索条件
             search_input.clear()
             search_input.send_keys(search_query)
             search_input.send_keys(Keys.RETURN)
 
             print(f"已输入搜索条件: {search_query}")
-            time.sleep(5)
 
             # 检查搜索结果
-            try:
-                self.wait.until(
-                    EC.presence_of_element_located(
-                        (
-                            By.CSS_SELECTOR,
-                            ".result-table-list, .searchResult, .search-result",
-                        )
-                    )
-                )
+            if self._await_ready(PHASE_SEARCH):
                 print("✅ 表单搜索成功")
                 return True
-            except TimeoutException:
+            if not self.is_blocked():
                 print("表单搜索未返回结果")
-                return False
+            return False
 
         except Exception as e:
             print(f"表单搜索方式失败: {str(e)}")
@@ -199,41 +640,213 @@ class CNKICrawlerImproved:
     def _crawl_search_results(self, max_pages: int = 5) -> List[Dict]:
         """爬取搜索结果"""
         papers = []
+        seen: set = set()
         current_page = 1
 
         while current_page <= max_pages:
+            if self._out_of_time():
+                self.last_status = STATUS_PARTIAL
+                print(f"⏱ 时间预算已耗尽，停止于第 {current_page} 页")
+                break
+
             try:
                 print(f"正在爬取第 {current_page} 页...")
 
-                # 等待搜索结果加载
-                time.sleep(3)
-
-                # 获取当前页面的论文列表
-                page_papers = self._extract_papers_from_page()
+                if self._on_page is not None:
+                    # 流水线模式：只取页面HTML，提取交给解析线程
+                    if not self._hand_off_page():
+                        print(f"⛔ 第 {current_page} 页被拦截（{self.last_status}）")
+                        break
+                else:
+                    # 获取当前页面的论文列表
+                    with self.metrics.timer("extract"), self._checkpoint("page"):
+                        page_papers = self._extract_papers_from_page()
+                    self.metrics.incr("pages")
+
+                    if not page_papers:
+                        if not self._check_page_status():
+                            print(
+                                f"⛔ 第 {current_page} 页被拦截（{self.last_status}）"
+                            )
+                            break
+                        print(f"第 {current_page} 页没有找到论文数据")
+                        if current_page == 1:
+                            print("第一页就没有数据，可能搜索条件有误或网站结构变化")
+                        break
 
-                if not page_papers:
-                    print(f"第 {current_page} 页没有找到论文数据")
-                    if current_page == 1:
-                        print("第一页就没有数据，可能搜索条件有误或网站结构变化")
-                    break
+                    # 翻页过程中结果列表可能移动，跳过前面页面已出现的论文
+                    fresh = unique_papers(page_papers, seen)
+                    if len(fresh) < len(page_papers):
+                        self.metrics.incr("duplicates", len(page_papers) - len(fresh))
+                    fresh, reached_known = self._trim_known(fresh)
+                    papers.extend(fresh)
+                    print(f"第 {current_page} 页获取到 {len(page_papers)} 篇论文")
+
+                    if current_page == 1 and self._exceeds_pages(
+                        len(page_papers), max_pages
+                    ):
+                        self.truncated = True
+                        print(
+                            f"结果共 {self.result_count} 条，超出 {max_pages} 页的翻页上限"
+                        )
+                        if self._abort_if_truncated:
+                            break
 
-                papers.extend(page_papers)
-                print(f"第 {current_page} 页获取到 {len(page_papers)} 篇论文")
+                    if reached_known:
+                        self.metrics.incr("incremental_stops")
+                        print("已到达上次保存的论文，停止翻页")
+                        break
 
                 # 尝试翻到下一页
-                if not self._go_to_next_page():
+                with self.metrics.timer("paginate"):
+                    has_next = self._go_to_next_page()
+                if not has_next:
                     print("没有更多页面")
                     break
 
                 current_page += 1
-                time.sleep(2)
+                if current_page > max_pages:
+                    # 已到翻页上限但仍有下一页
+                    self.truncated = True
+                    break
 
             except Exception as e:
+                if self._out_of_time():
+                    self.last_status = STATUS_PARTIAL
                 print(f"爬取第 {current_page} 页时出错: {str(e)}")
                 break
 
         return papers
 
+    def _read_result_count(self) -> Optional[int]:
+        """读取结果页显示的结果总数，读不到返回None"""
+        for selector in RESULT_COUNT_SELECTORS:
+            for element in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                digits = re.search(r"\d[\d,]*", element.text)
+                if digits:
+                    return int(digits.group().replace(",", ""))
+        return None
+
+    def _exceeds_pages(self, page_size: int, max_pages: int) -> bool:
+        """第一页的结果总数是否超出 max_pages 页"""
+        self.result_count = self._read_result_count()
+        return self.result_count is not None and (
+            self.result_count > page_size * max_pages
+        )
+
+    def _hand_off_page(self) -> bool:
+        """
+        把当前结果页的HTML交给流水线
+
+        Returns:
+            页面正常返回True，被拦截返回False
+        """
+        with self.metrics.timer("snapshot"), self._checkpoint("page"):
+            url, html = self.driver.current_url, self.driver.page_source
+        self.metrics.incr("pages")
+        status = classify_page(url, self.driver.title, html)
+        if status in BLOCKING_STATUSES:
+            self.last_status = status
+            return False
+        self._on_page(url, html)
+        self.pages_handed_off += 1
+        return True
+
+    def _set_page_size(self, size: int) -> bool:
+        """
+        切换每页显示的结果数
+
+        Returns:
+            切换成功返回True
+        """
+        for template in PAGE_SIZE_SELECTORS:
+            options = self.driver.find_elements(
+                By.CSS_SELECTOR, template.format(n=size)
+            )
+            if not options:
+                continue
+            try:
+                self._throttle()
+                self.driver.execute_script("arguments[0].click();", options[0])
+                self.pages_served += 1
+                self._sleep(self.delays.delay(self.host, PHASE_PAGE))
+                if self._wait_for_results():
+                    print(f"已切换为每页 {size} 条")
+                    return True
+            except Exception as e:
+                print(f"切换每页条数失败: {str(e)}")
+            return False
+
+        print(f"未找到每页 {size} 条的选项，使用网站默认值")
+        return False
+
+    def _sort_by_date(self) -> bool:
+        """
+        把结果列表切换为按发表时间降序
+
+        Returns:
+            排序成功返回True
+        """
+        for selector in SORT_BY_DATE_SELECTORS:
+            options = self.driver.find_elements(By.CSS_SELECTOR, selector)
+            if not options:
+                continue
+            try:
+                self._throttle()
+                self.driver.execute_script("arguments[0].click();", options[0])
+                self.pages_served += 1
+                # 排序后第一条结果可能不变，无法判断是否已刷新，只按当前翻页等待时间等待
+                self._sleep(self.delays.delay(self.host, PHASE_PAGE))
+                if self._wait_for_results():
+                    print("已按发表时间排序")
+                    return True
+            except Exception as e:
+                print(f"按发表时间排序失败: {str(e)}")
+            return False
+
+        print("未找到发表时间排序选项，按默认顺序完整爬取")
+        return False
+
+    def _dates_descending(self, papers: List[Dict]) -> bool:
+        """本页的发表日期（接着上一页）是否非递增，缺失的日期忽略"""
+        dates = [self._last_date] if self._last_date else []
+        dates += [
+            date
+            for date in (normalize_date(p.get("发表日期", "")) for p in papers)
+            if date
+        ]
+        if any(earlier < later for earlier, later in zip(dates, dates[1:])):
+            return False
+        if dates:
+            self._last_date = dates[-1]
+        return True
+
+    def _trim_known(self, papers: List[Dict]):
+        """
+        增量模式下截断到第一篇早于刷新窗口的已有论文
+
+        刷新窗口内的已有论文保留，以更新被引和下载次数；
+        发表日期不是降序时说明排序没有生效，关闭提前停止
+
+        Returns:
+            (保留的论文, 是否已到达旧论文)
+        """
+        if self._known is None:
+            return papers, False
+        if not self._dates_descending(papers):
+            # 排序点击可能没有生效（结果列表仍是旧的），按相关度排序时不能提前停止
+            self._known = None
+            self.metrics.incr("incremental_unsorted")
+            print("结果未按发表时间降序排列，完整爬取")
+            return papers, False
+        for i, paper in enumerate(papers):
+            if (
+                paper_fingerprint(paper) in self._known
+                and normalize_date(paper.get("发表日期", "")) < self._refresh_cutoff
+            ):
+                return papers[:i], True
+        return papers, False
+
     def _extract_papers_from_page(self) -> List[Dict]:
         """从当前页面提取论文信息"""
         papers = []
@@ -241,15 +854,7 @@ class CNKICrawlerImproved:
         try:
             # 尝试多种结果列表选择器
             paper_items = []
-            result_selectors = [
-                ".result-table-list tr:not(:first-child)",  # 传统表格形式
-                ".searchResult .result-item",  # 新版结果项
-                ".search-result .item",  # 另一种结果项
-                ".literature-item",  # 文献项
-                "[data-index]",  # 带索引的项目
-            ]
-
-            for selector in result_selectors:
+            for selector in RESULT_ITEM_SELECTORS:
                 try:
                     paper_items = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     if paper_items:
@@ -259,6 +864,7 @@ class CNKICrawlerImproved:
                     continue
 
             if not paper_items:
+                self.metrics.incr("selector_miss_list")
                 print("未找到论文列表项")
                 return papers
 
@@ -293,11 +899,14 @@ class CNKICrawlerImproved:
                 ".result-item-title a",
             ]
 
+            url = ""
             for selector in title_selectors:
                 try:
                     title_element = item_element.find_element(By.CSS_SELECTOR, selector)
                     title = title_element.text.strip()
                     if title:
+                        # 详情页链接，供后续补充摘要等信息
+                        url = title_element.get_attribute("href") or ""
                         break
                 except Exception:
                     continue
@@ -423,6 +1032,15 @@ class CNKICrawlerImproved:
             except Exception:
                 pass
 
+            # 统计未能定位的字段，便于发现页面结构变化
+            for field, value in (
+                ("title", title),
+                ("authors", authors),
+                ("journal", journal),
+            ):
+                if not value:
+                    self.metrics.incr(f"selector_miss_{field}")
+
             # 只有标题不为空才返回结果
             if title:
                 return {
@@ -432,6 +1050,7 @@ class CNKICrawlerImproved:
                     "发表日期": date,
                     "被引次数": citations,
                     "下载次数": downloads,
+                    "链接": url,
                 }
             else:
                 return None
@@ -441,7 +1060,21 @@ class CNKICrawlerImproved:
             return None
 
     def _go_to_next_page(self) -> bool:
-        """翻到下一页"""
+        """翻到下一页并等待新的一页加载"""
+        signature = self._result_signature()
+        if self._click_next_page():
+            # 新的一页没有按时出现（超时或被拦截）时照常提取，由提取结果判断
+            self._await_ready(PHASE_PAGE, signature)
+            return True
+        return False
+
+    def _click_next_page(self, throttle: bool = True) -> bool:
+        """
+        点击下一页按钮，不等待新页面加载
+
+        Args:
+            throttle: 点击前是否按请求限速等待，调用方已预约请求时传入False
+        """
         try:
             # 尝试多种下一页按钮选择器
             next_selectors = [
@@ -465,8 +1098,10 @@ class CNKICrawlerImproved:
                         continue
 
                     # 尝试点击
+                    if throttle:
+                        self._throttle()
                     self.driver.execute_script("arguments[0].click();", next_button)
-                    time.sleep(3)
+                    self.pages_served += 1
                     return True
 
                 except Exception:
@@ -481,8 +1116,10 @@ class CNKICrawlerImproved:
                 next_page_link = self.driver.find_element(
                     By.LINK_TEXT, str(next_page_num)
                 )
+                if throttle:
+                    self._throttle()
                 next_page_link.click()
-                time.sleep(3)
+                self.pages_served += 1
                 return True
             except Exception:
                 pass
@@ -500,25 +1137,32 @@ class CNKICrawlerImproved:
             return
 
         try:
-            # 创建DataFrame
-            df = pd.DataFrame(papers)
-
-            # 调整列顺序
-            columns_order = ["标题", "作者", "期刊", "发表日期", "被引次数", "下载次数"]
-            existing_columns = [col for col in columns_order if col in df.columns]
-            df = df[existing_columns]
+            # 按 EXCEL_COLUMNS 的列顺序，保留链接以便之后用 enrich 补充详情
+            df = papers_to_dataframe(papers)
 
             # 保存到Excel
-            df.to_excel(filename, index=False, engine="openpyxl")
+            with self.metrics.timer("save"):
+                df.to_excel(
+                    filename, index=False, engine=CRAWLER_CONFIG["excel_engine"]
+                )
             print(f"✅ 成功保存 {len(papers)} 篇论文信息到 {filename}")
 
         except Exception as e:
             print(f"❌ 保存Excel文件时出错: {str(e)}")
 
+    def _release_profile(self):
+        if self.profile is not None:
+            self.profile.close()
+            self.profile = None
+
     def close(self):
         """关闭浏览器"""
-        if self.driver:
-            self.driver.quit()
+        try:
+            if self.driver:
+                self.driver.quit()
+        finally:
+            # 浏览器退出后配置目录才能交给其它爬虫
+            self._release_profile()
 
     def __enter__(self):
         return self
@@ -1,26 +1,201 @@
 """
 知网爬虫配置文件
+
+所有可调参数集中在 Settings 中，默认值即字段的默认值。load_settings() 依次叠加TOML配置文件
+（OFFICE_AUTO_CONFIG 或 --config 指定）和 OFFICE_AUTO_<参数名大写> 环境变量，
+apply_settings() 写入 CRAWLER_CONFIG；各模块在创建爬虫、浏览器池、任务队列和输出时才读取
+CRAWLER_CONFIG，因此加载后创建的对象都使用新配置，无需修改代码
 """
 
-# 爬虫配置
-CRAWLER_CONFIG = {
+import json
+import os
+import tomllib
+from dataclasses import asdict, dataclass, field, fields
+from typing import (
+    Any,
+    Dict,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+# 指定TOML配置文件的环境变量，以及单个参数的环境变量前缀
+CONFIG_ENV = "OFFICE_AUTO_CONFIG"
+ENV_PREFIX = "OFFICE_AUTO_"
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+_NONE = ("", "none", "null")
+
+
+@dataclass
+class Settings:
+    """爬虫配置"""
+
     # 浏览器设置
-    "headless": False,  # 是否使用无头模式（True=不显示浏览器窗口）
-    "wait_time": 10,  # 页面加载等待时间（秒）
-    "window_size": "1920,1080",  # 浏览器窗口大小
+    headless: bool = False  # 是否使用无头模式（True=不显示浏览器窗口）
+    wait_time: int = 10  # 等待结果列表等页面元素出现的超时时间（秒）
+    page_load_timeout: float = 300  # 打开页面的超时时间（秒）
+    window_size: str = "1920,1080"  # 浏览器窗口大小
+    # 并发和限速
+    concurrency: int = 1  # 批量模式下并发的浏览器数量
+    tabs: int = 1  # 每个浏览器的标签页数量
+    # 同一进程内两次页面请求（打开页面、翻页）的最小间隔（秒），所有浏览器共用，0表示不限
+    min_request_interval: float = 0
     # 搜索设置
-    "max_pages": 5,  # 默认最大搜索页数
-    "page_delay": 2,  # 翻页延迟（秒）
-    "search_delay": 3,  # 搜索后等待时间（秒）
+    max_pages: int = 5  # 默认最大搜索页数
+    # 每页结果数（知网可选10/20/50），None表示使用网站默认值
+    page_size: Optional[int] = None
+    # 翻页延迟（秒），改进版爬虫指定 --delay-state 时以此为初始值按页面就绪时间自动调整
+    page_delay: float = 2
+    search_delay: float = 3  # 搜索后等待时间（秒），同上
+    # 自动调整的等待时间上下限（秒），下限保证访问频率不会过高
+    delay_bounds: Dict[str, Tuple[float, float]] = field(
+        default_factory=lambda: {"search": (1.5, 20), "page": (1.5, 15)}
+    )
+    delay_target: float = 0.9  # 等待结束时结果页已就绪的目标比例
+    delay_step: float = 0.5  # 等待时间每次调整的步长（秒）
+    block_cooldown: float = 60  # 遇到验证码/封禁页面后的冷却时间（秒）
+    # 批量模式下单个作者的时间预算（秒），None表示不限
+    author_budget: Optional[float] = 180
+    # 批量模式下整个批次的时间预算（秒），None表示不限
+    run_budget: Optional[float] = None
+    refresh_days: int = 365  # 增量模式下重新获取被引/下载次数的时间窗口（天）
+    cache_dir: Optional[str] = None  # 批量模式的搜索结果缓存目录，None表示不缓存
+    pipeline_queue_size: int = 16  # 流水线模式下各阶段的队列容量
+    writer_queue_size: int = 8  # 后台写出时等待写出的作者数上限
+    # 分布式队列中作者租约的期限（秒），工作进程每三分之一期限续租一次
+    lease_seconds: float = 300
+    lease_max_expirations: int = 3  # 租约过期（进程崩溃）多少次后不再分配该作者
+    # 队列中没有可领取的作者、但仍有其它进程持有租约时的轮询间隔（秒）
+    lease_poll: float = 10
+    # 持久浏览器配置目录的磁盘缓存上限（MB），None表示不限
+    profile_cache_mb: Optional[int] = 200
+    recycle_pages: Optional[int] = 500  # 浏览器加载多少个页面后重启，None表示不限
+    recycle_rss_mb: Optional[float] = 1500  # 浏览器内存超过多少MB后重启，None表示不限
+    # 详情页补充设置
+    detail_workers: int = 4  # 同时获取的详情页数量（HTTP线程数或标签页数）
+    detail_timeout: float = 20  # 单个详情页的超时时间（秒）
+    # 剖析设置
+    profile_sample_interval: float = 0.01  # 采样模式的栈采样间隔（秒）
+    # tracemalloc记录的调用栈深度，生产环境可设为1降低开销
+    profile_memory_frames: int = 10
     # 输出设置
-    "output_dir": "output",  # 输出目录
-    "excel_engine": "openpyxl",  # Excel引擎
+    output_dir: str = "output"  # 输出目录
+    excel_engine: str = "openpyxl"  # Excel引擎
+    spill_rows: int = 50000  # 汇总为单个Excel时内存中最多保留的行数，超过后写入临时文件
     # 知网URLs
-    "base_url": "https://kns.cnki.net",
-    "search_url": "https://kns.cnki.net/kns8/AdvSearch",
+    base_url: str = "https://kns.cnki.net"
+    search_url: str = "https://kns.cnki.net/kns8/AdvSearch"
     # User Agent
-    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-}
+    user_agent: str = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    )
+
+    @classmethod
+    def from_dict(cls, values: Mapping[str, Any]) -> "Settings":
+        """
+        由字典创建配置，字符串按字段类型解析（环境变量的值都是字符串）
+
+        Raises:
+            ValueError: 未知的参数名或无效的值
+        """
+        hints = get_type_hints(cls)
+        unknown = sorted(set(values) - set(hints))
+        if unknown:
+            raise ValueError(f"未知的配置项：{', '.join(unknown)}")
+        values = {name: _convert(name, v, hints[name]) for name, v in values.items()}
+        defaults = cls()
+        for name, value in values.items():
+            # 表只覆盖给出的键，例如只调整翻页的等待时间上下限
+            if isinstance(value, dict):
+                values[name] = {**getattr(defaults, name), **value}
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _convert(name: str, value: Any, hint) -> Any:
+    """把配置值转换为字段类型"""
+    if get_origin(hint) is Union:
+        if value is None or (isinstance(value, str) and value.strip().lower() in _NONE):
+            return None
+        hint = next(arg for arg in get_args(hint) if arg is not type(None))
+    if isinstance(value, str) and hint is not str:
+        text = value.strip()
+        if hint is bool and text.lower() in _TRUE + _FALSE:
+            return text.lower() in _TRUE
+        try:
+            value = json.loads(text)
+        except ValueError:
+            raise ValueError(f"配置项 {name} 的值无效：{value!r}") from None
+    if get_origin(hint) is dict:
+        if not isinstance(value, dict):
+            raise ValueError(f"配置项 {name} 应为表，实际为 {value!r}")
+        return {k: tuple(v) if isinstance(v, list) else v for k, v in value.items()}
+    if hint is float and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if not isinstance(value, hint) or (hint is not bool and isinstance(value, bool)):
+        raise ValueError(f"配置项 {name} 应为 {hint.__name__}，实际为 {value!r}")
+    return value
+
+
+def load_settings(
+    path: Optional[str] = None, environ: Optional[Mapping[str, str]] = None
+) -> Settings:
+    """
+    加载配置：默认值 < TOML配置文件 < 环境变量
+
+    Args:
+        path: TOML配置文件（顶层为参数名 = 值），默认取环境变量 OFFICE_AUTO_CONFIG
+        environ: 读取的环境变量，默认 os.environ
+
+    Raises:
+        OSError: 配置文件无法读取
+        ValueError: 配置文件格式错误、未知的参数名或无效的值
+    """
+    environ = os.environ if environ is None else environ
+    values: Dict[str, Any] = {}
+    path = path or environ.get(CONFIG_ENV)
+    if path:
+        with open(path, "rb") as f:
+            try:
+                values.update(tomllib.load(f))
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f"配置文件 {path} 格式错误：{str(e)}") from None
+    for item in fields(Settings):
+        env_name = ENV_PREFIX + item.name.upper()
+        if env_name in environ:
+            values[item.name] = environ[env_name]
+    return Settings.from_dict(values)
+
+
+def apply_settings(settings: Settings):
+    """让配置生效：之后创建的爬虫、浏览器池、任务队列和输出都读取这些值"""
+    CRAWLER_CONFIG.update(settings.to_dict())
+
+
+def current_settings() -> Settings:
+    """当前生效的配置"""
+    return Settings.from_dict(CRAWLER_CONFIG)
+
+
+class _FromConfig:
+    def __repr__(self):
+        return "FROM_CONFIG"
+
+
+# 参数默认值占位符（该参数的None另有含义时使用）：调用时才从 CRAWLER_CONFIG 读取
+FROM_CONFIG: Any = _FromConfig()
+
+# 爬虫配置（Settings 的字典形式，各模块从这里读取当前生效的值）
+CRAWLER_CONFIG: Dict[str, Any] = Settings().to_dict()
 
 # Excel列映射
 EXCEL_COLUMNS = {
@@ -32,6 +207,9 @@ EXCEL_COLUMNS = {
     "downloads": "下载次数",
     "url": "链接",
     "abstract": "摘要",
+    "keywords": "关键词",
+    "doi": "DOI",
+    "fund": "基金",
 }
 
 # 日期正则表达式模式
@@ -0,0 +1,62 @@
+"""
+截止时间（时间预算）模块
+为单个作者和整个批次设置时间上限，所有等待、重试和翻页都受其约束
+"""
+
+import time
+from typing import Optional
+
+
+class Deadline:
+    """可嵌套的截止时间"""
+
+    def __init__(
+        self, seconds: Optional[float] = None, parent: Optional["Deadline"] = None
+    ):
+        """
+        初始化截止时间
+
+        Args:
+            seconds: 时间预算（秒），None表示不限时
+            parent: 上级截止时间，子预算不会超过上级剩余时间
+        """
+        self.seconds = seconds
+        self.parent = parent
+        self.started_at = time.monotonic()
+        self.expires_at = None if seconds is None else self.started_at + seconds
+
+        if parent is not None and parent.expires_at is not None:
+            if self.expires_at is None or parent.expires_at < self.expires_at:
+                self.expires_at = parent.expires_at
+
+    def child(self, seconds: Optional[float] = None) -> "Deadline":
+        """创建受当前截止时间约束的子预算"""
+        return Deadline(seconds, parent=self)
+
+    def remaining(self) -> Optional[float]:
+        """剩余时间（秒），不限时返回None"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """是否已超时"""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def elapsed(self) -> float:
+        """已用时间（秒）"""
+        return time.monotonic() - self.started_at
+
+    def cap(self, seconds: float) -> float:
+        """将等待时间限制在剩余预算之内"""
+        remaining = self.remaining()
+        if remaining is None:
+            return seconds
+        return max(0.0, min(seconds, remaining))
+
+    def sleep(self, seconds: float):
+        """在剩余预算内休眠"""
+        seconds = self.cap(seconds)
+        if seconds > 0:
+            time.sleep(seconds)
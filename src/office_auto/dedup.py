@@ -0,0 +1,202 @@
+"""
+论文去重模块
+按规范化的 标题+期刊+日期 指纹去除跨页面、跨作者的重复论文，
+重复出现时只记录作者与论文的关联，可选持久化到SQLite
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+from .batch_input import author_key
+
+_NON_WORD = re.compile(r"[\W_]+")
+_NUMBER = re.compile(r"\d+")
+
+
+def _normalize_text(text: str) -> str:
+    """全半角统一、转小写并去掉空白和标点"""
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", text or "").lower())
+
+
+def normalize_date(date: str) -> str:
+    """2023-05-01、2023/5/1、2023年5月1日 统一为 2023-05-01"""
+    return "-".join(f"{int(n):02d}" for n in _NUMBER.findall(date or "")[:3])
+
+
+def paper_fingerprint(paper: Dict) -> int:
+    """
+    论文指纹
+
+    Returns:
+        64位有符号整数，可直接作为SQLite的INTEGER主键
+    """
+    key = "\x1f".join(
+        (
+            _normalize_text(paper.get("标题", "")),
+            _normalize_text(paper.get("期刊", "")),
+            normalize_date(paper.get("发表日期", "")),
+        )
+    )
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def unique_papers(papers: List[Dict], seen: Optional[Set[int]] = None) -> List[Dict]:
+    """
+    去掉指纹已出现过的论文
+
+    Args:
+        papers: 论文列表
+        seen: 已出现的指纹集合，会被更新；用于跨页面去重
+    """
+    seen = seen if seen is not None else set()
+    result = []
+    for paper in papers:
+        fingerprint = paper_fingerprint(paper)
+        if fingerprint not in seen:
+            seen.add(fingerprint)
+            result.append(paper)
+    return result
+
+
+class Reservation:
+    """DedupIndex.reserve() 预留的论文，写出后 commit() 或 rollback()"""
+
+    def __init__(self, key: str, fingerprints: List[int], new_rows: List[Tuple]):
+        self.key = key
+        self.fingerprints = fingerprints
+        self.new_rows = new_rows
+
+
+class DedupIndex:
+    """
+    跨作者去重索引（线程安全）
+
+    内存中只保存64位指纹；指定path时指纹和作者关联持久化到SQLite，
+    重新打开后继续去重，适合断点续跑和多次运行
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._seen: Set[int] = set()
+        self._links: Dict[str, Set[int]] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS papers (
+                    fingerprint INTEGER PRIMARY KEY,
+                    title TEXT,
+                    journal TEXT,
+                    date TEXT
+                );
+                CREATE TABLE IF NOT EXISTS author_papers (
+                    author_key TEXT NOT NULL,
+                    fingerprint INTEGER NOT NULL,
+                    PRIMARY KEY (author_key, fingerprint)
+                ) WITHOUT ROWID;
+                """)
+            self._seen.update(
+                row[0] for row in self._db.execute("SELECT fingerprint FROM papers")
+            )
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, paper: Dict) -> bool:
+        return paper_fingerprint(paper) in self._seen
+
+    def add(self, author_info: Dict, papers: List[Dict]) -> List[Dict]:
+        """
+        登记一个作者的论文
+
+        Returns:
+            之前未出现过的论文；重复的论文只记录与该作者的关联
+        """
+        new_papers, reservation = self.reserve(author_info, papers)
+        self.commit(reservation)
+        return new_papers
+
+    def reserve(
+        self, author_info: Dict, papers: List[Dict]
+    ) -> Tuple[List[Dict], Reservation]:
+        """
+        预留一个作者的论文：新论文立即计为已出现，其它作者不会再输出，但还不写入索引
+
+        论文写出成功后调用 commit() 登记论文和作者关联；写出失败时调用 rollback()，
+        这些论文不会被记为已输出，续跑时仍会写出
+
+        Returns:
+            (之前未出现过的论文, 预留记录)
+        """
+        fingerprints = [paper_fingerprint(paper) for paper in papers]
+        new_papers = []
+        new_rows = []
+        with self._lock:
+            for paper, fingerprint in zip(papers, fingerprints):
+                if fingerprint in self._seen:
+                    continue
+                self._seen.add(fingerprint)
+                new_papers.append(paper)
+                new_rows.append(
+                    (
+                        fingerprint,
+                        paper.get("标题", ""),
+                        paper.get("期刊", ""),
+                        paper.get("发表日期", ""),
+                    )
+                )
+        return new_papers, Reservation(author_key(author_info), fingerprints, new_rows)
+
+    def commit(self, reservation: Reservation):
+        """登记预留的论文和作者关联"""
+        with self._lock:
+            if self._db is None:
+                self._links.setdefault(reservation.key, set()).update(
+                    reservation.fingerprints
+                )
+                return
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO papers VALUES (?, ?, ?, ?)",
+                    reservation.new_rows,
+                )
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO author_papers VALUES (?, ?)",
+                    [(reservation.key, fp) for fp in reservation.fingerprints],
+                )
+
+    def rollback(self, reservation: Reservation):
+        """撤销预留：论文重新计为未出现，续跑时由本作者重新输出"""
+        with self._lock:
+            self._seen.difference_update(row[0] for row in reservation.new_rows)
+
+    def links_for(self, author_info: Dict) -> Set[int]:
+        """作者关联的全部论文指纹（包括被其他作者先登记的论文）"""
+        key = author_key(author_info)
+        with self._lock:
+            if self._db is None:
+                return set(self._links.get(key, ()))
+            return {
+                row[0]
+                for row in self._db.execute(
+                    "SELECT fingerprint FROM author_papers WHERE author_key = ?",
+                    (key,),
+                )
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
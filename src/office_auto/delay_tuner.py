@@ -0,0 +1,125 @@
+"""
+自适应等待时间模块
+搜索和翻页后先等待一段时间再读取结果页，固定的等待时间在网站快时白白浪费，慢时又不够。
+这里记录每次等待结束时结果页是否已经就绪，用随机逼近法把每个阶段的等待时间调整到目标分位数
+（默认90%的页面在等待结束时已就绪），并限制在礼貌上下限之内；调整后的值按站点保存到JSON文件，
+下次运行从上次的值开始
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from .config import CRAWLER_CONFIG
+
+# 等待阶段
+PHASE_SEARCH = "search"  # 提交搜索后等待结果列表
+PHASE_PAGE = "page"  # 翻页后等待新的一页
+
+
+class DelayTuner:
+    """
+    按站点和阶段自动调整等待时间，多个爬虫（线程）可以共用一个
+
+    每次等待后调用 observe()：页面已就绪则缩短 step*(1-target)，未就绪则延长 step*target，
+    稳定时恰好有 target 比例的页面在等待结束时已就绪
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        target: Optional[float] = None,
+        step: Optional[float] = None,
+        initial: Optional[Dict[str, float]] = None,
+        bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+        adaptive: bool = True,
+    ):
+        """
+        Args:
+            path: 保存调整结果的JSON文件，None表示只在内存中调整
+            target: 等待结束时页面已就绪的目标比例，默认取配置 delay_target
+            step: 调整步长（秒），默认取配置 delay_step
+            initial: 各阶段的初始等待时间，默认取 search_delay 和 page_delay
+            bounds: 各阶段等待时间的（下限, 上限），下限保证访问频率不会过高
+            adaptive: False时不调整，始终使用 initial 中的等待时间（不受 bounds 限制）
+        """
+        self.path = path
+        self.target = CRAWLER_CONFIG["delay_target"] if target is None else target
+        self.step = CRAWLER_CONFIG["delay_step"] if step is None else step
+        self.initial = initial or {
+            PHASE_SEARCH: CRAWLER_CONFIG["search_delay"],
+            PHASE_PAGE: CRAWLER_CONFIG["page_delay"],
+        }
+        self.bounds = bounds or CRAWLER_CONFIG["delay_bounds"]
+        self.adaptive = adaptive
+        self._delays: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        if path:
+            self._delays = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, float]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠ 无法读取等待时间记录 {self.path}：{str(e)}")
+            return {}
+
+    def _clamp(self, phase: str, seconds: float) -> float:
+        low, high = self.bounds[phase]
+        return min(max(seconds, low), high)
+
+    def _current(self, host: str, phase: str) -> float:
+        return self._clamp(
+            phase, self._delays.get(host, {}).get(phase, self.initial[phase])
+        )
+
+    def delay(self, host: str, phase: str) -> float:
+        """当前的等待时间（秒）"""
+        if not self.adaptive:
+            return self.initial[phase]
+        with self._lock:
+            return self._current(host, phase)
+
+    def observe(self, host: str, phase: str, ready: bool):
+        """
+        记录一次等待的结果
+
+        Args:
+            host: 站点
+            phase: 等待阶段
+            ready: 等待结束时页面是否已就绪
+        """
+        if not self.adaptive:
+            return
+        with self._lock:
+            current = self._current(host, phase)
+            if ready:
+                current -= self.step * (1 - self.target)
+            else:
+                current += self.step * self.target
+            self._delays.setdefault(host, {})[phase] = self._clamp(phase, current)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """各站点当前的等待时间"""
+        with self._lock:
+            return {
+                host: {phase: round(v, 3) for phase, v in phases.items()}
+                for host, phases in self._delays.items()
+            }
+
+    def save(self):
+        """把调整结果写回文件，保留文件中其它站点的记录"""
+        if not self.path:
+            return
+        delays = self._read()
+        delays.update(self.snapshot())
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(delays, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,379 @@
+"""
+详情页补充模块
+在列表爬取完成后单独运行，按论文的详情页链接并发获取摘要、关键词、DOI和基金信息
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import lxml.html
+import requests
+
+from .config import CRAWLER_CONFIG, EXCEL_COLUMNS
+from .page_classifier import BLOCKING_STATUSES, PAGE_OK, classify_page
+from .sinks import OutputSink, read_output
+
+URL_COLUMN = EXCEL_COLUMNS["url"]
+
+_TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+# 获取结果：(页面状态, HTML)，HTML为None表示获取失败；
+# 遇到验证码/登录/封禁页面后未再请求的链接也以该拦截状态返回
+FetchResult = Tuple[str, Optional[str]]
+
+# 详情页字段 -> 输出列名
+DETAIL_COLUMNS = {
+    "abstract": EXCEL_COLUMNS["abstract"],
+    "keywords": EXCEL_COLUMNS["keywords"],
+    "doi": EXCEL_COLUMNS["doi"],
+    "fund": EXCEL_COLUMNS["fund"],
+}
+
+
+def _joined(doc, selector: str) -> str:
+    """合并多个元素的文本，去掉知网在每项后附带的分号"""
+    items = [
+        el.text_content().strip().rstrip(";；").strip()
+        for el in doc.cssselect(selector)
+    ]
+    return "; ".join(item for item in items if item)
+
+
+def parse_detail_page(html: str) -> Dict[str, str]:
+    """
+    解析知网论文详情页
+
+    Returns:
+        以 DETAIL_COLUMNS 中的列名为键的字典，缺失的字段为空字符串
+    """
+    doc = lxml.html.document_fromstring(html or "<html></html>")
+
+    abstract = ""
+    for selector in ("#ChDivSummary", ".abstract-text", "span.abstract"):
+        elements = doc.cssselect(selector)
+        if elements:
+            abstract = " ".join(elements[0].text_content().split())
+            break
+
+    doi = ""
+    for label in doc.cssselect(".rowtit"):
+        if "DOI" in label.text_content().upper():
+            values = label.getparent().cssselect("p")
+            doi = values[0].text_content().strip() if values else ""
+            break
+
+    return {
+        DETAIL_COLUMNS["abstract"]: abstract,
+        DETAIL_COLUMNS["keywords"]: _joined(doc, "p.keywords a")
+        or _joined(doc, ".keywords"),
+        DETAIL_COLUMNS["doi"]: doi,
+        DETAIL_COLUMNS["fund"]: _joined(doc, "p.funds a") or _joined(doc, ".funds"),
+    }
+
+
+class DetailCache:
+    """按详情页链接缓存解析结果，重复运行时不再请求"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(
+            self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json"
+        )
+
+    def get(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, details: Dict):
+        path = self._path(url)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(details, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class HttpDetailFetcher:
+    """用线程池直接请求详情页，不需要浏览器"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        if workers is None:
+            workers = CRAWLER_CONFIG["detail_workers"]
+        if timeout is None:
+            timeout = CRAWLER_CONFIG["detail_timeout"]
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._blocked: Optional[str] = None
+
+    def _session(self) -> requests.Session:
+        # requests.Session不是线程安全的，每个线程一个
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = CRAWLER_CONFIG["user_agent"]
+            self._local.session = session
+        return session
+
+    def fetch(self, url: str) -> FetchResult:
+        # 已被拦截时不再请求，避免继续撞墙
+        if self._blocked is not None:
+            return self._blocked, None
+        try:
+            response = self._session().get(url, timeout=self.timeout)
+            if "charset" not in response.headers.get("content-type", "").lower():
+                # 没有声明编码时 requests 按 ISO-8859-1 解码文本，中文页面会乱码
+                response.encoding = response.apparent_encoding or "utf-8"
+            html = response.text
+            match = _TITLE.search(html)
+            status = classify_page(response.url, match.group(1) if match else "", html)
+            if status in BLOCKING_STATUSES:
+                self._blocked = status
+                return status, None
+            response.raise_for_status()
+            return PAGE_OK, html
+        except requests.RequestException as e:
+            print(f"获取详情页失败 {url}: {str(e)}")
+            return PAGE_OK, None
+
+    def fetch_many(self, urls: List[str]) -> Dict[str, FetchResult]:
+        """并发获取，返回 URL -> (页面状态, HTML)"""
+        self._blocked = None
+        return dict(zip(urls, self._pool.map(self.fetch, urls)))
+
+    def close(self):
+        self._pool.shutdown()
+
+
+class TabDetailFetcher:
+    """在一个浏览器的多个标签页中轮流加载详情页，适合需要浏览器Cookie的情况"""
+
+    def __init__(
+        self,
+        crawler,
+        tabs: Optional[int] = None,
+        timeout: Optional[float] = None,
+        poll_interval: float = 0.2,
+    ):
+        """
+        Args:
+            crawler: 提供浏览器的爬虫实例
+            tabs: 标签页数量
+            timeout: 单个详情页的超时时间（秒）
+            poll_interval: 所有标签页都在加载时的轮询间隔（秒）
+        """
+        if tabs is None:
+            tabs = CRAWLER_CONFIG["detail_workers"]
+        if timeout is None:
+            timeout = CRAWLER_CONFIG["detail_timeout"]
+        self.crawler = crawler
+        self.tabs = max(1, tabs)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.handles: List[str] = []
+
+    @property
+    def driver(self):
+        return self.crawler.driver
+
+    def _open_tabs(self):
+        if self.handles:
+            return
+        self.handles.append(self.driver.current_window_handle)
+        for _ in range(self.tabs - 1):
+            self.driver.switch_to.new_window("tab")
+            self.handles.append(self.driver.current_window_handle)
+
+    def _loaded(self, handle: str, previous_url: str) -> bool:
+        self.driver.switch_to.window(handle)
+        if self.driver.current_url == previous_url:
+            return False
+        return self.driver.execute_script("return document.readyState") == "complete"
+
+    def _reset(self, handle: str):
+        """获取失败的标签页回到空白页，以便重新获取同一链接时能判断加载完成"""
+        try:
+            self.driver.switch_to.window(handle)
+            self.driver.get("about:blank")
+        except Exception:
+            pass
+
+    def fetch_many(self, urls: List[str]) -> Dict[str, FetchResult]:
+        """交替在各标签页中加载，返回 URL -> (页面状态, HTML)，超时的HTML为None"""
+        self._open_tabs()
+        results: Dict[str, FetchResult] = {}
+        pending = list(urls)
+        free = list(self.handles)
+        # 标签页 -> (URL, 加载前的URL, 开始时间)
+        active: Dict[str, tuple] = {}
+        blocked = None
+
+        while pending or active:
+            # 被拦截后不再打开新的详情页
+            while free and pending and blocked is None:
+                handle, url = free.pop(), pending.pop(0)
+                self.driver.switch_to.window(handle)
+                previous_url = self.driver.current_url
+                self.driver.execute_script("window.location.href = arguments[0];", url)
+                self.crawler.pages_served += 1
+                active[handle] = (url, previous_url, time.monotonic())
+
+            progressed = False
+            for handle, (url, previous_url, started) in list(active.items()):
+                try:
+                    if self._loaded(handle, previous_url):
+                        html = self.driver.page_source
+                        status = classify_page(
+                            self.driver.current_url, self.driver.title, html
+                        )
+                        if status in BLOCKING_STATUSES:
+                            blocked = status
+                            results[url] = (status, None)
+                        else:
+                            results[url] = (PAGE_OK, html)
+                    elif time.monotonic() - started > self.timeout:
+                        print(f"详情页加载超时 {url}")
+                        results[url] = (PAGE_OK, None)
+                    else:
+                        continue
+                except Exception as e:
+                    print(f"获取详情页失败 {url}: {str(e)}")
+                    results[url] = (PAGE_OK, None)
+                if results[url][1] is None:
+                    self._reset(handle)
+                del active[handle]
+                free.append(handle)
+                progressed = True
+
+            if blocked is not None:
+                results.update((url, (blocked, None)) for url in pending)
+                pending = []
+            if active and not progressed:
+                time.sleep(self.poll_interval)
+        return results
+
+    def close(self):
+        for handle in self.handles[1:]:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        if self.handles:
+            self.driver.switch_to.window(self.handles[0])
+        self.handles = []
+
+
+class Enricher:
+    """
+    为论文补充详情页字段，同一链接在一次运行中只获取一次
+
+    遇到验证码/登录/封禁页面时不解析、不缓存，冷却后才继续获取；
+    这些链接在之后的 enrich() 中重新获取
+    """
+
+    def __init__(
+        self,
+        fetcher,
+        cache_dir: Optional[str] = None,
+        cooldown: Optional[float] = None,
+    ):
+        """
+        Args:
+            fetcher: HttpDetailFetcher 或 TabDetailFetcher
+            cache_dir: 详情页解析结果缓存目录
+            cooldown: 被拦截后的冷却时间（秒），默认取配置 block_cooldown
+        """
+        if cooldown is None:
+            cooldown = CRAWLER_CONFIG["block_cooldown"]
+        self.fetcher = fetcher
+        self.cache = DetailCache(cache_dir) if cache_dir else None
+        self.cooldown = cooldown
+        self._cooldown_until = 0.0
+        self._details: Dict[str, Dict] = {}
+        self.stats = {
+            "fetched": 0,
+            "cached": 0,
+            "failed": 0,
+            "blocked": 0,
+            "no_url": 0,
+        }
+
+    def _lookup(self, urls: Iterable[str]):
+        """从内存和磁盘缓存中取结果，其余的并发获取"""
+        missing = []
+        for url in dict.fromkeys(urls):
+            if url in self._details:
+                continue
+            details = self.cache.get(url) if self.cache else None
+            if details is not None:
+                self._details[url] = details
+                self.stats["cached"] += 1
+            else:
+                missing.append(url)
+
+        if not missing:
+            return
+        remaining = self._cooldown_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+        blocked = None
+        for url, (status, html) in self.fetcher.fetch_many(missing).items():
+            if status in BLOCKING_STATUSES:
+                blocked = status
+                self.stats["blocked"] += 1
+                continue
+            if html is None:
+                self.stats["failed"] += 1
+                continue
+            details = parse_detail_page(html)
+            self._details[url] = details
+            self.stats["fetched"] += 1
+            if self.cache:
+                self.cache.put(url, details)
+
+        if blocked is not None:
+            print(f"⛔ 详情页被知网拦截（{blocked}），冷却 {self.cooldown} 秒")
+            self._cooldown_until = time.monotonic() + self.cooldown
+
+    def enrich(self, papers: List[Dict]) -> List[Dict]:
+        """返回补充了详情字段的论文列表（不修改原列表）"""
+        urls = [paper.get(URL_COLUMN) for paper in papers]
+        self.stats["no_url"] += sum(1 for url in urls if not url)
+        self._lookup(url for url in urls if url)
+        return [
+            {**paper, **self._details.get(paper.get(URL_COLUMN) or "", {})}
+            for paper in papers
+        ]
+
+
+def enrich_output(source: str, sink: OutputSink, enricher: Enricher) -> Dict:
+    """
+    读取 crawl 的输出，补充详情后写入新的输出
+
+    Returns:
+        统计信息
+    """
+    authors = 0
+    for author_info, papers in read_output(source):
+        authors += 1
+        print(f"[{authors}] 正在补充 {author_info['name']} 的 {len(papers)} 篇论文...")
+        sink.write(author_info, enricher.enrich(papers))
+    return {"authors": authors, **enricher.stats}
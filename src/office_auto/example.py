@@ -4,13 +4,25 @@
 """
 
 import os
-from cnki_crawler import CNKICrawler
+from office_auto.cnki_crawler import CNKICrawler
+from office_auto.config import apply_settings, load_settings
+from office_auto.prewarm import Prewarmer
+from office_auto.sinks import BackgroundSink, ExcelDirSink
 
 
 def main():
     """主函数"""
     print("=== 知网论文爬虫 ===")
+    # 读取 OFFICE_AUTO_CONFIG 指定的配置文件和 OFFICE_AUTO_* 环境变量
+    apply_settings(load_settings())
 
+    # 在用户输入期间后台下载驱动并启动无头浏览器，输入完成后即可开始搜索
+    with Prewarmer(lambda: CNKICrawler(headless=True), refill=False) as warm:
+        _search_author(warm)
+
+
+def _search_author(warm: Prewarmer):
+    """读取作者信息并搜索，浏览器取自预热器"""
     # 获取用户输入
     author_name = input("请输入作者姓名: ").strip()
     if not author_name:
@@ -44,7 +56,7 @@ def main():
 
     # 使用爬虫
     try:
-        with CNKICrawler(headless=False) as crawler:
+        with warm.take() as crawler:
             # 搜索论文
             papers = crawler.search_papers(author_name, institution, max_pages)
 
@@ -92,12 +104,9 @@ def batch_crawl():
         {"name": "王五", "institution": "中科院"},
     ]
 
-    # 创建输出目录
-    output_dir = "batch_output"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    with CNKICrawler(headless=True) as crawler:
+    # 保存Excel在后台线程中进行，浏览器不必等待写出
+    sink = BackgroundSink(ExcelDirSink("batch_output"))
+    with sink, CNKICrawler(headless=True) as crawler:
         for i, author_info in enumerate(authors, 1):
             try:
                 print(
@@ -111,9 +120,8 @@ def batch_crawl():
 
                 # 保存结果
                 if papers:
-                    filename = f"{output_dir}/{author_info['name']}_{author_info['institution']}_papers.xlsx"
-                    crawler.save_to_excel(papers, filename)
-                    print(f"✅ 找到 {len(papers)} 篇论文，已保存至 {filename}")
+                    filename = sink.write(author_info, papers)
+                    print(f"✅ 找到 {len(papers)} 篇论文，将保存至 {filename}")
                 else:
                     print("❌ 未找到相关论文")
 
@@ -121,6 +129,9 @@ def batch_crawl():
                 print(f"❌ 处理 {author_info['name']} 时出错：{str(e)}")
                 continue
 
+    for author_info, message in sink.errors:
+        print(f"❌ 保存 {author_info['name']} 的结果失败：{message}")
+
 
 if __name__ == "__main__":
     # 选择运行模式
@@ -5,7 +5,12 @@
 """
 
 import os
-from cnki_crawler_improved import CNKICrawlerImproved
+
+from office_auto.batch import print_summary, run_batch
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.config import apply_settings, load_settings
+from office_auto.prewarm import Prewarmer
+from office_auto.sinks import ExcelDirSink
 
 
 def main():
@@ -16,7 +21,16 @@ def main():
     print("  - 更强的页面元素定位能力")
     print("  - 更好的错误处理机制")
     print("-" * 50)
+    # 读取 OFFICE_AUTO_CONFIG 指定的配置文件和 OFFICE_AUTO_* 环境变量
+    apply_settings(load_settings())
+
+    # 在用户输入期间后台下载驱动并启动无头浏览器，输入完成后即可开始搜索
+    with Prewarmer(lambda: CNKICrawlerImproved(headless=True), refill=False) as warm:
+        _search_author(warm)
+
 
+def _search_author(warm: Prewarmer):
+    """读取作者信息并搜索，浏览器取自预热器"""
     # 获取用户输入
     author_name = input("请输入作者姓名: ").strip()
     if not author_name:
@@ -50,7 +64,7 @@ def main():
 
     # 使用改进版爬虫
     try:
-        with CNKICrawlerImproved(headless=False, wait_time=15) as crawler:
+        with warm.take() as crawler:
             # 搜索论文
             papers = crawler.search_papers(author_name, institution, max_pages)
 
@@ -180,69 +194,13 @@ def batch_crawl():
         print("已取消")
         return
 
-    # 创建输出目录
-    output_dir = "batch_output"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    # 记录结果
-    results = []
-
-    with CNKICrawlerImproved(headless=True) as crawler:  # 批量处理使用无头模式
-        for i, author_info in enumerate(authors, 1):
-            try:
-                print(
-                    f"\n[{i}/{len(authors)}] 正在处理：{author_info['name']} - {author_info['institution']}"
-                )
-
-                # 搜索论文
-                papers = crawler.search_papers(
-                    author_info["name"],
-                    author_info["institution"],
-                    max_pages=2,  # 批量处理时减少页数
-                )
-
-                # 保存结果
-                if papers:
-                    filename = f"{output_dir}/{author_info['name']}_{author_info['institution']}_papers.xlsx"
-                    crawler.save_to_excel(papers, filename)
-                    result = f"✅ 找到 {len(papers)} 篇论文，已保存至 {filename}"
-                    print(result)
-                    results.append(
-                        {
-                            "author": author_info["name"],
-                            "count": len(papers),
-                            "status": "成功",
-                        }
-                    )
-                else:
-                    result = "❌ 未找到相关论文"
-                    print(result)
-                    results.append(
-                        {"author": author_info["name"], "count": 0, "status": "无结果"}
-                    )
-
-            except Exception as e:
-                result = f"❌ 处理 {author_info['name']} 时出错：{str(e)}"
-                print(result)
-                results.append(
-                    {"author": author_info["name"], "count": 0, "status": "错误"}
-                )
-                continue
-
-    # 输出汇总结果
-    print("\n" + "=" * 50)
-    print("📊 批量处理结果汇总：")
-    print("-" * 50)
-
-    total_papers = 0
-    for result in results:
-        print(f"{result['author']}: {result['count']} 篇论文 - {result['status']}")
-        total_papers += result["count"]
+    with ExcelDirSink("batch_output") as sink:
+        # 批量处理使用无头模式，并减少页数；保存Excel在后台进行
+        results = run_batch(
+            authors, sink, max_pages=2, headless=True, background_write=True
+        )
 
-    print("-" * 50)
-    print(f"总计：{total_papers} 篇论文")
-    print(f"成功率：{sum(1 for r in results if r['status'] == '成功')}/{len(results)}")
+    print_summary(results)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,307 @@
+"""
+基于lxml的内存WebDriver
+在保存的HTML上实现爬虫用到的WebDriver接口，无需启动浏览器即可测试和评估提取逻辑
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode, urljoin, urlsplit, urlunsplit
+
+import lxml.html
+from lxml.cssselect import CSSSelector
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException,
+    NoSuchWindowException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+# Chrome不支持的jQuery伪类
+_UNSUPPORTED_PSEUDO = re.compile(r":contains\(")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=512)
+def _css(selector: str) -> CSSSelector:
+    """编译并缓存CSS选择器"""
+    if _UNSUPPORTED_PSEUDO.search(selector):
+        raise InvalidSelectorException(f"invalid selector: {selector}")
+    try:
+        return CSSSelector(selector)
+    except Exception as e:
+        raise InvalidSelectorException(f"invalid selector: {selector}") from e
+
+
+def _find_all(root, by: str, value: str, scope_self: bool) -> List:
+    """在lxml节点下按Selenium定位方式查找元素"""
+    if by == By.CSS_SELECTOR:
+        matches = _css(value)(root)
+    elif by == By.XPATH:
+        try:
+            matches = root.xpath(value)
+        except Exception as e:
+            raise InvalidSelectorException(f"invalid xpath: {value}") from e
+        matches = [m for m in matches if isinstance(m, lxml.html.HtmlElement)]
+    elif by == By.ID:
+        matches = _css(f'[id="{value}"]')(root)
+    elif by == By.NAME:
+        matches = _css(f'[name="{value}"]')(root)
+    elif by == By.CLASS_NAME:
+        matches = _css(f".{value}")(root)
+    elif by == By.TAG_NAME:
+        matches = _css(value)(root)
+    elif by in (By.LINK_TEXT, By.PARTIAL_LINK_TEXT):
+        matches = []
+        for link in root.iter("a"):
+            text = _text_of(link)
+            if (by == By.LINK_TEXT and text == value) or (
+                by == By.PARTIAL_LINK_TEXT and value in text
+            ):
+                matches.append(link)
+    else:
+        raise InvalidSelectorException(f"unsupported locator: {by}")
+
+    if not scope_self:
+        # 从元素出发查找时，Selenium只返回其后代
+        matches = [m for m in matches if m is not root]
+    return matches
+
+
+def _text_of(node) -> str:
+    """近似浏览器innerText：合并空白"""
+    return _WHITESPACE.sub(" ", node.text_content()).strip()
+
+
+class FakeElement:
+    """对应WebElement的lxml元素包装"""
+
+    def __init__(self, driver: "FakeDriver", node):
+        self._driver = driver
+        self._node = node
+
+    @property
+    def tag_name(self) -> str:
+        return self._node.tag
+
+    @property
+    def text(self) -> str:
+        return _text_of(self._node)
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        if name in ("href", "src"):
+            value = self._node.get(name)
+            return urljoin(self._driver.current_url, value) if value else None
+        if name == "class":
+            return self._node.get("class", "")
+        if name in ("textContent", "innerText"):
+            return self.text
+        if name in ("innerHTML", "outerHTML"):
+            return lxml.html.tostring(self._node, encoding="unicode")
+        if name == "value":
+            return self._node.get("value", "")
+        return self._node.get(name)
+
+    def find_element(
+        self, by: str = By.ID, value: Optional[str] = None
+    ) -> "FakeElement":
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+        return elements[0]
+
+    def find_elements(self, by: str = By.ID, value: Optional[str] = None) -> List:
+        return [
+            FakeElement(self._driver, node)
+            for node in _find_all(self._node, by, value, scope_self=False)
+        ]
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        return self._node.get("disabled") is None
+
+    def clear(self):
+        self._node.set("value", "")
+
+    def send_keys(self, *values: str):
+        text = "".join(values)
+        submit = Keys.RETURN in text or Keys.ENTER in text
+        text = text.replace(Keys.RETURN, "").replace(Keys.ENTER, "")
+        self._node.set("value", self._node.get("value", "") + text)
+        if submit:
+            self.submit()
+
+    def submit(self):
+        """提交所在表单（GET）"""
+        form = self._node if self._node.tag == "form" else None
+        for ancestor in self._node.iterancestors("form"):
+            form = ancestor
+            break
+        if form is None:
+            return
+        fields = [
+            (field.get("name"), field.get("value", ""))
+            for field in form.iter("input", "select", "textarea")
+            if field.get("name")
+        ]
+        action = urljoin(self._driver.current_url, form.get("action") or "")
+        parts = urlsplit(action)
+        self._driver.get(urlunsplit(parts._replace(query=urlencode(fields))))
+
+    def click(self):
+        """链接跳转或提交表单"""
+        node = self._node
+        if node.tag == "option":
+            for sibling in node.getparent().iter("option"):
+                sibling.attrib.pop("selected", None)
+            node.set("selected", "selected")
+            node.getparent().set("value", node.get("value", node.text or ""))
+            return
+        if node.tag == "input" and node.get("type") in ("submit", "image"):
+            self.submit()
+            return
+        href = node.get("href")
+        if node.tag == "a" and href and not href.startswith("javascript:"):
+            self._driver.get(urljoin(self._driver.current_url, href))
+
+
+class _Tab:
+    """一个标签页的文档状态"""
+
+    def __init__(self, url: str = "about:blank", html: str = ""):
+        self.url = url
+        self.html = html
+        self.document = lxml.html.document_fromstring(html or "<html></html>")
+
+
+class _SwitchTo:
+    def __init__(self, driver: "FakeDriver"):
+        self._driver = driver
+
+    def window(self, handle: str):
+        if handle not in self._driver._tabs:
+            raise NoSuchWindowException(f"no such window: {handle}")
+        self._driver._current = handle
+
+    def new_window(self, type_hint: Optional[str] = None):
+        self._driver._open_tab()
+
+
+class FakeDriver:
+    """
+    内存WebDriver
+
+    页面来源可以是 URL->HTML 的字典、按URL返回HTML的函数，或直接给定的HTML
+    """
+
+    # 页面即时可用，爬虫无需等待加载和翻页间隔
+    offline = True
+
+    def __init__(
+        self,
+        pages: Optional[Dict[str, str]] = None,
+        loader: Optional[Callable[[str], Optional[str]]] = None,
+        html: Optional[str] = None,
+        url: str = "about:blank",
+    ):
+        self.pages = pages or {}
+        self.loader = loader
+        self.history: List[str] = []
+        self.cookies: List[Dict] = []
+        self._tabs: Dict[str, _Tab] = {}
+        self._tab_counter = 0
+        self._current = self._open_tab(url, html or "")
+        self.switch_to = _SwitchTo(self)
+
+    def _open_tab(self, url: str = "about:blank", html: str = "") -> str:
+        self._tab_counter += 1
+        handle = f"tab-{self._tab_counter}"
+        self._tabs[handle] = _Tab(url, html)
+        self._current = handle
+        return handle
+
+    @property
+    def _tab(self) -> _Tab:
+        return self._tabs[self._current]
+
+    def load_html(self, html: str, url: Optional[str] = None):
+        """直接把HTML载入当前标签页"""
+        tab = self._tab
+        tab.html = html
+        tab.url = url or tab.url
+        tab.document = lxml.html.document_fromstring(html or "<html></html>")
+
+    def get(self, url: str):
+        html = self.pages.get(url)
+        if html is None and self.loader is not None:
+            html = self.loader(url)
+        self.history.append(url)
+        self.load_html(html or "", url)
+
+    @property
+    def current_url(self) -> str:
+        return self._tab.url
+
+    @property
+    def page_source(self) -> str:
+        return self._tab.html
+
+    @property
+    def title(self) -> str:
+        titles = self._tab.document.xpath("//title")
+        return _text_of(titles[0]) if titles else ""
+
+    @property
+    def current_window_handle(self) -> str:
+        return self._current
+
+    @property
+    def window_handles(self) -> List[str]:
+        return list(self._tabs)
+
+    def find_element(self, by: str = By.ID, value: Optional[str] = None) -> FakeElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element: {by}={value}")
+        return elements[0]
+
+    def find_elements(self, by: str = By.ID, value: Optional[str] = None) -> List:
+        return [
+            FakeElement(self, node)
+            for node in _find_all(self._tab.document, by, value, scope_self=True)
+        ]
+
+    def execute_script(self, script: str, *args):
+        """支持爬虫用到的几种脚本"""
+        script = script.strip()
+        if "arguments[0].click()" in script and args:
+            args[0].click()
+        elif "window.location" in script and args:
+            self.get(args[0])
+        elif "document.readyState" in script:
+            return "complete"
+        return None
+
+    def set_page_load_timeout(self, timeout: float):
+        pass
+
+    def implicitly_wait(self, timeout: float):
+        pass
+
+    def get_cookies(self) -> List[Dict]:
+        return list(self.cookies)
+
+    def add_cookie(self, cookie: Dict):
+        self.cookies.append(dict(cookie))
+
+    def close(self):
+        """关闭当前标签页"""
+        self._tabs.pop(self._current, None)
+        if self._tabs:
+            self._current = next(iter(self._tabs))
+
+    def quit(self):
+        self._tabs.clear()
@@ -0,0 +1,73 @@
+"""
+全文检索分词模块
+FTS5自带的分词器不切分中文，这里把中文按字的二元组（bigram）切分后再交给FTS5索引
+"""
+
+import re
+import unicodedata
+from typing import List
+
+# 中日韩统一表意文字（含扩展A和兼容区）
+_CJK = "\u3400-\u9fff\uf900-\ufaff"
+# 连续的中日韩文字，或连续的其它字母数字
+_TOKEN_RUN = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+
+
+def ngram_tokens(text: str) -> List[str]:
+    """
+    切分为索引词
+
+    中文连续段输出相邻两字的二元组和最后一个字，使任意一个字都是某个词的开头，
+    单字查询可以用前缀匹配；其它文字按单词切分
+    """
+    tokens = []
+    for cjk, word in _TOKEN_RUN.findall(
+        unicodedata.normalize("NFKC", text or "").lower()
+    ):
+        if word:
+            tokens.append(word)
+            continue
+        tokens.extend(cjk[i : i + 2] for i in range(len(cjk) - 1))
+        tokens.append(cjk[-1])
+    return tokens
+
+
+def _is_cjk_char(token: str) -> bool:
+    return len(token) == 1 and _TOKEN_RUN.fullmatch(token).group(1) is not None
+
+
+def index_text(text: str) -> str:
+    """写入FTS5表的文本，以空格分隔的索引词"""
+    return " ".join(ngram_tokens(text))
+
+
+def match_query(query: str) -> str:
+    """
+    把用户输入转换为FTS5 MATCH表达式
+
+    空格分隔的每个词都必须出现；多字中文词按二元组短语匹配，单个汉字按前缀匹配
+
+    Raises:
+        ValueError: 查询中没有可检索的文字
+    """
+    clauses = []
+    for term in query.split():
+        tokens = ngram_tokens(term)
+        if not tokens:
+            continue
+        phrase = '"' + " ".join(tokens) + '"'
+        if _is_cjk_char(tokens[-1]):
+            if (
+                len(tokens) > 1
+                and tokens[-2][-1:] == tokens[-1]
+                and len(tokens[-2]) == 2
+            ):
+                # 末尾单字已包含在前一个二元组中，索引里它后面可能还有其它字
+                phrase = '"' + " ".join(tokens[:-1]) + '"'
+            else:
+                # 只有一个字的中文段：匹配以它开头的二元组或结尾的单字
+                phrase += "*"
+        clauses.append(phrase)
+    if not clauses:
+        raise ValueError(f"无法检索：{query!r}")
+    return " AND ".join(clauses)
@@ -0,0 +1,143 @@
+"""
+运行指标模块
+记录各阶段耗时、计数器和瞬时值（如队列深度），导出为JSON汇总和Prometheus文本格式
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# 指标名前缀（Prometheus）
+METRIC_PREFIX = "office_auto"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """计算分位数（线性插值），q取值0~100"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class Metrics:
+    """线程安全的耗时和计数器收集器"""
+
+    def __init__(self):
+        self._timings: Dict[str, List[float]] = {}
+        self._counters: Dict[str, float] = {}
+        # 瞬时值：名称 -> [当前值, 最大值]
+        self._gauges: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def observe(self, name: str, seconds: float):
+        """记录一次耗时"""
+        with self._lock:
+            self._timings.setdefault(name, []).append(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """统计with块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def incr(self, name: str, value: float = 1):
+        """计数器累加"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float):
+        """记录瞬时值，同时保留最大值"""
+        with self._lock:
+            current = self._gauges.setdefault(name, [value, value])
+            current[0] = value
+            current[1] = max(current[1], value)
+
+    def summary(self) -> Dict:
+        """汇总为字典"""
+        with self._lock:
+            timings = {k: list(v) for k, v in self._timings.items()}
+            counters = dict(self._counters)
+            gauges = {k: list(v) for k, v in self._gauges.items()}
+
+        return {
+            "started_at": self.started_at,
+            "duration": time.time() - self.started_at,
+            "timings": {
+                name: {
+                    "count": len(values),
+                    "total": sum(values),
+                    "mean": sum(values) / len(values),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "max": max(values),
+                }
+                for name, values in sorted(timings.items())
+            },
+            "counters": dict(sorted(counters.items())),
+            "gauges": {
+                name: {"last": last, "max": peak}
+                for name, (last, peak) in sorted(gauges.items())
+            },
+        }
+
+    def write_json(self, path: str, extra: Optional[Dict] = None):
+        """写入JSON运行汇总"""
+        data = self.summary()
+        if extra:
+            data.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """转换为Prometheus文本格式"""
+        data = self.summary()
+        lines = [
+            f"# TYPE {METRIC_PREFIX}_phase_seconds summary",
+        ]
+        for name, stats in data["timings"].items():
+            label = f'phase="{name}"'
+            lines.append(
+                f'{METRIC_PREFIX}_phase_seconds{{{label},quantile="0.5"}} {stats["p50"]:.6f}'
+            )
+            lines.append(
+                f'{METRIC_PREFIX}_phase_seconds{{{label},quantile="0.95"}} {stats["p95"]:.6f}'
+            )
+            lines.append(
+                f"{METRIC_PREFIX}_phase_seconds_sum{{{label}}} {stats['total']:.6f}"
+            )
+            lines.append(
+                f"{METRIC_PREFIX}_phase_seconds_count{{{label}}} {stats['count']}"
+            )
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_events_total counter")
+        for name, value in data["counters"].items():
+            lines.append(f'{METRIC_PREFIX}_events_total{{event="{name}"}} {value:g}')
+
+        for suffix, key in (("", "last"), ("_max", "max")):
+            lines.append(f"# TYPE {METRIC_PREFIX}_gauge{suffix} gauge")
+            for name, values in data["gauges"].items():
+                lines.append(
+                    f'{METRIC_PREFIX}_gauge{suffix}{{name="{name}"}} {values[key]:g}'
+                )
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_duration_seconds {data['duration']:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """写入Prometheus textfile（node_exporter textfile collector）"""
+        # 先写临时文件再替换，避免采集到写了一半的文件
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
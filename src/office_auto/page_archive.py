@@ -0,0 +1,187 @@
+"""
+页面录制与回放模块
+录制时保存每次搜索经过的页面HTML和元数据到gzip压缩的JSONL归档，
+回放时把归档交给同一个CNKICrawlerImproved流程，不需要浏览器和网络
+"""
+
+import gzip
+import json
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .cnki_crawler_improved import CNKICrawlerImproved
+from .fake_driver import FakeDriver
+from .metrics import Metrics
+
+
+class PageRecorder:
+    """
+    页面归档写入器，多个爬虫可以共用一个
+
+    每次搜索写一行：{"author", "institution", "max_pages", "status", "recorded_at", "pages": [...]}，
+    pages 中每项为一个同步点的页面快照：{"label", "url", "title", "time", "html"}，
+    与上一项HTML相同时记为 {"repeat": true} 而不重复保存
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # 追加写入会生成多段gzip，读取时自动拼接，便于续跑
+        self._file = gzip.open(path, "at", encoding="utf-8")
+
+    def snapshot(self, driver, label: str, pages: List[Dict]):
+        """保存浏览器当前页面到一次搜索的页面列表"""
+        try:
+            html = driver.page_source
+            entry = {
+                "label": label,
+                "url": driver.current_url,
+                "title": driver.title,
+                "time": time.time(),
+            }
+        except Exception as e:
+            # 浏览器已失去响应时仍保留同步点，回放时按空页面处理
+            entry = {"label": label, "url": "", "title": "", "time": time.time()}
+            html = ""
+            print(f"录制页面时出错: {str(e)}")
+
+        if pages and pages[-1]["html"] == html:
+            entry["repeat"] = True
+        entry["html"] = html
+        pages.append(entry)
+
+    def write_search(
+        self,
+        author_name: str,
+        institution: str,
+        max_pages: int,
+        status: str,
+        pages: List[Dict],
+    ):
+        """写入一次搜索的全部页面"""
+        record = {
+            "author": author_name,
+            "institution": institution,
+            "max_pages": max_pages,
+            "status": status,
+            "recorded_at": time.time(),
+            "pages": [
+                (
+                    {k: v for k, v in page.items() if k != "html"}
+                    if page.get("repeat")
+                    else page
+                )
+                for page in pages
+            ],
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_archive(path: str) -> Iterator[Dict]:
+    """
+    逐条读取归档中的搜索记录，重复的HTML会还原
+
+    中途被中断而截断的归档读到损坏处为止
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                html = ""
+                for page in record.get("pages", []):
+                    if page.pop("repeat", False):
+                        page["html"] = html
+                    html = page.get("html", "")
+                yield record
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        print(f"⚠️ 归档 {path} 不完整，已读取到损坏处：{str(e)}")
+
+
+class ReplayDriver(FakeDriver):
+    """
+    按录制顺序回放页面的WebDriver
+
+    导航和点击本身不改变页面，页面内容只在爬虫的同步点按顺序载入
+    """
+
+    def __init__(self, pages: List[Dict]):
+        super().__init__()
+        self._pages = pages
+        self._position = 0
+        # 回放流程与录制时不一致（页面顺序或数量不同）
+        self.diverged = False
+
+    def get(self, url: str):
+        self.history.append(url)
+
+    def replay_checkpoint(self, label: str):
+        """载入下一个录制的页面"""
+        if self._position >= len(self._pages):
+            self.diverged = True
+            self.load_html("", "about:blank")
+            return
+        page = self._pages[self._position]
+        self._position += 1
+        if page.get("label") != label:
+            self.diverged = True
+        self.load_html(page.get("html", ""), page.get("url") or "about:blank")
+
+    @property
+    def exhausted(self) -> bool:
+        """录制的页面是否已全部用完"""
+        return self._position >= len(self._pages)
+
+
+def replay_search(
+    record: Dict, metrics: Optional[Metrics] = None
+) -> Tuple[List[Dict], CNKICrawlerImproved, ReplayDriver]:
+    """
+    回放一次录制的搜索
+
+    Returns:
+        (论文列表, 爬虫, 回放驱动)，可从爬虫的 last_status 和驱动的 diverged 判断回放结果
+    """
+    driver = ReplayDriver(record.get("pages", []))
+    crawler = CNKICrawlerImproved(driver=driver, metrics=metrics)
+    papers = crawler.search_papers(
+        record["author"], record.get("institution", ""), max_pages=record["max_pages"]
+    )
+    if not driver.exhausted:
+        driver.diverged = True
+    return papers, crawler, driver
+
+
+def replay_archive(
+    path: str, metrics: Optional[Metrics] = None
+) -> Iterator[Tuple[Dict, List[Dict], str, bool]]:
+    """
+    回放归档中的全部搜索
+
+    Yields:
+        (作者信息, 论文列表, 搜索状态, 是否偏离录制)
+    """
+    for record in read_archive(path):
+        papers, crawler, driver = replay_search(record, metrics)
+        author_info = {
+            "name": record["author"],
+            "institution": record.get("institution", ""),
+        }
+        yield author_info, papers, crawler.last_status, driver.diverged
@@ -0,0 +1,95 @@
+"""
+知网页面分类模块
+在导航完成后立即识别验证码、登录墙和封禁页面，避免白白等待超时
+"""
+
+from typing import Optional
+from urllib.parse import urlsplit
+
+# 页面状态
+PAGE_OK = "ok"
+PAGE_CAPTCHA = "captcha"
+PAGE_LOGIN = "login"
+PAGE_BLOCKED = "blocked"
+
+# 需要冷却处理的状态
+BLOCKING_STATUSES = (PAGE_CAPTCHA, PAGE_LOGIN, PAGE_BLOCKED)
+
+# 各类页面的特征（URL片段、标题或正文关键词）
+CAPTCHA_MARKERS = {
+    "url": ["verify", "captcha", "validate"],
+    "text": ["安全验证", "滑动验证", "请完成验证", "拖动滑块", "请输入验证码"],
+}
+# 正常页面的页头也有登录入口，因此登录墙只看URL和标题
+LOGIN_MARKERS = {
+    "url": ["/login", "login.cnki.net", "passport"],
+    "title": ["登录", "login"],
+}
+BLOCKED_MARKERS = {
+    "url": ["forbidden", "blocked", "deny"],
+    "text": [
+        "访问受限",
+        "访问过于频繁",
+        "拒绝访问",
+        "IP已被限制",
+        "您的IP",
+        "403 Forbidden",
+        "Access Denied",
+    ],
+}
+
+# 出现这些标记说明已经是正常的结果页
+RESULT_MARKERS = ["result-table-list", "searchResult", "search-result"]
+
+# 只检查正文开头部分，避免在大型结果页上做全文扫描
+_TEXT_SCAN_LIMIT = 20000
+
+
+def classify_page(url: str = "", title: str = "", page_source: str = "") -> str:
+    """
+    根据URL、标题和页面源码判断页面类型
+
+    Args:
+        url: 当前页面URL
+        title: 页面标题
+        page_source: 页面HTML源码
+
+    Returns:
+        页面状态（PAGE_OK / PAGE_CAPTCHA / PAGE_LOGIN / PAGE_BLOCKED）
+    """
+    # 只看域名和路径，查询参数里可能带有作者姓名等检索词
+    parts = urlsplit((url or "").lower())
+    url = f"{parts.netloc}{parts.path}"
+    title = (title or "").lower()
+
+    if any(marker in (page_source or "") for marker in RESULT_MARKERS):
+        return PAGE_OK
+
+    source = (page_source or "")[:_TEXT_SCAN_LIMIT]
+    text = f"{title}\n{source.lower()}"
+    for status, markers in (
+        (PAGE_BLOCKED, BLOCKED_MARKERS),
+        (PAGE_CAPTCHA, CAPTCHA_MARKERS),
+        (PAGE_LOGIN, LOGIN_MARKERS),
+    ):
+        if any(marker in url for marker in markers["url"]):
+            return status
+        if any(marker.lower() in text for marker in markers.get("text", [])):
+            return status
+        if any(marker in title for marker in markers.get("title", [])):
+            return status
+
+    return PAGE_OK
+
+
+def classify_driver_page(driver) -> Optional[str]:
+    """
+    对WebDriver当前页面进行分类
+
+    Returns:
+        页面状态；读取页面失败时返回None
+    """
+    try:
+        return classify_page(driver.current_url, driver.title, driver.page_source)
+    except Exception:
+        return None
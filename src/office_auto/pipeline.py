@@ -0,0 +1,158 @@
+"""
+流水线模块
+用有界队列把多个处理阶段串联起来，每个阶段有独立的工作线程数；
+队列满时上游阻塞（背压），各阶段的队列深度和耗时写入运行指标，便于定位瓶颈
+"""
+
+import contextlib
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .metrics import Metrics
+
+# 关闭信号：每个工作线程收到一个后退出
+_STOP = object()
+
+
+class Stage:
+    """流水线的一个阶段"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[object], Optional[Iterable]],
+        workers: int = 1,
+        queue_size: int = 16,
+    ):
+        """
+        Args:
+            name: 阶段名称，用于指标
+            func: 处理函数，返回交给下一阶段的结果（可迭代，可为None）
+            workers: 工作线程数
+            queue_size: 输入队列容量
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self.processed = 0
+        self.errors = 0
+        self.max_depth = 0
+        self._running = self.workers
+        self._lock = threading.Lock()
+
+
+class Pipeline:
+    """
+    多阶段线程流水线
+
+    用法：start() 后由一个或多个生产者线程调用 put()，全部提交后调用 close() 等待处理完成
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        metrics: Optional[Metrics] = None,
+        thread_context: Callable = contextlib.nullcontext,
+    ):
+        """
+        Args:
+            stages: 按顺序排列的阶段
+            metrics: 运行指标收集器
+            thread_context: 每个工作线程运行时进入的上下文（例如剖析器的 thread()）
+        """
+        self.stages = stages
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.thread_context = thread_context
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "Pipeline":
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(index,),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def _put(self, index: int, item):
+        """放入第index个阶段的输入队列，队列满时阻塞并记录背压时间"""
+        stage = self.stages[index]
+        start = time.perf_counter()
+        stage.queue.put(item)
+        waited = time.perf_counter() - start
+        if waited > 0.001:
+            self.metrics.observe(f"stage_{stage.name}_backpressure", waited)
+        depth = stage.queue.qsize()
+        self.metrics.gauge(f"queue_{stage.name}", depth)
+        with stage._lock:
+            stage.max_depth = max(stage.max_depth, depth)
+
+    def put(self, item):
+        """提交一项给第一个阶段"""
+        self._put(0, item)
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        last = index == len(self.stages) - 1
+        with self.thread_context():
+            while True:
+                item = stage.queue.get()
+                if item is _STOP:
+                    break
+                try:
+                    with self.metrics.timer(f"stage_{stage.name}"):
+                        outputs = stage.func(item)
+                        for output in outputs or ():
+                            if not last:
+                                self._put(index + 1, output)
+                    with stage._lock:
+                        stage.processed += 1
+                except Exception as e:
+                    with stage._lock:
+                        stage.errors += 1
+                    self.metrics.incr(f"stage_{stage.name}_errors")
+                    print(f"❌ 流水线阶段 {stage.name} 出错：{str(e)}")
+
+        # 本阶段最后一个退出的线程通知下一阶段
+        with stage._lock:
+            stage._running -= 1
+            finished = stage._running == 0
+        if finished and not last:
+            for _ in range(self.stages[index + 1].workers):
+                self.stages[index + 1].queue.put(_STOP)
+
+    def close(self):
+        """通知没有更多输入，等待所有阶段处理完毕"""
+        for _ in range(self.stages[0].workers):
+            self.stages[0].queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def depths(self) -> Dict[str, int]:
+        """各阶段输入队列的当前深度"""
+        return {stage.name: stage.queue.qsize() for stage in self.stages}
+
+    def stats(self) -> Dict[str, Dict]:
+        """各阶段的处理数、出错数和队列最大深度"""
+        return {
+            stage.name: {
+                "workers": stage.workers,
+                "processed": stage.processed,
+                "errors": stage.errors,
+                "max_depth": stage.max_depth,
+            }
+            for stage in self.stages
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
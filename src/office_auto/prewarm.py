@@ -0,0 +1,97 @@
+"""
+浏览器预热模块
+驱动下载和Chrome启动需要数秒，预热器在后台线程中提前完成，
+程序等待用户输入或处理上一个作者时浏览器已经就绪
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from webdriver_manager.chrome import ChromeDriverManager
+
+_driver_path: Optional[str] = None
+_driver_lock = threading.Lock()
+
+
+def chromedriver_path() -> str:
+    """
+    下载（或查找已缓存的）chromedriver并返回路径
+
+    同一进程内只解析一次；ChromeDriverManager 每次调用都要检查版本，启动多个浏览器时可以省去重复的开销
+    """
+    global _driver_path
+    with _driver_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+class Prewarmer:
+    """
+    在后台创建对象（通常是启动好浏览器的爬虫），take() 时直接取用
+
+    take() 优先取后台已创建或正在创建的对象，没有时在调用线程中直接创建；
+    refill 为True时每取走一个就在后台补充一个，始终保留 spares 个备用对象
+    """
+
+    def __init__(self, factory: Callable, spares: int = 1, refill: bool = True):
+        """
+        Args:
+            factory: 创建对象的函数，对象需要有 close() 方法
+            spares: 后台保留的备用对象数
+            refill: 取走后是否在后台补充
+        """
+        self.factory = factory
+        self.spares = max(1, spares)
+        self.refill = refill
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.spares, thread_name_prefix="prewarm"
+        )
+        self._pending: List[Future] = []
+        with self._lock:
+            self._fill()
+
+    def _fill(self):
+        while not self._closed and len(self._pending) < self.spares:
+            self._pending.append(self._executor.submit(self.factory))
+
+    def take(self):
+        """取一个预热好的对象，后台创建失败时在当前线程重新创建"""
+        with self._lock:
+            future = self._pending.pop(0) if self._pending else None
+            if self.refill:
+                self._fill()
+        if future is not None:
+            try:
+                obj = future.result()
+                self.hits += 1
+                return obj
+            except Exception as e:
+                print(f"⚠ 后台预热失败，重新启动浏览器：{str(e)}")
+        self.misses += 1
+        return self.factory()
+
+    def close(self):
+        """关闭尚未取走的对象"""
+        with self._lock:
+            self._closed = True
+            pending, self._pending = self._pending, []
+        for future in pending:
+            if future.cancel():
+                continue
+            try:
+                future.result().close()
+            except Exception:
+                continue
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,90 @@
+"""
+进程资源统计模块
+统计浏览器（chromedriver及其所有子进程）的内存占用
+"""
+
+import os
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # psutil为可选依赖，Linux下退回读取/proc
+    psutil = None
+
+
+def _proc_children_map() -> Dict[int, List[int]]:
+    """读取/proc得到 父进程 -> 子进程列表"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # 进程名可能包含空格和括号，从最后一个右括号之后解析
+        fields = stat[stat.rfind(")") + 2 :].split()
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def _proc_rss_kb(pid: int) -> int:
+    """读取单个进程的RSS（KB）"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def process_tree_rss_mb(pid: Optional[int]) -> Optional[float]:
+    """
+    统计进程及其所有子孙进程的RSS之和
+
+    Args:
+        pid: 根进程ID
+
+    Returns:
+        RSS（MB）；无法统计时返回None
+    """
+    if not pid:
+        return None
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+            total = 0
+            for process in processes:
+                try:
+                    total += process.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    if not os.path.isdir("/proc"):
+        return None
+
+    children = _proc_children_map()
+    total_kb = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total_kb += _proc_rss_kb(current)
+        stack.extend(children.get(current, []))
+    return total_kb / 1024
+
+
+def driver_rss_mb(driver) -> Optional[float]:
+    """统计WebDriver启动的浏览器进程树的内存占用（MB）"""
+    try:
+        pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    return process_tree_rss_mb(pid)
@@ -0,0 +1,240 @@
+"""
+运行剖析模块
+按需开启cProfile、tracemalloc或低开销的栈采样，把结果写到输出目录旁边
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Union
+
+from .config import CRAWLER_CONFIG, FROM_CONFIG
+from .process_stats import process_tree_rss_mb
+
+# cpu: cProfile精确统计；memory: tracemalloc内存分配快照；sample: 定时栈采样，开销低，适合生产
+PROFILE_MODES = ("cpu", "memory", "sample")
+
+
+def parse_profile(profile: Union[None, str, Iterable[str]]) -> List[str]:
+    """
+    解析剖析模式
+
+    Args:
+        profile: None、逗号分隔的字符串（如 "cpu,memory"）或模式列表，"all" 表示 cpu+memory
+
+    Returns:
+        模式列表
+    """
+    if not profile:
+        return []
+    if isinstance(profile, str):
+        profile = profile.split(",")
+    modes = []
+    for mode in (m.strip().lower() for m in profile):
+        if not mode:
+            continue
+        expanded = ["cpu", "memory"] if mode == "all" else [mode]
+        for item in expanded:
+            if item not in PROFILE_MODES:
+                raise ValueError(
+                    f"未知的剖析模式: {item}（可选：{', '.join(PROFILE_MODES)}, all）"
+                )
+            if item not in modes:
+                modes.append(item)
+    return modes
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class StackSampler:
+    """后台线程定时采样所有线程的调用栈（墙钟时间，包含等待）"""
+
+    def __init__(self, interval: Optional[float] = None):
+        if interval is None:
+            interval = CRAWLER_CONFIG["profile_sample_interval"]
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.peak_rss_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        # 内存只需粗粒度采样
+        rss_every = max(1, int(1.0 / self.interval)) if self.interval > 0 else 1
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            if (self.samples - 1) % rss_every == 0:
+                rss = process_tree_rss_mb(os.getpid())
+                if rss is not None:
+                    self.peak_rss_mb = max(self.peak_rss_mb, rss)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def top_functions(self, limit: int = 20) -> List[tuple]:
+        """按出现在栈顶的次数排序的函数"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+    def write(self, path: str):
+        """写入折叠栈格式（可用flamegraph.pl或speedscope查看）"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    一次运行的剖析器
+
+    用法：
+        with Profiler("cpu,memory", "output", "batch") as profiler:
+            ...  # 主线程的代码
+            with profiler.thread():
+                ...  # 其他工作线程中的代码
+
+    未指定模式时所有操作均为空操作
+    """
+
+    def __init__(
+        self,
+        profile: Union[None, str, Iterable[str]],
+        output_dir: str = FROM_CONFIG,
+        name: str = "profile",
+    ):
+        """
+        Args:
+            profile: 剖析模式，见 parse_profile()
+            output_dir: 结果目录，默认为配置 output_dir 下的 profile 目录
+            name: 结果文件名前缀，后接时间戳
+        """
+        if output_dir is FROM_CONFIG:
+            output_dir = os.path.join(CRAWLER_CONFIG["output_dir"], "profile")
+        self.modes = parse_profile(profile)
+        self.output_dir = output_dir
+        self.name = f"{name}_{time.strftime('%Y%m%d_%H%M%S')}"
+        self.paths: List[str] = []
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._sampler: Optional[StackSampler] = None
+        self._main_thread = None
+        self._started_tracemalloc = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.modes)
+
+    @contextmanager
+    def thread(self):
+        """在当前线程中开启cProfile（cpu模式）"""
+        if "cpu" not in self.modes:
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12起cProfile基于sys.monitoring，已开启的剖析器覆盖所有线程
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def start(self):
+        if "memory" in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start(CRAWLER_CONFIG["profile_memory_frames"])
+            self._started_tracemalloc = True
+        if "sample" in self.modes:
+            self._sampler = StackSampler()
+            self._sampler.start()
+        if "cpu" in self.modes:
+            self._main_thread = self.thread()
+            self._main_thread.__enter__()
+        return self
+
+    def stop(self) -> List[str]:
+        """停止剖析并写入结果文件"""
+        if not self.enabled:
+            return []
+        if self._main_thread is not None:
+            self._main_thread.__exit__(None, None, None)
+            self._main_thread = None
+        # 先停止采样，避免把写结果文件的开销计入
+        if self._sampler is not None:
+            self._sampler.stop()
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, self.name)
+
+        if "memory" in self.modes and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            snapshot.dump(f"{base}.tracemalloc")
+            with open(f"{base}.memory.txt", "w", encoding="utf-8") as f:
+                f.write(f"Python堆峰值: {peak / (1024 * 1024):.1f} MB\n\n")
+                for stat in snapshot.statistics("lineno")[:40]:
+                    f.write(f"{stat}\n")
+            self.paths += [f"{base}.tracemalloc", f"{base}.memory.txt"]
+
+        if self._sampler is not None:
+            self._sampler.write(f"{base}.samples.txt")
+            with open(f"{base}.samples_top.txt", "w", encoding="utf-8") as f:
+                f.write(
+                    f"采样 {self._sampler.samples} 次，间隔 {self._sampler.interval}s，"
+                    f"进程内存峰值 {self._sampler.peak_rss_mb:.0f} MB\n\n"
+                )
+                total = sum(self._sampler.stacks.values()) or 1
+                for label, count in self._sampler.top_functions(40):
+                    f.write(f"{count / total * 100:6.2f}%  {label}\n")
+            self.paths += [f"{base}.samples.txt", f"{base}.samples_top.txt"]
+            self._sampler = None
+
+        if "cpu" in self.modes and self._profiles:
+            stats = pstats.Stats(*self._profiles)
+            stats.dump_stats(f"{base}.pstats")
+            with open(f"{base}.cpu.txt", "w", encoding="utf-8") as f:
+                pstats.Stats(f"{base}.pstats", stream=f).sort_stats(
+                    "cumulative"
+                ).print_stats(40)
+            self.paths += [f"{base}.pstats", f"{base}.cpu.txt"]
+
+        print(f"🔬 剖析结果已写入 {self.output_dir}（{', '.join(self.modes)}）")
+        return self.paths
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,71 @@
+"""
+合并检索模块
+把同一单位的多个作者合并为一个 "作者:A OR 作者:B" 检索式，按论文的作者字段把结果分回各作者；
+适合论文较少的大量作者，省去每个作者一次的搜索往返
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Sequence
+
+# 作者字段的分隔符（知网列表中为分号，也兼容逗号和顿号）
+_AUTHOR_SEPARATORS = re.compile(r"[;；,，、]")
+
+
+def _normalize_name(name: str) -> str:
+    return re.sub(r"\s+", "", unicodedata.normalize("NFKC", name or "")).lower()
+
+
+def split_authors(field: str) -> List[str]:
+    """把论文的作者字段拆分为规范化后的姓名列表"""
+    names = (_normalize_name(part) for part in _AUTHOR_SEPARATORS.split(field or ""))
+    return [name for name in names if name]
+
+
+def build_or_query(names: Sequence[str], institution: str = "") -> str:
+    """构造多个作者的合并检索式，指定单位时整体限定在该单位"""
+    search_query = " OR ".join(f"作者:{name}" for name in names)
+    if institution:
+        search_query = f"({search_query}) AND 单位:{institution}"
+    return search_query
+
+
+def plan_groups(authors: Sequence[Dict], size: int) -> List[List[Dict]]:
+    """
+    把作者按单位分组，每组最多 size 人
+
+    单位相同的作者才能合并（检索式只能限定一个单位）；组的顺序按各单位首次出现的顺序
+    """
+    by_institution: Dict[str, List[Dict]] = {}
+    for author_info in authors:
+        institution = author_info.get("institution", "").strip()
+        by_institution.setdefault(institution, []).append(author_info)
+
+    size = max(1, size)
+    return [
+        members[i : i + size]
+        for members in by_institution.values()
+        for i in range(0, len(members), size)
+    ]
+
+
+def demultiplex(papers: Sequence[Dict], names: Sequence[str]):
+    """
+    按作者字段把合并检索的结果分回各作者
+
+    合著论文分给每一位匹配的作者；姓名按完整姓名比较，不做模糊匹配
+
+    Returns:
+        (姓名 -> 论文列表, 没有匹配任何作者的论文列表)
+    """
+    keys = {name: _normalize_name(name) for name in names}
+    by_author: Dict[str, List[Dict]] = {name: [] for name in names}
+    unmatched = []
+    for paper in papers:
+        paper_authors = set(split_authors(paper.get("作者", "")))
+        matched = [name for name, key in keys.items() if key in paper_authors]
+        for name in matched:
+            by_author[name].append(paper)
+        if not matched:
+            unmatched.append(paper)
+    return by_author, unmatched
@@ -0,0 +1,40 @@
+"""
+请求限速模块
+多个浏览器（线程）共用一个限速器，保证本进程对知网的页面请求不超过配置的频率
+"""
+
+import threading
+import time
+from typing import Optional
+
+from .config import CRAWLER_CONFIG
+
+
+class RateLimiter:
+    """相邻两次请求之间至少间隔 interval 秒"""
+
+    def __init__(self, interval: Optional[float] = None):
+        """
+        Args:
+            interval: 最小间隔（秒），None表示每次调用时读取配置 min_request_interval
+        """
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """预约下一次请求，返回发出请求前还需等待的秒数"""
+        interval = self.interval
+        if interval is None:
+            interval = CRAWLER_CONFIG["min_request_interval"]
+        if not interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + interval
+        return start - now
+
+
+# 本进程所有爬虫共用的页面请求限速器
+PAGE_REQUESTS = RateLimiter()
@@ -0,0 +1,147 @@
+"""
+离线批量重新提取模块
+知网页面结构变化后，用进程池对保存的结果页HTML重新运行提取逻辑
+"""
+
+import contextlib
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .cnki_crawler_improved import CNKICrawlerImproved
+from .fake_driver import FakeDriver
+from .page_archive import read_archive
+from .sinks import OutputSink
+
+HTML_SUFFIXES = (".html", ".htm")
+
+# 一个任务：(作者信息, [(URL, HTML), ...])，同一作者的页面一起提取、一起输出
+Task = Tuple[Dict, List[Tuple[str, str]]]
+
+# 每个工作进程复用的爬虫实例
+_worker_crawler: Optional[CNKICrawlerImproved] = None
+
+
+def iter_tasks(source: str) -> Iterator[Task]:
+    """
+    从HTML目录或录制归档中读取待提取的页面
+
+    Args:
+        source: 目录（每个HTML文件作为一个作者，作者名取文件名）或 crawl --record 生成的归档
+    """
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if not name.lower().endswith(HTML_SUFFIXES):
+                    continue
+                path = os.path.join(root, name)
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    html = f.read()
+                author_info = {"name": os.path.splitext(name)[0], "institution": ""}
+                yield author_info, [(f"file://{os.path.abspath(path)}", html)]
+        return
+
+    for record in read_archive(source):
+        # 只有结果页同步点对应要提取的页面
+        pages = [
+            (page.get("url", ""), page.get("html", ""))
+            for page in record.get("pages", [])
+            if page.get("label") == "page"
+        ]
+        if pages:
+            author_info = {
+                "name": record["author"],
+                "institution": record.get("institution", ""),
+            }
+            yield author_info, pages
+
+
+def extract_pages(pages: List[Tuple[str, str]]) -> List[Dict]:
+    """用CNKICrawlerImproved的提取逻辑处理一组页面"""
+    global _worker_crawler
+    if _worker_crawler is None:
+        _worker_crawler = CNKICrawlerImproved(driver=FakeDriver())
+
+    papers = []
+    # 提取过程中的调试输出在批量处理时没有意义
+    with contextlib.redirect_stdout(io.StringIO()):
+        for url, html in pages:
+            _worker_crawler.driver.load_html(html, url or "about:blank")
+            papers.extend(_worker_crawler._extract_papers_from_page())
+    return papers
+
+
+def _extract_tasks(tasks: List[Task]) -> List[Tuple[Dict, List[Dict], int]]:
+    return [
+        (author_info, extract_pages(pages), len(pages)) for author_info, pages in tasks
+    ]
+
+
+def _chunks(tasks: Iterator[Task], pages_per_chunk: int) -> Iterator[List[Task]]:
+    """把任务按页面数分组，减少进程间通信次数"""
+    chunk: List[Task] = []
+    pages = 0
+    for task in tasks:
+        chunk.append(task)
+        pages += len(task[1])
+        if pages >= pages_per_chunk:
+            yield chunk
+            chunk, pages = [], 0
+    if chunk:
+        yield chunk
+
+
+def reextract(
+    source: str,
+    sink: OutputSink,
+    workers: Optional[int] = None,
+    window: int = 4,
+    pages_per_chunk: int = 16,
+) -> Dict:
+    """
+    并行重新提取并按输入顺序写入输出
+
+    Args:
+        source: HTML目录或录制归档
+        sink: 输出对象
+        workers: 进程数，默认CPU核数；为1时在当前进程中处理
+        window: 每个进程最多排队的任务组数，限制大归档的内存占用
+        pages_per_chunk: 每次交给工作进程的页面数
+
+    Returns:
+        统计信息：作者数、页面数、论文数和耗时
+    """
+    workers = workers or os.cpu_count() or 1
+    stats = {"authors": 0, "pages": 0, "papers": 0}
+    start = time.perf_counter()
+
+    def output(author_info: Dict, papers: List[Dict], pages: int):
+        stats["authors"] += 1
+        stats["pages"] += pages
+        stats["papers"] += len(papers)
+        if papers:
+            sink.write(author_info, papers)
+
+    chunks = _chunks(iter_tasks(source), pages_per_chunk)
+    if workers == 1:
+        for chunk in chunks:
+            for result in _extract_tasks(chunk):
+                output(*result)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: deque = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_extract_tasks, chunk))
+                # 按提交顺序输出，同时限制在途任务数
+                while len(pending) >= workers * window:
+                    for result in pending.popleft().result():
+                        output(*result)
+            while pending:
+                for result in pending.popleft().result():
+                    output(*result)
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,367 @@
+"""
+输出模块
+将每个作者的论文列表写入Excel目录、CSV、JSON Lines文件或SQLite论文库，并可读回已写出的结果
+"""
+
+import csv
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from .config import CRAWLER_CONFIG, EXCEL_COLUMNS
+from .spill import SpillBuffer
+from .store import AUTHOR_COLUMN, INSTITUTION_COLUMN, PaperStore, write_xlsx
+
+# SQLite论文库的文件后缀
+STORE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def papers_to_dataframe(papers: List[Dict]) -> pd.DataFrame:
+    """按EXCEL_COLUMNS的列顺序构造DataFrame"""
+    df = pd.DataFrame(papers)
+    columns_order = [AUTHOR_COLUMN, INSTITUTION_COLUMN] + list(EXCEL_COLUMNS.values())
+    existing_columns = [col for col in columns_order if col in df.columns]
+    return df[existing_columns]
+
+
+def _tag_rows(author_info: Dict, papers: List[Dict]) -> List[Dict]:
+    """为每行加上检索作者和单位"""
+    return [
+        {
+            AUTHOR_COLUMN: author_info["name"],
+            INSTITUTION_COLUMN: author_info.get("institution", ""),
+            **paper,
+        }
+        for paper in papers
+    ]
+
+
+class OutputSink(ABC):
+    """输出基类"""
+
+    # 写入时与已有结果合并（按论文更新），而不是覆盖或追加；增量模式只输出新论文，需要合并
+    merges = False
+
+    @abstractmethod
+    def write(self, author_info: Dict, papers: List[Dict]) -> str:
+        """
+        写入一个作者的论文
+
+        Returns:
+            输出位置描述
+        """
+
+    def target_for(self, author_info: Dict) -> str:
+        """作者的论文将写入的位置"""
+        return getattr(self, "path", "")
+
+    def close(self):
+        """结束输出"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ExcelDirSink(OutputSink):
+    """每个作者一个Excel文件，带检索作者和单位列，读回时不依赖文件名"""
+
+    def __init__(self, output_dir: str = "batch_output"):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+    def filename_for(self, author_info: Dict) -> str:
+        """作者对应的Excel文件名"""
+        institution = author_info.get("institution", "")
+        if institution:
+            name = f"{author_info['name']}_{institution}_papers.xlsx"
+        else:
+            name = f"{author_info['name']}_papers.xlsx"
+        return os.path.join(self.output_dir, name)
+
+    def target_for(self, author_info: Dict) -> str:
+        return self.filename_for(author_info)
+
+    def write(self, author_info: Dict, papers: List[Dict]) -> str:
+        filename = self.filename_for(author_info)
+        papers_to_dataframe(_tag_rows(author_info, papers)).to_excel(
+            filename, index=False, engine=CRAWLER_CONFIG["excel_engine"]
+        )
+        return filename
+
+
+class CsvSink(OutputSink):
+    """所有作者汇总到一个CSV文件"""
+
+    fieldnames = [AUTHOR_COLUMN, INSTITUTION_COLUMN] + list(EXCEL_COLUMNS.values())
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(
+            path, "a" if append else "w", newline="", encoding="utf-8-sig"
+        )
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=self.fieldnames, extrasaction="ignore"
+        )
+        if not exists:
+            self._writer.writeheader()
+
+    def write(self, author_info: Dict, papers: List[Dict]) -> str:
+        self._writer.writerows(_tag_rows(author_info, papers))
+        self._file.flush()
+        return self.path
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink(OutputSink):
+    """所有作者汇总到一个JSON Lines文件，每行一篇论文"""
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, author_info: Dict, papers: List[Dict]) -> str:
+        for row in _tag_rows(author_info, papers):
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+        return self.path
+
+    def close(self):
+        self._file.close()
+
+
+class ExcelFileSink(OutputSink):
+    """
+    所有作者汇总到一个Excel文件
+
+    Excel只能在最后一次性写出，期间的论文放在溢出缓冲中，
+    超过 max_rows 行后写入临时文件，关闭时流式合并写出
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_rows: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        if max_rows is None:
+            max_rows = CRAWLER_CONFIG["spill_rows"]
+        self.path = path
+        self.buffer = SpillBuffer(max_rows, spill_dir)
+
+    def write(self, author_info: Dict, papers: List[Dict]) -> str:
+        self.buffer.extend(_tag_rows(author_info, papers))
+        return self.path
+
+    def close(self):
+        try:
+            write_xlsx(self.path, self.buffer)
+        finally:
+            self.buffer.close()
+
+
+class StoreSink(OutputSink):
+    """写入SQLite论文库，合著论文只保存一次，重复运行时更新计数"""
+
+    merges = True
+
+    def __init__(self, path: str, shared: bool = False):
+        self.path = path
+        self.store = PaperStore(path, shared=shared)
+
+    def write(self, author_info: Dict, papers: List[Dict]) -> str:
+        self.store.add(author_info, papers)
+        return self.path
+
+    def close(self):
+        self.store.close()
+
+
+class BackgroundSink(OutputSink):
+    """
+    在后台线程中写出，write() 只把论文放入有界队列后立即返回
+
+    队列满时 write() 等待，避免结果堆积占用内存；close() 写完队列中剩余的论文。
+    写出失败的作者记录在 errors 中，由调用方汇总；需要知道每个作者是否写出成功时，
+    write() 传入 on_done 回调
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        sink: OutputSink,
+        queue_size: Optional[int] = None,
+        close_inner: bool = True,
+        on_write: Optional[Callable[[float], None]] = None,
+    ):
+        """
+        Args:
+            sink: 实际的输出对象，只在后台线程中调用
+            queue_size: 等待写出的作者数上限
+            close_inner: close() 时是否同时关闭 sink
+            on_write: 每次写出后以耗时（秒）回调，用于运行指标
+        """
+        if queue_size is None:
+            queue_size = CRAWLER_CONFIG["writer_queue_size"]
+        self.sink = sink
+        self.close_inner = close_inner
+        self.on_write = on_write
+        self.errors: List[Tuple[Dict, str]] = []
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="background-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while (item := self._queue.get()) is not self._STOP:
+            author_info, papers, on_done = item
+            start = time.perf_counter()
+            error = None
+            try:
+                self.sink.write(author_info, papers)
+            except Exception as e:
+                error = e
+                self.errors.append((author_info, str(e)))
+                print(f"❌ 写出 {author_info['name']} 的论文失败：{str(e)}")
+            if self.on_write is not None:
+                self.on_write(time.perf_counter() - start)
+            if on_done is not None:
+                try:
+                    on_done(error)
+                except Exception as e:
+                    print(f"❌ 处理 {author_info['name']} 的写出结果时出错：{str(e)}")
+
+    def write(
+        self,
+        author_info: Dict,
+        papers: List[Dict],
+        on_done: Optional[Callable[[Optional[Exception]], None]] = None,
+    ) -> str:
+        """
+        把论文放入写出队列
+
+        Args:
+            on_done: 在后台线程中写出后回调，参数为写出时的异常，成功时为None
+        """
+        if self._closed:
+            raise RuntimeError("后台写出已关闭")
+        self._queue.put((author_info, papers, on_done))
+        return self.sink.target_for(author_info)
+
+    def target_for(self, author_info: Dict) -> str:
+        return self.sink.target_for(author_info)
+
+    def pending(self) -> int:
+        """等待写出的作者数"""
+        return self._queue.qsize()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+        if self.close_inner:
+            self.sink.close()
+
+
+def open_sink(target: str, append: bool = False, shared: bool = False) -> OutputSink:
+    """
+    根据输出路径创建输出对象
+
+    Args:
+        target: 以 .csv / .jsonl / .xlsx 结尾时写入单个文件，以 .db / .sqlite 结尾时写入论文库，
+            否则视为Excel输出目录
+        append: 单文件输出时是否追加（用于断点续跑）；论文库总是追加
+        shared: 论文库由多台机器的工作进程共同写入
+    """
+    lower = target.lower()
+    if lower.endswith(STORE_SUFFIXES):
+        return StoreSink(target, shared=shared)
+    if lower.endswith(".csv"):
+        return CsvSink(target, append=append)
+    if lower.endswith(".xlsx"):
+        return ExcelFileSink(target)
+    if lower.endswith((".jsonl", ".ndjson")):
+        return JsonlSink(target, append=append)
+    return ExcelDirSink(target)
+
+
+def read_output(target: str) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """
+    读取 open_sink 写出的结果，按检索作者分组
+
+    Args:
+        target: .csv / .jsonl / .xlsx 文件、论文库，或每个作者一个Excel的目录
+
+    Yields:
+        (作者信息, 论文列表)
+    """
+    lower = target.lower()
+    if lower.endswith(STORE_SUFFIXES):
+        with PaperStore(target) as store:
+            # query 按作者顺序返回，相邻行即同一作者
+            for author_info, rows in itertools.groupby(
+                store.query(), key=lambda row: tuple(row[0].items())
+            ):
+                yield dict(author_info), [paper for _, paper in rows]
+        return
+    if lower.endswith((".csv", ".jsonl", ".ndjson")) or os.path.isfile(target):
+        if lower.endswith(".csv"):
+            with open(target, newline="", encoding="utf-8-sig") as f:
+                rows = list(csv.DictReader(f))
+        elif lower.endswith(".xlsx"):
+            # ExcelFileSink 写出的汇总文件，可能分为多个工作表
+            sheets = pd.read_excel(
+                target, sheet_name=None, engine=CRAWLER_CONFIG["excel_engine"]
+            )
+            rows = [
+                record
+                for df in sheets.values()
+                for record in df.fillna("").astype(str).to_dict("records")
+            ]
+        else:
+            with open(target, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for row in rows:
+            key = (row.pop(AUTHOR_COLUMN, ""), row.pop(INSTITUTION_COLUMN, ""))
+            groups.setdefault(key, []).append(row)
+        for (name, institution), papers in groups.items():
+            yield {"name": name, "institution": institution}, papers
+        return
+
+    for name in sorted(os.listdir(target)):
+        if not name.endswith("_papers.xlsx"):
+            continue
+        df = pd.read_excel(
+            os.path.join(target, name), engine=CRAWLER_CONFIG["excel_engine"]
+        )
+        papers = df.fillna("").astype(str).to_dict("records")
+        if papers and AUTHOR_COLUMN in papers[0]:
+            author = papers[0][AUTHOR_COLUMN]
+            institution = papers[0].get(INSTITUTION_COLUMN, "")
+            for paper in papers:
+                paper.pop(AUTHOR_COLUMN, None)
+                paper.pop(INSTITUTION_COLUMN, None)
+        else:
+            # 没有检索作者列的文件（save_to_excel 等保存的）只能按文件名
+            # 作者_单位_papers.xlsx 或 作者_papers.xlsx 拆分，姓名中不能含下划线
+            author, _, institution = name[: -len("_papers.xlsx")].partition("_")
+        yield {"name": author, "institution": institution}, papers
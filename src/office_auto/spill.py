@@ -0,0 +1,148 @@
+"""
+溢出缓冲模块
+内存中只保留有限行数，超过后把整块写入临时文件，最后按写入顺序流式读回
+"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .config import CRAWLER_CONFIG, EXCEL_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow为可选依赖，没有时退回gzip压缩的JSON Lines
+    pa = pq = None
+
+SPILL_FORMATS = ("parquet", "jsonl")
+
+
+def _parquet_table(rows: List[Dict]):
+    """
+    用显式的字符串schema构建表
+
+    列为 EXCEL_COLUMNS 加上所有行中出现过的键，不按第一行推断，
+    其它行多出的键不会丢失，类型不同的值也不会出错；值统一存为字符串
+    """
+    names = dict.fromkeys(EXCEL_COLUMNS.values())
+    for row in rows:
+        names.update(dict.fromkeys(row))
+    schema = pa.schema([(name, pa.string()) for name in names])
+    return pa.Table.from_pylist(
+        [
+            {key: None if value is None else str(value) for key, value in row.items()}
+            for row in rows
+        ],
+        schema=schema,
+    )
+
+
+class SpillBuffer:
+    """
+    有界内存的行缓冲
+
+    append/extend 的行先放在内存中，达到 max_rows 后整块写入临时目录；
+    迭代时依次读回各块和内存中剩余的行，峰值内存与总行数无关
+    """
+
+    def __init__(
+        self,
+        max_rows: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+        spill_format: Optional[str] = None,
+    ):
+        """
+        Args:
+            max_rows: 内存中最多保留的行数
+            spill_dir: 临时文件的上级目录，默认系统临时目录
+            spill_format: parquet 或 jsonl，默认安装了pyarrow时用parquet
+        """
+        if max_rows is None:
+            max_rows = CRAWLER_CONFIG["spill_rows"]
+        spill_format = spill_format or ("parquet" if pq is not None else "jsonl")
+        if spill_format not in SPILL_FORMATS:
+            raise ValueError(f"未知的溢出格式: {spill_format}")
+        if spill_format == "parquet" and pq is None:
+            raise ValueError("parquet 格式需要安装 pyarrow")
+
+        self.max_rows = max(1, max_rows)
+        self.spill_format = spill_format
+        self._parent_dir = spill_dir
+        self._dir: Optional[str] = None
+        self._rows: List[Dict] = []
+        self._chunks: List[str] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def spilled_chunks(self) -> int:
+        """已写入临时文件的块数"""
+        return len(self._chunks)
+
+    def append(self, row: Dict):
+        self._rows.append(row)
+        self._count += 1
+        if len(self._rows) >= self.max_rows:
+            self._spill()
+
+    def extend(self, rows: Iterable[Dict]):
+        for row in rows:
+            self.append(row)
+
+    def _spill(self):
+        if self._dir is None:
+            if self._parent_dir:
+                os.makedirs(self._parent_dir, exist_ok=True)
+            self._dir = tempfile.mkdtemp(
+                prefix="office_auto_spill_", dir=self._parent_dir
+            )
+        path = os.path.join(self._dir, f"{len(self._chunks):06d}.{self.spill_format}")
+        if self.spill_format == "parquet":
+            pq.write_table(_parquet_table(self._rows), path)
+        else:
+            path += ".gz"
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                for row in self._rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._chunks.append(path)
+        self._rows = []
+
+    def _read_chunk(self, path: str) -> Iterator[Dict]:
+        if self.spill_format == "parquet":
+            # 按批读取，不把整块加载到内存
+            for batch in pq.ParquetFile(path).iter_batches():
+                # 行中原本没有的列读回为None，去掉
+                for row in batch.to_pylist():
+                    yield {
+                        key: value for key, value in row.items() if value is not None
+                    }
+        else:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """按写入顺序流式读出所有行"""
+        for path in self._chunks:
+            yield from self._read_chunk(path)
+        yield from self._rows
+
+    def close(self):
+        """删除临时文件"""
+        self._rows = []
+        self._chunks = []
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
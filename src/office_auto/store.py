@@ -0,0 +1,408 @@
+"""
+论文库模块
+把爬取结果保存到SQLite（WAL模式），按指纹合并重复论文，支持按作者和日期查询、
+对标题/摘要/关键词全文检索并导出Excel
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from openpyxl import Workbook
+
+from .batch_input import author_key
+from .config import EXCEL_COLUMNS
+from .dedup import normalize_date, paper_fingerprint
+from .fulltext import index_text, match_query
+
+# 导出时标记检索作者的列，与汇总输出一致
+AUTHOR_COLUMN = "检索作者"
+INSTITUTION_COLUMN = "检索单位"
+
+# 论文表的内容列，与EXCEL_COLUMNS的键一一对应
+PAPER_FIELDS = list(EXCEL_COLUMNS)
+
+# 重复写入时只在新值非空时覆盖的列（例如计数和详情字段会随时间更新）
+_UPSERT_SET = ", ".join(
+    f"{field} = COALESCE(NULLIF(excluded.{field}, ''), papers.{field})"
+    for field in PAPER_FIELDS
+    if field not in ("title", "journal", "date")
+)
+
+# 全文索引的列及其在排序中的权重（标题命中最重要）
+FTS_FIELDS = {"title": 10.0, "abstract": 1.0, "keywords": 5.0}
+
+# SQLite单条语句的参数个数上限较低，按此大小分批查询
+_IN_CHUNK = 500
+
+# Excel单个工作表的最大数据行数（不含表头）
+EXCEL_MAX_ROWS = 1048575
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS papers (
+    fingerprint INTEGER PRIMARY KEY,
+    {", ".join(f"{field} TEXT NOT NULL DEFAULT ''" for field in PAPER_FIELDS)},
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    institution TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS author_papers (
+    author_id INTEGER NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    PRIMARY KEY (author_id, fingerprint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_papers_date ON papers (date);
+CREATE INDEX IF NOT EXISTS idx_authors_name ON authors (name);
+CREATE INDEX IF NOT EXISTS idx_author_papers_fingerprint
+    ON author_papers (fingerprint);
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5 ({", ".join(FTS_FIELDS)});
+"""
+
+
+def write_xlsx(path: str, rows: Iterable[Dict]) -> int:
+    """
+    把带检索作者列的论文逐行写入Excel，超过单表行数上限时自动分表
+
+    Returns:
+        写出的行数
+    """
+    header = [AUTHOR_COLUMN, INSTITUTION_COLUMN] + list(EXCEL_COLUMNS.values())
+    # write_only 模式逐行写出，内存占用与行数无关
+    workbook = Workbook(write_only=True)
+    sheet = None
+    count = 0
+    for row in rows:
+        if count % EXCEL_MAX_ROWS == 0:
+            sheet = workbook.create_sheet(f"论文{count // EXCEL_MAX_ROWS + 1}")
+            sheet.append(header)
+        sheet.append([row.get(column, "") for column in header])
+        count += 1
+    if sheet is None:
+        workbook.create_sheet("论文1").append(header)
+    workbook.save(path)
+    return count
+
+
+def _paper_row(paper: Dict, updated_at: float) -> Tuple:
+    values = {field: paper.get(column) or "" for field, column in EXCEL_COLUMNS.items()}
+    values["date"] = normalize_date(values["date"]) or values["date"]
+    return (
+        paper_fingerprint(paper),
+        *(str(values[field]) for field in PAPER_FIELDS),
+        updated_at,
+    )
+
+
+class PaperStore:
+    """
+    SQLite论文库（线程安全）
+
+    papers 表按指纹保存每篇论文一次，authors 和 author_papers 记录检索作者与论文的关联；
+    同一篇论文再次写入时更新被引/下载次数等字段
+    """
+
+    def __init__(self, path: str, batch_size: int = 5000, shared: bool = False):
+        """
+        Args:
+            path: 数据库文件路径
+            batch_size: add_many 每个事务写入的论文数
+            shared: 多台机器通过共享存储同时写入，此时不能使用WAL模式
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            path, timeout=60 if shared else 5, check_same_thread=False
+        )
+        if shared:
+            # WAL依赖同一台机器上的共享内存，网络文件系统上改用回滚日志
+            self._db.execute("PRAGMA journal_mode=DELETE")
+        else:
+            # WAL模式下读取不阻塞写入，批量写入时NORMAL同步足够安全
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        has_index = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'"
+        ).fetchone()
+        self._db.executescript(SCHEMA)
+        self._author_ids: Dict[str, int] = {}
+        # 当前事务中新缓存的作者，回滚时这些编号可能被之后插入的作者重用
+        self._uncommitted: Set[str] = set()
+        if not has_index:
+            # 旧版本创建的论文库补建全文索引
+            self.rebuild_index()
+
+    def _author_id(self, author_info: Dict) -> int:
+        key = author_key(author_info)
+        if key not in self._author_ids:
+            self._db.execute(
+                "INSERT OR IGNORE INTO authors (key, name, institution) VALUES (?, ?, ?)",
+                (key, author_info["name"], author_info.get("institution", "")),
+            )
+            (author_id,) = self._db.execute(
+                "SELECT id FROM authors WHERE key = ?", (key,)
+            ).fetchone()
+            self._author_ids[key] = author_id
+            self._uncommitted.add(key)
+        return self._author_ids[key]
+
+    def _commit(self):
+        self._db.commit()
+        self._uncommitted.clear()
+
+    def _rollback(self):
+        """回滚事务，并丢弃事务中缓存的作者编号"""
+        self._db.rollback()
+        for key in self._uncommitted:
+            self._author_ids.pop(key, None)
+        self._uncommitted.clear()
+
+    def _upsert(self, author_info: Dict, papers: List[Dict], now: float):
+        rows = [_paper_row(paper, now) for paper in papers]
+        placeholders = ", ".join("?" * (len(PAPER_FIELDS) + 2))
+        self._db.executemany(
+            f"INSERT INTO papers (fingerprint, {', '.join(PAPER_FIELDS)}, updated_at) "
+            f"VALUES ({placeholders}) "
+            f"ON CONFLICT (fingerprint) DO UPDATE SET {_UPSERT_SET}, "
+            "updated_at = excluded.updated_at",
+            rows,
+        )
+        author_id = self._author_id(author_info)
+        self._db.executemany(
+            "INSERT OR IGNORE INTO author_papers VALUES (?, ?)",
+            [(author_id, row[0]) for row in rows],
+        )
+        self._index([row[0] for row in rows])
+
+    def _index(self, fingerprints: List[int]):
+        """用合并后的字段更新这些论文的全文索引"""
+        columns = ", ".join(FTS_FIELDS)
+        for start in range(0, len(fingerprints), _IN_CHUNK):
+            chunk = fingerprints[start : start + _IN_CHUNK]
+            rows = self._db.execute(
+                f"SELECT fingerprint, {columns} FROM papers "
+                f"WHERE fingerprint IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO papers_fts (rowid, {columns}) "
+                f"VALUES (?, {', '.join('?' * len(FTS_FIELDS))})",
+                [(row[0], *map(index_text, row[1:])) for row in rows],
+            )
+
+    def rebuild_index(self):
+        """重建全部论文的全文索引"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM papers_fts")
+            fingerprints = [
+                row[0] for row in self._db.execute("SELECT fingerprint FROM papers")
+            ]
+            self._index(fingerprints)
+
+    def add(self, author_info: Dict, papers: List[Dict]):
+        """在一个事务中写入一个作者的论文"""
+        with self._lock:
+            try:
+                self._upsert(author_info, papers, time.time())
+                self._commit()
+            except BaseException:
+                self._rollback()
+                raise
+
+    def add_many(self, items: Iterable[Tuple[Dict, List[Dict]]]) -> int:
+        """
+        批量写入多个作者的论文，每 batch_size 篇提交一次
+
+        Returns:
+            写入的论文数（包括更新）
+        """
+        total = pending = 0
+        with self._lock:
+            try:
+                for author_info, papers in items:
+                    self._upsert(author_info, papers, time.time())
+                    total += len(papers)
+                    pending += len(papers)
+                    if pending >= self.batch_size:
+                        self._commit()
+                        pending = 0
+                self._commit()
+            except BaseException:
+                self._rollback()
+                raise
+        return total
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def authors(self) -> List[Dict]:
+        """库中的全部检索作者"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, institution FROM authors ORDER BY id"
+            ).fetchall()
+        return [
+            {"name": name, "institution": institution} for name, institution in rows
+        ]
+
+    def query(
+        self,
+        author: Optional[str] = None,
+        institution: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Iterator[Tuple[Dict, Dict]]:
+        """
+        按条件逐行读取论文，合著论文对每个检索作者各返回一次
+
+        Args:
+            author: 检索作者姓名
+            institution: 检索单位
+            date_from: 最早发表日期（含），如 2020 或 2020-01-01
+            date_to: 最晚发表日期（含）
+
+        Yields:
+            (作者信息, 以EXCEL_COLUMNS列名为键的论文)
+        """
+        conditions, params = [], []
+        if author is not None:
+            conditions.append("a.name = ?")
+            params.append(author)
+        if institution is not None:
+            conditions.append("a.institution = ?")
+            params.append(institution)
+        if date_from:
+            conditions.append("p.date >= ?")
+            params.append(normalize_date(date_from))
+        if date_to:
+            # "~" 大于数字和 "-"，使 2020 包含 2020-12-31
+            conditions.append("p.date <= ?")
+            params.append(normalize_date(date_to) + "~")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        sql = (
+            f"SELECT a.name, a.institution, {', '.join(f'p.{f}' for f in PAPER_FIELDS)} "
+            "FROM author_papers ap "
+            "JOIN authors a ON a.id = ap.author_id "
+            "JOIN papers p ON p.fingerprint = ap.fingerprint "
+            f"{where} ORDER BY a.id, p.date DESC"
+        )
+        # 单独的只读连接，导出大量数据时不占用写入锁
+        db = sqlite3.connect(self.path)
+        try:
+            for row in db.execute(sql, params):
+                author_info = {"name": row[0], "institution": row[1]}
+                paper = {
+                    EXCEL_COLUMNS[field]: value
+                    for field, value in zip(PAPER_FIELDS, row[2:])
+                }
+                yield author_info, paper
+        finally:
+            db.close()
+
+    def search_local(
+        self,
+        query: str,
+        author: Optional[str] = None,
+        year_range: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        limit: int = 20,
+    ) -> List[Dict]:
+        """
+        在标题、摘要和关键词中全文检索
+
+        Args:
+            query: 检索词，空格分隔的多个词需同时出现
+            author: 只检索该检索作者的论文
+            year_range: (起始年, 结束年)，含两端，任一端为None表示不限
+            limit: 最多返回的条数
+
+        Returns:
+            按相关度排序的论文（以EXCEL_COLUMNS列名为键），
+            AUTHOR_COLUMN 列为关联的检索作者
+
+        Raises:
+            ValueError: 查询中没有可检索的文字
+        """
+        conditions, params = ["papers_fts MATCH ?"], [match_query(query)]
+        start, end = year_range or (None, None)
+        if start is not None:
+            conditions.append("p.date >= ?")
+            params.append(f"{start}")
+        if end is not None:
+            conditions.append("p.date <= ?")
+            params.append(f"{end}~")
+        if author is not None:
+            conditions.append(
+                "p.fingerprint IN (SELECT ap.fingerprint FROM author_papers ap "
+                "JOIN authors a ON a.id = ap.author_id WHERE a.name = ?)"
+            )
+            params.append(author)
+        weights = ", ".join(str(weight) for weight in FTS_FIELDS.values())
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT p.fingerprint, {', '.join(f'p.{f}' for f in PAPER_FIELDS)} "
+                "FROM papers_fts JOIN papers p ON p.fingerprint = papers_fts.rowid "
+                f"WHERE {' AND '.join(conditions)} "
+                f"ORDER BY bm25(papers_fts, {weights}) LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+            authors = dict(
+                self._db.execute(
+                    "SELECT ap.fingerprint, group_concat(a.name, '; ') "
+                    "FROM author_papers ap JOIN authors a ON a.id = ap.author_id "
+                    f"WHERE ap.fingerprint IN ({', '.join('?' * len(rows))}) "
+                    "GROUP BY ap.fingerprint",
+                    [row[0] for row in rows],
+                ).fetchall()
+            )
+
+        return [
+            {
+                AUTHOR_COLUMN: authors.get(row[0], ""),
+                **{
+                    EXCEL_COLUMNS[field]: value
+                    for field, value in zip(PAPER_FIELDS, row[1:])
+                },
+            }
+            for row in rows
+        ]
+
+    def export_excel(self, path: str, **filters) -> int:
+        """
+        把查询结果导出为Excel，超过单表行数上限时自动分表
+
+        Args:
+            path: 输出的 .xlsx 路径
+            **filters: 传给 query 的筛选条件
+
+        Returns:
+            导出的行数
+        """
+        return write_xlsx(
+            path,
+            (
+                {
+                    AUTHOR_COLUMN: author_info["name"],
+                    INSTITUTION_COLUMN: author_info["institution"],
+                    **paper,
+                }
+                for author_info, paper in self.query(**filters)
+            ),
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,296 @@
+"""
+多标签页爬取模块
+在同一个Chrome进程中打开多个标签页，每个标签页执行一个作者的搜索，
+轮流检查各标签页的加载状态，在一个页面加载时处理其它标签页
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from selenium.webdriver.common.by import By
+
+from .cnki_crawler_improved import (
+    RESULT_CONTAINER_SELECTOR,
+    STATUS_EMPTY,
+    STATUS_ERROR,
+    STATUS_PARTIAL,
+    CNKICrawlerImproved,
+)
+from .config import CRAWLER_CONFIG
+from .deadline import Deadline
+from .delay_tuner import PHASE_PAGE, PHASE_SEARCH
+from .dedup import unique_papers
+from .page_classifier import BLOCKING_STATUSES, PAGE_OK, classify_driver_page
+
+# 标签页任务状态
+_STARTING = "starting"  # 已预约请求，到 ready_at 时打开检索页
+_LOADING = "loading"  # 等待搜索结果或翻页结果出现
+_WAITING = "waiting"  # 已提取当前页，等待翻页间隔到 ready_at
+_PAGING = "paging"  # 已预约请求，到 ready_at 时点击下一页
+
+
+class _TabTask:
+    """一个标签页中正在执行的作者搜索"""
+
+    def __init__(self, handle: str, key, author_info: Dict, deadline: Deadline):
+        self.handle = handle
+        self.key = key
+        self.author_info = author_info
+        self.deadline = deadline
+        self.papers: List[Dict] = []
+        self.seen: set = set()  # 已提取论文的指纹，跳过翻页时重复出现的结果
+        self.page = 1
+        self.state = _STARTING
+        self.signature = None  # 翻页前第一条结果的文本，用于判断新页面是否已加载
+        self.previous_url = None  # 发起搜索前的URL，变化后才说明新页面已开始加载
+        self.empty_since = None  # 结果列表出现但还没有结果行的时刻
+        self.loading_since = time.monotonic()
+        # 翻页间隔和请求限速都不在轮询线程中休眠，而是记下时刻，到时前跳过该标签页
+        self.ready_at = 0.0
+
+
+class MultiTabCrawler:
+    """在一个浏览器中用多个标签页并发搜索"""
+
+    def __init__(
+        self,
+        crawler: CNKICrawlerImproved,
+        tabs: int = 3,
+        poll_interval: float = 0.2,
+        page_delay: Optional[float] = None,
+        settle: Optional[float] = None,
+    ):
+        """
+        初始化多标签页爬虫
+
+        Args:
+            crawler: 提供浏览器和提取逻辑的爬虫实例
+            tabs: 标签页数量
+            poll_interval: 所有标签页都在加载时的轮询间隔（秒）
+            page_delay: 同一标签页两次翻页之间的最小间隔（秒）
+            settle: 结果列表已出现但没有结果行时，持续这么久（秒）仍没有结果行才认为确实没有结果，
+                默认取配置 search_delay
+        """
+        if page_delay is None:
+            page_delay = CRAWLER_CONFIG["page_delay"]
+        if settle is None:
+            settle = CRAWLER_CONFIG["search_delay"]
+        self.crawler = crawler
+        self.tabs = max(1, tabs)
+        self.poll_interval = poll_interval
+        self.page_delay = page_delay
+        self.settle = settle
+        self.handles: List[str] = []
+
+    @property
+    def driver(self):
+        """当前浏览器（重启后会变化）"""
+        return self.crawler.driver
+
+    def _open_tabs(self):
+        """打开所需数量的标签页"""
+        if self.handles:
+            return
+        self.handles.append(self.driver.current_window_handle)
+        for _ in range(self.tabs - 1):
+            self.driver.switch_to.new_window("tab")
+            self.handles.append(self.driver.current_window_handle)
+
+    def _start(self, task: _TabTask):
+        """在标签页中发起搜索，不等待页面加载；需要限速时推迟到预约的时刻"""
+        wait = self.crawler._reserve_request()
+        if wait > 0:
+            task.ready_at = time.monotonic() + wait
+            return
+        self._open_search(task)
+
+    def _open_search(self, task: _TabTask):
+        """在标签页中打开检索页"""
+        self.driver.switch_to.window(task.handle)
+        task.previous_url = self.driver.current_url
+        url = self.crawler.build_search_url(
+            task.author_info["name"], task.author_info.get("institution", "")
+        )
+        self.driver.execute_script("window.location.href = arguments[0];", url)
+        self.crawler.pages_served += 1
+        task.state = _LOADING
+        task.loading_since = time.monotonic()
+
+    def _signature(self) -> Optional[str]:
+        """当前页面第一条结果的文本"""
+        return self.crawler._result_signature()
+
+    def _rows_ready(self, task: _TabTask, now: float) -> bool:
+        """
+        当前页面的结果行是否已加载
+
+        翻页通常是局部刷新，第一条结果变化后才算新页面加载完成；
+        结果列表持续 settle 秒没有结果行时同样算加载完成（确实没有结果）
+        """
+        signature = self._signature()
+        if signature is not None:
+            task.empty_since = None
+            return signature != task.signature
+        if not self.driver.find_elements(By.CSS_SELECTOR, RESULT_CONTAINER_SELECTOR):
+            return False
+        # 结果列表已出现但还没有结果行：可能仍在加载，也可能确实没有结果
+        if task.empty_since is None:
+            task.empty_since = now
+        return now - task.empty_since >= self.settle
+
+    def _step(self, task: _TabTask, max_pages: int) -> Optional[str]:
+        """
+        推进一个标签页任务
+
+        Returns:
+            任务结束时返回最终状态，否则返回None
+        """
+        now = time.monotonic()
+        if task.deadline.expired():
+            return STATUS_PARTIAL
+
+        if task.state != _LOADING and now < task.ready_at:
+            return None
+        if task.state == _STARTING:
+            self._open_search(task)
+            return None
+        if task.state == _WAITING:
+            wait = self.crawler._reserve_request()
+            task.state = _PAGING
+            if wait > 0:
+                task.ready_at = now + wait
+                return None
+        if task.state == _PAGING:
+            self.driver.switch_to.window(task.handle)
+            task.signature = self._signature()
+            with self.crawler.metrics.timer("paginate"):
+                has_next = self.crawler._click_next_page(throttle=False)
+            if not has_next:
+                return PAGE_OK if task.papers else STATUS_EMPTY
+            task.page += 1
+            task.state = _LOADING
+            task.loading_since = now
+            task.empty_since = None
+            return None
+
+        self.driver.switch_to.window(task.handle)
+        if task.page == 1 and self.driver.current_url == task.previous_url:
+            # 上一个作者的页面还没有被替换
+            ready = False
+        else:
+            status = classify_driver_page(self.driver)
+            if status in BLOCKING_STATUSES:
+                return status
+            ready = self._rows_ready(task, now)
+
+        if not ready:
+            if now - task.loading_since > self.crawler.wait_time:
+                if task.page == 1:
+                    return STATUS_ERROR
+                return PAGE_OK if task.papers else STATUS_EMPTY
+            return None
+
+        metrics = self.crawler.metrics
+        metrics.observe("page_wait", now - task.loading_since)
+        # 从发起搜索或点击下一页到结果行出现的时间，与顺序模式的就绪时间指标一致
+        phase = PHASE_SEARCH if task.page == 1 else PHASE_PAGE
+        metrics.observe(f"ready_{phase}", now - task.loading_since)
+        with metrics.timer("extract"):
+            page_papers = self.crawler._extract_papers_from_page()
+        metrics.incr("pages")
+        if not page_papers:
+            return PAGE_OK if task.papers else STATUS_EMPTY
+        fresh = unique_papers(page_papers, task.seen)
+        if len(fresh) < len(page_papers):
+            metrics.incr("duplicates", len(page_papers) - len(fresh))
+        task.papers.extend(fresh)
+        print(
+            f"[{task.author_info['name']}] 第 {task.page} 页获取到 {len(page_papers)} 篇论文"
+        )
+
+        if task.page >= max_pages:
+            return PAGE_OK
+        task.state = _WAITING
+        task.ready_at = now + self.page_delay
+        return None
+
+    def search_many(
+        self,
+        authors: Iterable[Tuple[object, Dict]],
+        max_pages: int = 5,
+        deadline_factory: Callable[[], Deadline] = Deadline,
+    ) -> Iterator[Tuple[object, Dict, List[Dict], str]]:
+        """
+        交替在多个标签页中搜索作者
+
+        Args:
+            authors: (标识, 作者信息) 序列，按需逐个读取
+            max_pages: 每个作者的最大搜索页数
+            deadline_factory: 为每个作者创建时间预算
+
+        Yields:
+            (标识, 作者信息, 论文列表, 状态)，状态取值同 CNKICrawlerImproved.last_status
+        """
+        self._open_tabs()
+        pending = iter(authors)
+        free = list(self.handles)
+        active: List[_TabTask] = []
+        exhausted = False
+        recycle_pending = False
+
+        while active or not exhausted:
+            # 需要重启浏览器时先等所有标签页完成，再统一重启
+            if recycle_pending and not active:
+                self.handles = []
+                self.crawler.recycle()
+                self._open_tabs()
+                free = list(self.handles)
+                recycle_pending = False
+
+            # 为空闲标签页分配新作者
+            while free and not exhausted and not recycle_pending:
+                try:
+                    key, author_info = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    break
+                task = _TabTask(free.pop(), key, author_info, deadline_factory())
+                try:
+                    self._start(task)
+                    active.append(task)
+                except Exception as e:
+                    print(f"❌ 标签页打开搜索失败：{str(e)}")
+                    free.append(task.handle)
+                    yield key, author_info, [], STATUS_ERROR
+
+            progressed = False
+            for task in list(active):
+                try:
+                    status = self._step(task, max_pages)
+                except Exception as e:
+                    print(f"❌ [{task.author_info['name']}] 标签页处理出错：{str(e)}")
+                    status = STATUS_PARTIAL if task.papers else STATUS_ERROR
+
+                if status is not None:
+                    self.crawler.metrics.incr("rows", len(task.papers))
+                    self.crawler.metrics.incr(f"search_{status}")
+                    active.remove(task)
+                    free.append(task.handle)
+                    progressed = True
+                    recycle_pending = recycle_pending or self.crawler.needs_recycle()
+                    yield task.key, task.author_info, task.papers, status
+
+            if active and not progressed:
+                time.sleep(self.poll_interval)
+
+    def close_tabs(self):
+        """关闭多余的标签页，只保留第一个"""
+        for handle in self.handles[1:]:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        if self.handles:
+            self.driver.switch_to.window(self.handles[0])
+        self.handles = []
@@ -0,0 +1,447 @@
+"""
+分布式任务队列模块
+多台机器上的工作进程从同一个队列领取作者：领取时获得有期限的租约，处理期间定期续租，
+完成后提交结果；进程崩溃时租约过期，作者自动回到队列由其它进程继续处理，不需要消息中间件
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .batch_input import author_key
+from .config import CRAWLER_CONFIG
+
+# 任务状态
+TASK_PENDING = "pending"  # 等待领取
+TASK_LEASED = "leased"  # 已被某个工作进程领取
+TASK_DONE = "done"  # 已处理（批量处理状态见 status 字段）
+TASK_FAILED = "failed"  # 租约过期次数过多，不再重新分配
+
+TASK_STATES = (TASK_PENDING, TASK_LEASED, TASK_DONE, TASK_FAILED)
+
+
+def default_worker_id() -> str:
+    """主机名加进程号，便于在队列中看出作者由哪个进程处理"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Lease:
+    """一个作者的租约，token 用于确认租约仍归自己所有"""
+
+    def __init__(self, task_id: int, author_info: Dict, worker_id: str, token: str):
+        self.task_id = task_id
+        self.author_info = author_info
+        self.worker_id = worker_id
+        self.token = token
+
+
+class WorkQueue(ABC):
+    """
+    任务队列基类
+
+    所有修改租约的方法都校验 token：租约过期并被其它进程领取后，原进程的续租和提交返回False
+    """
+
+    @abstractmethod
+    def enqueue(self, authors: Iterable[Dict]) -> int:
+        """
+        加入作者，已在队列中的作者（按姓名+单位判断）忽略
+
+        Returns:
+            新加入的作者数
+        """
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        """领取一个等待中或租约已过期的作者，没有可领取的作者时返回None"""
+
+    @abstractmethod
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> bool:
+        """续租，租约已失效时返回False"""
+
+    @abstractmethod
+    def complete(self, lease: Lease, status: str, count: int = 0) -> bool:
+        """提交处理结果，租约已失效时返回False"""
+
+    @abstractmethod
+    def release(self, lease: Lease, status: str = "") -> bool:
+        """放弃租约，作者回到队列等待重新领取"""
+
+    @abstractmethod
+    def requeue(
+        self,
+        statuses: Optional[Iterable[str]] = None,
+        keys: Optional[Iterable[str]] = None,
+    ) -> int:
+        """
+        把已处理或失败的作者放回队列
+
+        Args:
+            statuses: 只放回批量处理状态为这些值的作者，以及租约过期次数过多的作者
+            keys: 只放回这些作者（author_key）
+
+        Returns:
+            放回的作者数
+        """
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """各任务状态的作者数"""
+
+    def close(self):
+        """关闭队列"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class MemoryWorkQueue(WorkQueue):
+    """进程内的任务队列，行为与 SQLiteWorkQueue 相同，用于测试和单机运行"""
+
+    def __init__(
+        self,
+        max_expirations: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            max_expirations: 租约过期多少次后不再分配该作者（避免反复导致进程崩溃的作者拖垮队列）
+            clock: 时间函数
+        """
+        if max_expirations is None:
+            max_expirations = CRAWLER_CONFIG["lease_max_expirations"]
+        self.max_expirations = max_expirations
+        self.clock = clock
+        self._tasks: List[Dict] = []
+        self._keys: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, authors: Iterable[Dict]) -> int:
+        added = 0
+        with self._lock:
+            for author_info in authors:
+                key = author_key(author_info)
+                if key in self._keys:
+                    continue
+                task = {
+                    "id": len(self._tasks) + 1,
+                    "key": key,
+                    "author_info": dict(author_info),
+                    "state": TASK_PENDING,
+                    "token": None,
+                    "lease_until": 0.0,
+                    "expirations": 0,
+                    "status": "",
+                    "count": 0,
+                }
+                self._tasks.append(task)
+                self._keys[key] = task
+                added += 1
+        return added
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        now = self.clock()
+        with self._lock:
+            for task in self._tasks:
+                if task["state"] == TASK_LEASED and task["lease_until"] < now:
+                    task["expirations"] += 1
+                    task["state"] = (
+                        TASK_FAILED
+                        if task["expirations"] >= self.max_expirations
+                        else TASK_PENDING
+                    )
+                if task["state"] != TASK_PENDING:
+                    continue
+                task.update(
+                    state=TASK_LEASED,
+                    token=uuid.uuid4().hex,
+                    lease_until=now + lease_seconds,
+                )
+                return Lease(
+                    task["id"], dict(task["author_info"]), worker_id, task["token"]
+                )
+        return None
+
+    def _owned(self, lease: Lease) -> Optional[Dict]:
+        task = self._tasks[lease.task_id - 1]
+        if task["state"] == TASK_LEASED and task["token"] == lease.token:
+            return task
+        return None
+
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> bool:
+        with self._lock:
+            task = self._owned(lease)
+            if task is not None:
+                task["lease_until"] = self.clock() + lease_seconds
+            return task is not None
+
+    def complete(self, lease: Lease, status: str, count: int = 0) -> bool:
+        with self._lock:
+            task = self._owned(lease)
+            if task is not None:
+                task.update(state=TASK_DONE, token=None, status=status, count=count)
+            return task is not None
+
+    def release(self, lease: Lease, status: str = "") -> bool:
+        with self._lock:
+            task = self._owned(lease)
+            if task is not None:
+                task.update(state=TASK_PENDING, token=None, status=status)
+            return task is not None
+
+    def requeue(self, statuses=None, keys=None) -> int:
+        statuses = set(statuses) if statuses is not None else None
+        keys = set(keys) if keys is not None else None
+        requeued = 0
+        with self._lock:
+            for task in self._tasks:
+                if task["state"] not in (TASK_DONE, TASK_FAILED):
+                    continue
+                if keys is not None and task["key"] not in keys:
+                    continue
+                if (
+                    statuses is not None
+                    and task["state"] == TASK_DONE
+                    and task["status"] not in statuses
+                ):
+                    continue
+                task.update(state=TASK_PENDING, expirations=0)
+                requeued += 1
+        return requeued
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict.fromkeys(TASK_STATES, 0)
+            for task in self._tasks:
+                counts[task["state"]] += 1
+            return counts
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    基于SQLite文件的任务队列，多个进程（可在不同机器上）共享同一个文件
+
+    文件放在共享存储上时不能用WAL模式（WAL依赖同一台机器上的共享内存），
+    这里使用默认的回滚日志，领取时用 BEGIN IMMEDIATE 加写锁，保证一个作者只被一个进程领取；
+    租约期限按各机器的系统时间计算，要求机器之间时钟大致同步
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_expirations: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_expirations is None:
+            max_expirations = CRAWLER_CONFIG["lease_max_expirations"]
+        self.path = path
+        self.max_expirations = max_expirations
+        self.clock = clock
+        self._lock = threading.Lock()
+        # 自动提交模式，事务由 BEGIN IMMEDIATE 显式控制；其它进程持有写锁时最多等待30秒
+        self._db = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL,
+                institution TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                token TEXT,
+                lease_until REAL,
+                expirations INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT '',
+                count INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks (state, lease_until);
+            """)
+
+    @contextmanager
+    def _transaction(self):
+        """在数据库写锁内执行：BEGIN IMMEDIATE ... COMMIT"""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def enqueue(self, authors: Iterable[Dict]) -> int:
+        rows = [
+            (
+                author_key(author_info),
+                author_info["name"],
+                author_info.get("institution", ""),
+            )
+            for author_info in authors
+        ]
+        with self._lock, self._transaction() as db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO tasks (key, name, institution) VALUES (?, ?, ?)",
+                rows,
+            )
+            return db.total_changes - before
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        now = self.clock()
+        token = uuid.uuid4().hex
+        with self._lock, self._transaction() as db:
+            # 持有者已崩溃的租约：回到队列，过期次数过多的不再分配
+            db.execute(
+                "UPDATE tasks SET expirations = expirations + 1, token = NULL, "
+                "state = CASE WHEN expirations + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                "WHERE state = 'leased' AND lease_until < ?",
+                (self.max_expirations, now),
+            )
+            row = db.execute(
+                "SELECT id, name, institution FROM tasks WHERE state = 'pending' "
+                "ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE tasks SET state = 'leased', worker = ?, token = ?, "
+                "lease_until = ?, updated_at = ? WHERE id = ?",
+                (worker_id, token, now + lease_seconds, now, row[0]),
+            )
+        return Lease(row[0], {"name": row[1], "institution": row[2]}, worker_id, token)
+
+    def _update_owned(self, lease: Lease, assignments: str, params) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE tasks SET {assignments}, updated_at = ? "
+                "WHERE id = ? AND token = ? AND state = 'leased'",
+                (*params, self.clock(), lease.task_id, lease.token),
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> bool:
+        return self._update_owned(
+            lease, "lease_until = ?", (self.clock() + lease_seconds,)
+        )
+
+    def complete(self, lease: Lease, status: str, count: int = 0) -> bool:
+        return self._update_owned(
+            lease,
+            "state = 'done', token = NULL, status = ?, count = ?",
+            (status, count),
+        )
+
+    def release(self, lease: Lease, status: str = "") -> bool:
+        return self._update_owned(
+            lease, "state = 'pending', token = NULL, status = ?", (status,)
+        )
+
+    def requeue(self, statuses=None, keys=None) -> int:
+        tasks = [
+            (task_id, key, state, status)
+            for task_id, key, state, status in self._db.execute(
+                "SELECT id, key, state, status FROM tasks "
+                "WHERE state IN ('done', 'failed')"
+            )
+        ]
+        statuses = set(statuses) if statuses is not None else None
+        keys = set(keys) if keys is not None else None
+        ids = [
+            (task_id,)
+            for task_id, key, state, status in tasks
+            if (keys is None or key in keys)
+            and (statuses is None or state == TASK_FAILED or status in statuses)
+        ]
+        with self._lock, self._transaction() as db:
+            before = db.total_changes
+            db.executemany(
+                "UPDATE tasks SET state = 'pending', expirations = 0 "
+                "WHERE id = ? AND state IN ('done', 'failed')",
+                ids,
+            )
+            return db.total_changes - before
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(TASK_STATES, 0)
+        with self._lock:
+            for state, count in self._db.execute(
+                "SELECT state, COUNT(*) FROM tasks GROUP BY state"
+            ):
+                counts[state] = count
+        return counts
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def open_work_queue(target: str) -> WorkQueue:
+    """根据路径创建任务队列：memory 为进程内队列，其它值视为SQLite文件"""
+    if target == "memory":
+        return MemoryWorkQueue()
+    return SQLiteWorkQueue(target)
+
+
+class LeaseKeeper:
+    """后台线程定期为持有的租约续租，丢失的租约记录在 lost 中"""
+
+    def __init__(
+        self,
+        work_queue: WorkQueue,
+        lease_seconds: Optional[float] = None,
+    ):
+        if lease_seconds is None:
+            lease_seconds = CRAWLER_CONFIG["lease_seconds"]
+        self.work_queue = work_queue
+        self.lease_seconds = lease_seconds
+        self.lost: List[Lease] = []
+        self._leases: Dict[int, Lease] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="lease-keeper", daemon=True
+        )
+        self._thread.start()
+
+    def add(self, lease: Lease):
+        with self._lock:
+            self._leases[lease.task_id] = lease
+
+    def remove(self, lease: Lease):
+        with self._lock:
+            self._leases.pop(lease.task_id, None)
+
+    def _run(self):
+        # 每个租约期内续租三次，偶尔一次续租失败（例如数据库被锁）也不会丢失租约
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                leases = list(self._leases.values())
+            for lease in leases:
+                try:
+                    alive = self.work_queue.heartbeat(lease, self.lease_seconds)
+                except sqlite3.Error as e:
+                    print(f"⚠ 续租失败：{str(e)}")
+                    continue
+                if not alive:
+                    print(
+                        f"⚠ {lease.author_info['name']} 的租约已失效，可能由其它进程重新处理"
+                    )
+                    with self._lock:
+                        self._leases.pop(lease.task_id, None)
+                        self.lost.append(lease)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
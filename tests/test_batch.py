@@ -0,0 +1,246 @@
+"""
+批量爬取测试：作者列表读取、处理记录、搜索结果缓存、断点续跑和命令行
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.batch import (
+    STATUS_FAILED,
+    STATUS_NO_RESULT,
+    STATUS_SUCCESS,
+    BatchJournal,
+    SearchCache,
+    run_batch,
+)
+from office_auto.batch_input import author_key, read_authors
+from office_auto.cli import main
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.config import apply_settings, current_settings
+from office_auto.fake_driver import FakeDriver
+from tests.test_dedup import paper
+from tests.test_extraction import result_page
+from tests.test_page_archive import site
+from tests.test_reextract import ListSink
+
+
+def fake_crawler(*args, **kwargs):
+    return CNKICrawlerImproved(driver=FakeDriver(loader=site))
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+
+class TestReadAuthors(TempDirTestCase):
+    def write_csv(self, rows):
+        path = self.path("authors.csv")
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            csv.writer(f).writerows(rows)
+        return path
+
+    def test_detect_columns(self):
+        """自动识别中文列名，去除空行和重复项"""
+        path = self.write_csv(
+            [
+                ["序号", "作者", "单位"],
+                ["1", " 张三 ", "测试大学"],
+                ["2", "", "测试大学"],
+                ["3", "张三", "测试大学"],
+                ["4", "张三", "另一所大学"],
+            ]
+        )
+        self.assertEqual(
+            read_authors(path),
+            [
+                {"name": "张三", "institution": "测试大学"},
+                {"name": "张三", "institution": "另一所大学"},
+            ],
+        )
+
+    def test_excel_and_case_insensitive(self):
+        path = self.path("authors.xlsx")
+        pd.DataFrame({"Name": ["李四"], "Affiliation": ["测试大学"]}).to_excel(
+            path, index=False
+        )
+        self.assertEqual(
+            read_authors(path), [{"name": "李四", "institution": "测试大学"}]
+        )
+
+    def test_explicit_and_missing_columns(self):
+        path = self.write_csv([["研究者", "部门"], ["王五", "物理系"]])
+        with self.assertRaises(ValueError):
+            read_authors(path)
+        with self.assertRaises(ValueError):
+            read_authors(path, name_column="姓名")
+        # 没有单位列时单位为空
+        self.assertEqual(
+            read_authors(path, name_column="研究者"),
+            [{"name": "王五", "institution": ""}],
+        )
+        self.assertEqual(
+            read_authors(path, name_column="研究者", institution_column="部门"),
+            [{"name": "王五", "institution": "物理系"}],
+        )
+        with self.assertRaises(FileNotFoundError):
+            read_authors(self.path("missing.csv"))
+
+
+class TestBatchJournal(TempDirTestCase):
+    def test_last_entry_wins(self):
+        journal = BatchJournal(self.path("journal.jsonl"))
+        self.assertEqual(journal.finished_keys(), set())
+
+        zhang, li = {"name": "张三"}, {"name": "李四", "institution": "测试大学"}
+        journal.record(zhang, {"count": 2, "status": STATUS_SUCCESS})
+        journal.record(li, {"count": 0, "status": STATUS_FAILED})
+        self.assertEqual(journal.finished_keys(), {author_key(zhang)})
+
+        # 后追加的记录覆盖之前的状态，损坏的行被忽略
+        journal.record(zhang, {"count": 0, "status": STATUS_FAILED})
+        journal.record(li, {"count": 0, "status": STATUS_NO_RESULT})
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write("{不完整的行\n")
+        self.assertEqual(journal.finished_keys(), {author_key(li)})
+
+
+class TestSearchCache(TempDirTestCase):
+    def test_get_put(self):
+        cache = SearchCache(self.path("cache"))
+        author_info = {"name": "张三", "institution": "测试大学"}
+        self.assertIsNone(cache.get(author_info, 2))
+
+        cache.put(author_info, 2, [paper("A")])
+        cache.put({"name": "张三"}, 2, [])
+        self.assertEqual(cache.get(author_info, 2), [paper("A")])
+        # 页数不同、单位不同是不同的缓存项，空结果也会缓存
+        self.assertIsNone(cache.get(author_info, 3))
+        self.assertEqual(cache.get({"name": "张三"}, 2), [])
+
+        with open(cache._path(author_info, 2), "w", encoding="utf-8") as f:
+            f.write("{损坏")
+        self.assertIsNone(cache.get(author_info, 2))
+
+
+@patch("office_auto.batch.create_crawler", side_effect=fake_crawler)
+class TestRunBatch(TempDirTestCase):
+    authors = [
+        {"name": "张三", "institution": ""},
+        {"name": "李四", "institution": ""},
+    ]
+
+    def test_resume_skips_finished(self, create_crawler):
+        journal_path = self.path("journal.jsonl")
+        journal = BatchJournal(journal_path)
+        journal.record(self.authors[0], {"count": 4, "status": STATUS_SUCCESS})
+        journal.record(self.authors[1], {"count": 0, "status": STATUS_FAILED})
+
+        sink = ListSink()
+        results = run_batch(
+            self.authors,
+            sink,
+            max_pages=3,
+            cache_dir=None,
+            journal_path=journal_path,
+            resume=True,
+        )
+
+        self.assertEqual([r["author"] for r in results], ["李四"])
+        self.assertEqual(results[0]["status"], STATUS_SUCCESS)
+        self.assertEqual([name for name, _ in sink.rows], ["李四"])
+        self.assertEqual(journal.finished_keys(), {author_key(a) for a in self.authors})
+
+    def test_cache_hit_skips_browser(self, create_crawler):
+        cache_dir = self.path("cache")
+        run_batch(self.authors, ListSink(), max_pages=3, cache_dir=cache_dir)
+        self.assertEqual(create_crawler.call_count, 1)
+
+        sink = ListSink()
+        results = run_batch(self.authors, sink, max_pages=3, cache_dir=cache_dir)
+        self.assertEqual(create_crawler.call_count, 1)
+        self.assertEqual([r["count"] for r in results], [4, 4])
+        self.assertEqual(len(sink.rows), 2)
+
+    def test_no_result(self, create_crawler):
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=lambda url: result_page([]))
+        )
+        cache_dir = self.path("cache")
+        results = run_batch(
+            self.authors[:1], ListSink(), max_pages=2, cache_dir=cache_dir
+        )
+        self.assertEqual(results[0]["status"], STATUS_NO_RESULT)
+        self.assertEqual(SearchCache(cache_dir).get(self.authors[0], 2), [])
+
+
+@patch("office_auto.batch.create_crawler", side_effect=fake_crawler)
+class TestCli(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        # main() 会加载配置，测试结束后恢复
+        self.addCleanup(apply_settings, current_settings())
+        self.input = self.path("authors.csv")
+        with open(self.input, "w", encoding="utf-8") as f:
+            f.write("姓名,单位\n张三,测试大学\n李四,测试大学\n")
+
+    def crawl(self, *extra):
+        return main(
+            [
+                "crawl",
+                "-i",
+                self.input,
+                "-o",
+                self.path("papers.csv"),
+                "--journal",
+                self.path("journal.jsonl"),
+                "--cache",
+                self.path("cache"),
+                "--max-pages",
+                "3",
+                *extra,
+            ]
+        )
+
+    def read_output(self):
+        with open(self.path("papers.csv"), newline="", encoding="utf-8-sig") as f:
+            return list(csv.DictReader(f))
+
+    def test_crawl_and_resume(self, create_crawler):
+        self.assertEqual(self.crawl(), 0)
+        rows = self.read_output()
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[0]["检索作者"], "张三")
+        self.assertEqual(rows[0]["检索单位"], "测试大学")
+
+        with open(self.path("journal.jsonl"), encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([e["status"] for e in entries], [STATUS_SUCCESS] * 2)
+
+        # 续跑时跳过已完成的作者，追加而不是覆盖输出
+        self.assertEqual(self.crawl("--resume"), 0)
+        self.assertEqual(len(self.read_output()), 8)
+        self.assertEqual(create_crawler.call_count, 1)
+
+    def test_missing_input(self, create_crawler):
+        self.assertEqual(main(["crawl"]), 1)
+        self.assertEqual(main(["crawl", "-i", self.path("missing.csv")]), 2)
+        create_crawler.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
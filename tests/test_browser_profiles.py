@@ -0,0 +1,98 @@
+"""
+持久浏览器配置目录池测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.browser_profiles import ProfilePool
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+
+
+class TestProfilePool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = os.path.join(self.tmp.name, "profiles")
+
+    def test_exclusive_profiles(self):
+        """使用中的目录不会分给其它浏览器，释放后重新使用"""
+        pool = ProfilePool(self.root, size=2)
+        first, second = pool.acquire(), pool.acquire()
+        self.assertNotEqual(first.path, second.path)
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0)
+
+        first.close()
+        again = pool.acquire(timeout=0)
+        self.assertEqual(again.path, first.path)
+        again.close()
+        second.close()
+
+    def test_separate_pools_share_locks(self):
+        """同一目录的两个池（相当于两个进程）通过锁文件互斥"""
+        profile = ProfilePool(self.root).acquire()
+        other = ProfilePool(self.root).acquire()
+        self.assertNotEqual(other.path, profile.path)
+        profile.close()
+        other.close()
+
+    def test_prepare_profile(self):
+        """清除崩溃残留的单实例锁，缓存超过上限时清空"""
+        profile = ProfilePool(self.root).acquire()
+        cache_dir = os.path.join(profile.path, "Default", "Cache")
+        os.makedirs(cache_dir)
+        with open(os.path.join(cache_dir, "data"), "wb") as f:
+            f.write(b"\0" * (2 * 1024 * 1024))
+        os.symlink("host-1234", os.path.join(profile.path, "SingletonLock"))
+        with open(os.path.join(profile.path, "Preferences"), "w") as f:
+            f.write("{}")
+        profile.close()
+
+        profile = ProfilePool(self.root, cache_mb=5).acquire()
+        self.assertTrue(os.path.exists(cache_dir))
+        self.assertFalse(os.path.lexists(os.path.join(profile.path, "SingletonLock")))
+        profile.close()
+
+        profile = ProfilePool(self.root, cache_mb=1).acquire()
+        self.assertFalse(os.path.exists(cache_dir))
+        self.assertTrue(os.path.exists(os.path.join(profile.path, "Preferences")))
+        self.assertEqual(
+            profile.chrome_arguments(1),
+            [
+                f"--user-data-dir={os.path.abspath(profile.path)}",
+                "--disk-cache-size=1048576",
+            ],
+        )
+        profile.close()
+
+
+@patch("office_auto.cnki_crawler_improved.chromedriver_path")
+@patch("office_auto.cnki_crawler_improved.Service")
+@patch("office_auto.cnki_crawler_improved.webdriver.Chrome")
+class TestCrawlerProfile(unittest.TestCase):
+    def test_crawler_uses_and_releases_profile(self, chrome, service, driver_path):
+        with tempfile.TemporaryDirectory() as root:
+            pool = ProfilePool(root, size=1)
+            crawler = CNKICrawlerImproved(profile_pool=pool)
+            options = chrome.call_args.kwargs["options"]
+            self.assertIn(
+                f"--user-data-dir={os.path.abspath(crawler.profile.path)}",
+                options.arguments,
+            )
+            with self.assertRaises(TimeoutError):
+                pool.acquire(timeout=0)
+
+            crawler.close()
+            self.assertIsNone(crawler.profile)
+            pool.acquire(timeout=0).close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+配置加载测试
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.batch import run_batch
+from office_auto.browser_profiles import ProfilePool
+from office_auto.cli import _headless, build_parser
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.config import (
+    CRAWLER_CONFIG,
+    Settings,
+    apply_settings,
+    current_settings,
+    load_settings,
+)
+from office_auto.fake_driver import FakeDriver
+from office_auto.profiling import Profiler
+from office_auto.rate_limit import RateLimiter
+from office_auto.sinks import BackgroundSink
+from tests.test_page_archive import site
+from tests.test_reextract import ListSink
+
+TOML = """
+concurrency = 4
+page_delay = 1.5
+run_budget = 3600
+base_url = "https://cnki.example.com"
+delay_bounds = { page = [1, 8] }
+"""
+
+
+class TestLoadSettings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "settings.toml")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(TOML)
+
+    def test_defaults(self):
+        self.assertEqual(load_settings(environ={}), Settings())
+        self.assertEqual(Settings().to_dict()["wait_time"], 10)
+
+    def test_toml_then_environment(self):
+        """环境变量优先于配置文件，配置文件优先于默认值"""
+        settings = load_settings(
+            environ={
+                "OFFICE_AUTO_CONFIG": self.path,
+                "OFFICE_AUTO_CONCURRENCY": "8",
+                "OFFICE_AUTO_HEADLESS": "yes",
+                "OFFICE_AUTO_AUTHOR_BUDGET": "none",
+            }
+        )
+        self.assertEqual(settings.concurrency, 8)
+        self.assertTrue(settings.headless)
+        self.assertIsNone(settings.author_budget)
+        self.assertEqual(settings.page_delay, 1.5)
+        self.assertEqual(settings.run_budget, 3600)
+        self.assertEqual(settings.base_url, "https://cnki.example.com")
+        # 表只覆盖给出的键
+        self.assertEqual(settings.delay_bounds, {"search": (1.5, 20), "page": (1, 8)})
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            load_settings(environ={"OFFICE_AUTO_CONCURRENCY": "many"})
+        with self.assertRaises(ValueError):
+            load_settings(environ={"OFFICE_AUTO_WAIT_TIME": "1.5"})
+        with self.assertRaises(ValueError):
+            Settings.from_dict({"concurency": 2})
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("headless = maybe")
+        with self.assertRaises(ValueError):
+            load_settings(self.path, environ={})
+
+
+@patch.dict("office_auto.config.CRAWLER_CONFIG")
+class TestApplySettings(unittest.TestCase):
+    def test_components_read_applied_settings(self):
+        """加载后创建的爬虫、浏览器池、输出和命令行默认值都使用新配置"""
+        apply_settings(
+            Settings(
+                wait_time=3,
+                base_url="https://cnki.example.com",
+                profile_cache_mb=None,
+                writer_queue_size=2,
+                concurrency=4,
+                tabs=2,
+            )
+        )
+        self.assertEqual(current_settings().wait_time, 3)
+
+        crawler = CNKICrawlerImproved(driver=FakeDriver())
+        self.assertEqual(crawler.wait_time, 3)
+        self.assertEqual(crawler.host, "cnki.example.com")
+        self.assertTrue(crawler.build_search_url("张三").startswith(crawler.base_url))
+
+        with tempfile.TemporaryDirectory() as root:
+            self.assertIsNone(ProfilePool(root).cache_mb)
+
+        sink = BackgroundSink(ListSink())
+        self.assertEqual(sink._queue.maxsize, 2)
+        sink.close()
+
+        args = build_parser().parse_args(["crawl"])
+        self.assertEqual((args.concurrency, args.tabs), (4, 2))
+
+    @patch("office_auto.batch.create_crawler")
+    def test_batch_reads_applied_settings(self, create_crawler):
+        """批量爬取和命令行未指定页数、无头模式和剖析目录时使用加载后的配置"""
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=site)
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            apply_settings(Settings(max_pages=1, headless=True, output_dir=tmp))
+
+            args = build_parser().parse_args(["crawl"])
+            self.assertEqual(args.max_pages, 1)
+            self.assertIsNone(_headless(args))
+            args = build_parser().parse_args(["crawl", "--show-browser"])
+            self.assertFalse(_headless(args))
+
+            sink = ListSink()
+            results = run_batch([{"name": "张三", "institution": ""}], sink)
+            self.assertEqual(results[0]["count"], 2)
+            self.assertTrue(create_crawler.call_args.args[1])
+
+            self.assertEqual(Profiler(None).output_dir, os.path.join(tmp, "profile"))
+
+    @patch("office_auto.cnki_crawler_improved.chromedriver_path")
+    @patch("office_auto.cnki_crawler_improved.Service")
+    @patch("office_auto.cnki_crawler_improved.webdriver.Chrome")
+    def test_browser_options(self, chrome, service, driver_path):
+        CRAWLER_CONFIG.update(window_size="1280,800", user_agent="TestAgent/1.0")
+        CNKICrawlerImproved(headless=True)
+        arguments = chrome.call_args.kwargs["options"].arguments
+        self.assertIn("--window-size=1280,800", arguments)
+        self.assertIn("--user-agent=TestAgent/1.0", arguments)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_spacing(self):
+        """相邻请求至少间隔 interval 秒，间隔已过时无需等待"""
+        limiter = RateLimiter(interval=10)
+        self.assertEqual(limiter.reserve(), 0)
+        self.assertAlmostEqual(limiter.reserve(), 10, delta=0.5)
+        self.assertAlmostEqual(limiter.reserve(), 20, delta=0.5)
+
+        with patch.dict(CRAWLER_CONFIG, {"min_request_interval": 0}):
+            self.assertEqual(RateLimiter().reserve(), 0)
+        fast = RateLimiter(interval=0.01)
+        fast.reserve()
+        time.sleep(0.02)
+        self.assertEqual(fast.reserve(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
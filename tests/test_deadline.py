@@ -0,0 +1,140 @@
+"""
+时间预算测试（使用假时钟，无需真实等待）
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.batch import STATUS_INCOMPLETE, STATUS_SKIPPED, run_batch
+from office_auto.cnki_crawler_improved import STATUS_PARTIAL, CNKICrawlerImproved
+from office_auto.deadline import Deadline
+from office_auto.fake_driver import FakeDriver
+from tests.test_page_archive import site
+from tests.test_reextract import ListSink
+
+
+class FakeClock:
+    """代替time模块的假时钟，sleep() 只推进时间"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class ClockTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("office_auto.deadline.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def slow_site(self, url):
+        """第二页加载时时钟前进10秒"""
+        if "page=2" in url:
+            self.clock.advance(10)
+        return site(url)
+
+
+class TestDeadline(ClockTestCase):
+    def test_unlimited(self):
+        deadline = Deadline()
+        self.clock.advance(1e6)
+        self.assertIsNone(deadline.remaining())
+        self.assertFalse(deadline.expired())
+        self.assertEqual(deadline.cap(30), 30)
+        self.assertEqual(deadline.elapsed(), 1e6)
+
+    def test_expired_and_cap(self):
+        deadline = Deadline(5)
+        self.assertEqual(deadline.cap(3), 3)
+        self.assertEqual(deadline.cap(8), 5)
+
+        self.clock.advance(4)
+        self.assertEqual(deadline.remaining(), 1)
+        self.assertFalse(deadline.expired())
+
+        self.clock.advance(2)
+        self.assertEqual(deadline.remaining(), 0)
+        self.assertTrue(deadline.expired())
+        self.assertEqual(deadline.cap(3), 0)
+
+    def test_child(self):
+        """子预算不超过上级剩余时间，上级不限时时按自己的预算"""
+        parent = Deadline(10)
+        self.clock.advance(4)
+        self.assertEqual(parent.child(100).remaining(), 6)
+        self.assertEqual(parent.child().remaining(), 6)
+        self.assertEqual(parent.child(2).remaining(), 2)
+        self.assertEqual(Deadline().child(3).remaining(), 3)
+        self.assertIsNone(Deadline().child().remaining())
+
+        grandchild = parent.child(100).child(100)
+        self.clock.advance(6)
+        self.assertTrue(grandchild.expired())
+
+    def test_sleep(self):
+        """休眠截短到剩余预算，超时后不再休眠"""
+        deadline = Deadline(5)
+        deadline.sleep(2)
+        deadline.sleep(10)
+        deadline.sleep(1)
+        self.assertEqual(self.clock.sleeps, [2, 3])
+        self.assertTrue(deadline.expired())
+
+        Deadline().sleep(7)
+        self.assertEqual(self.clock.sleeps[-1], 7)
+
+
+class TestCrawlerDeadline(ClockTestCase):
+    def test_partial_results(self):
+        """翻页时预算耗尽，返回已获取的部分结果"""
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=self.slow_site))
+        papers = crawler.search_papers("张三", max_pages=3, deadline=Deadline(5))
+
+        self.assertEqual([p["标题"] for p in papers], ["论文标题1", "论文标题2"])
+        self.assertEqual(crawler.last_status, STATUS_PARTIAL)
+        self.assertIsNone(crawler.deadline)
+
+    def test_within_budget(self):
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=self.slow_site))
+        papers = crawler.search_papers("张三", max_pages=3, deadline=Deadline(60))
+
+        self.assertEqual(len(papers), 4)
+        self.assertEqual(crawler.last_status, "ok")
+
+    @patch("office_auto.batch.create_crawler")
+    def test_batch_statuses(self, create_crawler):
+        """作者预算耗尽时结果标记为部分，批次预算耗尽后其余作者不再处理"""
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=self.slow_site)
+        )
+        authors = [{"name": "张三", "institution": ""}]
+
+        sink = ListSink()
+        results = run_batch(authors, sink, max_pages=3, cache_dir=None, author_budget=5)
+        self.assertEqual(results[0]["status"], STATUS_INCOMPLETE)
+        self.assertEqual(results[0]["count"], 2)
+        self.assertEqual(sink.rows, [("张三", ["论文标题1", "论文标题2"])])
+
+        results = run_batch(authors, ListSink(), cache_dir=None, run_budget=0)
+        self.assertEqual(results[0]["status"], STATUS_SKIPPED)
+        create_crawler.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+论文去重测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.batch import (
+    STATUS_FAILED,
+    STATUS_WRITE_FAILED,
+    BatchJournal,
+    SearchCache,
+    run_batch,
+)
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.dedup import DedupIndex, paper_fingerprint, unique_papers
+from office_auto.fake_driver import FakeDriver
+from tests.test_extraction import result_page
+from tests.test_reextract import ListSink
+
+
+class FailingSink(ListSink):
+    """第一次写出张三的论文时失败"""
+
+    def __init__(self):
+        super().__init__()
+        self.failed = False
+
+    def write(self, author_info, papers):
+        if author_info["name"] == "张三" and not self.failed:
+            self.failed = True
+            raise OSError("磁盘已满")
+        return super().write(author_info, papers)
+
+
+def paper(title, journal="测试学报", date="2023-05-01"):
+    return {"标题": title, "期刊": journal, "发表日期": date}
+
+
+class TestFingerprint(unittest.TestCase):
+    """测试指纹规范化"""
+
+    def test_equivalent_forms(self):
+        """空白、标点、全半角和日期写法不影响指纹"""
+        self.assertEqual(
+            paper_fingerprint(paper("深度学习：综述 ")),
+            paper_fingerprint(paper("深度学习:综述", date="2023/5/1")),
+        )
+        self.assertEqual(
+            paper_fingerprint(paper("ＡＢＣ Test")), paper_fingerprint(paper("abctest"))
+        )
+
+    def test_different_papers(self):
+        self.assertNotEqual(
+            paper_fingerprint(paper("标题")),
+            paper_fingerprint(paper("标题", journal="另一期刊")),
+        )
+        self.assertNotEqual(
+            paper_fingerprint(paper("标题")),
+            paper_fingerprint(paper("标题", date="2024-05-01")),
+        )
+
+    def test_unique_papers(self):
+        seen = set()
+        self.assertEqual(len(unique_papers([paper("A"), paper("A")], seen)), 1)
+        self.assertEqual(unique_papers([paper("A"), paper("B")], seen), [paper("B")])
+
+
+class TestDedupIndex(unittest.TestCase):
+    """测试跨作者去重索引"""
+
+    def test_links_instead_of_copies(self):
+        index = DedupIndex()
+        zhang = {"name": "张三", "institution": "测试大学"}
+        li = {"name": "李四", "institution": ""}
+
+        self.assertEqual(len(index.add(zhang, [paper("A"), paper("B")])), 2)
+        self.assertEqual(index.add(li, [paper("B"), paper("C")]), [paper("C")])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(
+            index.links_for(li),
+            {paper_fingerprint(paper("B")), paper_fingerprint(paper("C"))},
+        )
+
+    def test_sqlite_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dedup.db")
+            with DedupIndex(path) as index:
+                index.add({"name": "张三"}, [paper("A")])
+
+            with DedupIndex(path) as index:
+                self.assertIn(paper("A"), index)
+                self.assertEqual(index.add({"name": "李四"}, [paper("A")]), [])
+                self.assertEqual(len(index.links_for({"name": "李四"})), 1)
+
+    def test_reserve_commit_rollback(self):
+        """预留的论文对其他作者计为已出现，回滚后重新计为未出现且不留关联"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dedup.db")
+            with DedupIndex(path) as index:
+                zhang = {"name": "张三"}
+                unique, reservation = index.reserve(zhang, [paper("A")])
+                self.assertEqual(unique, [paper("A")])
+                self.assertEqual(index.add({"name": "李四"}, [paper("A")]), [])
+
+                index.rollback(reservation)
+                self.assertNotIn(paper("A"), index)
+                self.assertEqual(index.links_for(zhang), set())
+
+                unique, reservation = index.reserve(zhang, [paper("A")])
+                index.commit(reservation)
+
+            with DedupIndex(path) as index:
+                self.assertIn(paper("A"), index)
+                self.assertEqual(len(index.links_for({"name": "张三"})), 1)
+
+
+class TestCrossPageDedup(unittest.TestCase):
+    """翻页时结果列表移动导致的重复"""
+
+    def test_overlapping_pages(self):
+        base = "https://kns.cnki.net"
+        driver = FakeDriver(
+            pages={
+                f"{base}/page1": result_page([1, 2, 3], next_href="/page2"),
+                f"{base}/page2": result_page([3, 4]),
+            }
+        )
+        driver.get(f"{base}/page1")
+        crawler = CNKICrawlerImproved(driver=driver)
+
+        papers = crawler._crawl_search_results(max_pages=2)
+
+        self.assertEqual(
+            [p["标题"] for p in papers], [f"论文标题{n}" for n in (1, 2, 3, 4)]
+        )
+
+
+class TestBatchDedup(unittest.TestCase):
+    """批量模式下合著论文只输出一次"""
+
+    def test_cached_authors(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SearchCache(tmp)
+            zhang = {"name": "张三", "institution": ""}
+            li = {"name": "李四", "institution": ""}
+            cache.put(zhang, 2, [paper("A"), paper("B")])
+            cache.put(li, 2, [paper("B"), paper("C")])
+
+            sink = ListSink()
+            results = run_batch(
+                [zhang, li], sink, max_pages=2, cache_dir=tmp, dedup=True
+            )
+
+        self.assertEqual(sink.rows, [("张三", ["A", "B"]), ("李四", ["C"])])
+        self.assertEqual(results[1]["count"], 2)
+        self.assertEqual(results[1]["duplicates"], 1)
+
+    def run_twice(self, **kwargs):
+        """张三的论文第一次写出失败，续跑时应重新输出"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SearchCache(tmp)
+            zhang = {"name": "张三", "institution": ""}
+            cache.put(zhang, 2, [paper("A"), paper("B")])
+            options = dict(
+                max_pages=2,
+                cache_dir=tmp,
+                dedup_path=os.path.join(tmp, "dedup.db"),
+                journal_path=os.path.join(tmp, "journal.jsonl"),
+                **kwargs,
+            )
+
+            sink = FailingSink()
+            first = run_batch([zhang], sink, **options)
+            second = run_batch([zhang], sink, resume=True, **options)
+            finished = BatchJournal(options["journal_path"]).finished_keys()
+
+        self.assertEqual(len(second), 1)
+        self.assertEqual(second[0].get("duplicates"), 0)
+        self.assertEqual(sink.rows, [("张三", ["A", "B"])])
+        self.assertEqual(finished, {"张三\t"})
+        return first[0]
+
+    def test_failed_write_not_registered(self):
+        self.assertEqual(self.run_twice()["status"], STATUS_FAILED)
+
+    def test_failed_background_write_not_registered(self):
+        result = self.run_twice(background_write=True)
+        self.assertEqual(result["status"], STATUS_WRITE_FAILED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+自适应等待时间测试
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+from office_auto.batch import run_batch
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.config import CRAWLER_CONFIG
+from office_auto.delay_tuner import PHASE_PAGE, PHASE_SEARCH, DelayTuner
+from office_auto.fake_driver import FakeDriver
+from tests.test_extraction import result_page
+from tests.test_page_archive import site
+from tests.test_reextract import ListSink
+
+HOST = "kns.cnki.net"
+BOUNDS = {PHASE_SEARCH: (1, 20), PHASE_PAGE: (1, 10)}
+
+
+class TestDelayTuner(unittest.TestCase):
+    def test_converges_to_target_percentile(self):
+        """就绪时间均匀分布在1~6秒时，等待时间收敛到90分位数附近"""
+        tuner = DelayTuner(target=0.9, step=0.2, bounds=BOUNDS)
+        ready_times = [1 + (n * 37 % 100) / 20 for n in range(100)]
+        for _ in range(30):
+            for seconds in ready_times:
+                delay = tuner.delay(HOST, PHASE_PAGE)
+                tuner.observe(HOST, PHASE_PAGE, ready=seconds <= delay)
+        self.assertAlmostEqual(tuner.delay(HOST, PHASE_PAGE), 5.5, delta=0.5)
+
+    def test_bounds(self):
+        """一直就绪时不低于下限，一直未就绪时不超过上限"""
+        tuner = DelayTuner(step=1, bounds=BOUNDS)
+        for _ in range(200):
+            tuner.observe(HOST, PHASE_SEARCH, ready=True)
+            tuner.observe(HOST, PHASE_PAGE, ready=False)
+        self.assertEqual(tuner.delay(HOST, PHASE_SEARCH), 1)
+        self.assertEqual(tuner.delay(HOST, PHASE_PAGE), 10)
+        self.assertEqual(tuner.delay("other.host", PHASE_PAGE), 2)
+
+    def test_fixed(self):
+        """不自适应时始终使用初始值，不受上下限约束"""
+        tuner = DelayTuner(
+            initial={PHASE_SEARCH: 0.5, PHASE_PAGE: 12}, bounds=BOUNDS, adaptive=False
+        )
+        tuner.observe(HOST, PHASE_SEARCH, ready=False)
+        self.assertEqual(tuner.delay(HOST, PHASE_SEARCH), 0.5)
+        self.assertEqual(tuner.delay(HOST, PHASE_PAGE), 12)
+        self.assertEqual(tuner.snapshot(), {})
+
+    def test_persist_per_host(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "delays.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"other.host": {PHASE_PAGE: 4}}, f)
+
+            tuner = DelayTuner(path, step=1, bounds=BOUNDS)
+            tuner.observe(HOST, PHASE_PAGE, ready=False)
+            tuner.save()
+
+            reloaded = DelayTuner(path, bounds=BOUNDS)
+            self.assertAlmostEqual(reloaded.delay(HOST, PHASE_PAGE), 2.9)
+            self.assertEqual(reloaded.delay("other.host", PHASE_PAGE), 4)
+
+
+class TestCrawlerDelays(unittest.TestCase):
+    @patch("office_auto.cnki_crawler_improved.time.sleep")
+    def test_search_feeds_tuner(self, sleep):
+        """搜索和翻页按调整后的时间等待，等待结束时已就绪则缩短"""
+        tuner = DelayTuner(step=1, bounds=BOUNDS)
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=site), delays=tuner)
+        # 按在线浏览器处理，使等待生效
+        crawler.offline = False
+
+        papers = crawler.search_papers("张三", max_pages=3)
+
+        self.assertEqual(len(papers), 4)
+        sleeps = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(sleeps, [3, 2])
+        self.assertAlmostEqual(tuner.delay(crawler.host, PHASE_SEARCH), 2.9)
+        self.assertAlmostEqual(tuner.delay(crawler.host, PHASE_PAGE), 1.9)
+
+    @patch("office_auto.cnki_crawler_improved.time.sleep")
+    def test_fixed_by_default(self, sleep):
+        """没有传入调整器时使用配置中的固定等待时间"""
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=site))
+        crawler.offline = False
+        with patch.dict(CRAWLER_CONFIG, search_delay=3, page_delay=2):
+            crawler.search_papers("张三", max_pages=3)
+            crawler.search_papers("张三", max_pages=3)
+
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [3, 2] * 2)
+        self.assertEqual(crawler.delays.snapshot(), {})
+
+    @patch("office_auto.batch.create_crawler")
+    def test_batch_opt_in(self, create_crawler):
+        """只有指定 delay_state 时批量爬取才开启自适应等待"""
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=site), delays=args[5]
+        )
+        authors = [{"name": "张三", "institution": ""}]
+        run_batch(authors, ListSink(), cache_dir=None)
+        self.assertIsNone(create_crawler.call_args.args[5])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "delays.json")
+            run_batch(authors, ListSink(), cache_dir=None, delay_state=path)
+            delays = create_crawler.call_args.args[5]
+            self.assertTrue(delays.adaptive)
+            self.assertEqual(delays.path, path)
+
+    def test_search_ready_needs_rows(self):
+        """搜索后结果列表容器先出现，出现结果行才算就绪"""
+        crawler = CNKICrawlerImproved(driver=FakeDriver(html=result_page([])))
+        crawler.offline = False
+        crawler.wait = WebDriverWait(crawler.driver, 5, poll_frequency=0.001)
+        signatures = iter([None, None])
+        with (
+            patch.object(
+                crawler,
+                "_result_signature",
+                side_effect=lambda: next(signatures, "论文标题1"),
+            ),
+            patch.dict(CRAWLER_CONFIG, search_delay=60),
+        ):
+            self.assertEqual(crawler._poll_results(require_rows=True), 3)
+
+    def test_empty_search_not_observed(self):
+        """一直没有结果行时等待 search_delay 后认为没有结果，不反馈给调整器"""
+        tuner = DelayTuner(step=1, bounds=BOUNDS)
+        crawler = CNKICrawlerImproved(
+            driver=FakeDriver(loader=lambda url: result_page([])), delays=tuner
+        )
+        crawler.offline = False
+        crawler.wait = WebDriverWait(crawler.driver, 5, poll_frequency=0.001)
+        with (
+            patch("office_auto.cnki_crawler_improved.time.sleep"),
+            patch.dict(CRAWLER_CONFIG, search_delay=0.01),
+        ):
+            papers = crawler.search_papers("张三", max_pages=3)
+
+        self.assertEqual(papers, [])
+        self.assertEqual(tuner.snapshot(), {})
+
+    def test_offline_driver_does_not_tune(self):
+        tuner = DelayTuner(bounds=BOUNDS)
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=site), delays=tuner)
+        crawler.search_papers("张三", max_pages=3)
+        self.assertEqual(tuner.snapshot(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+"""
+详情页补充测试
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.enrich import (
+    Enricher,
+    HttpDetailFetcher,
+    TabDetailFetcher,
+    enrich_output,
+    parse_detail_page,
+)
+from office_auto.fake_driver import FakeDriver
+from office_auto.sinks import CsvSink, read_output
+from tests.test_deadline import FakeClock
+from tests.test_extraction import result_page
+from tests.test_reextract import ListSink
+
+DETAIL_PAGE = """<html><head><title>{title} - 中国知网</title></head><body>
+<div class="wx-tit"><h1>{title}</h1></div>
+<div class="row"><span class="rowtit">摘要：</span><span id="ChDivSummary">{title}的摘要
+  第二行</span></div>
+<p class="keywords"><a>深度学习;</a><a>图像识别;</a></p>
+<ul><li class="top-space"><span class="rowtit">DOI：</span><p>10.1000/{title}</p></li></ul>
+<p class="funds"><a>国家自然科学基金(123);</a></p>
+</body></html>"""
+
+
+def detail_pages(base: str, count: int) -> dict:
+    return {
+        f"{base}/kcms/detail?id={n}": DETAIL_PAGE.format(title=f"论文{n}")
+        for n in range(1, count + 1)
+    }
+
+
+class TestParseDetailPage(unittest.TestCase):
+    def test_fields(self):
+        details = parse_detail_page(DETAIL_PAGE.format(title="论文1"))
+        self.assertEqual(details["摘要"], "论文1的摘要 第二行")
+        self.assertEqual(details["关键词"], "深度学习; 图像识别")
+        self.assertEqual(details["DOI"], "10.1000/论文1")
+        self.assertEqual(details["基金"], "国家自然科学基金(123)")
+
+    def test_missing_fields(self):
+        self.assertEqual(set(parse_detail_page("<html></html>").values()), {""})
+
+
+class TestExtractionCapturesUrl(unittest.TestCase):
+    def test_url_column(self):
+        driver = FakeDriver(html=result_page([1]), url="https://kns.cnki.net/search")
+        papers = CNKICrawlerImproved(driver=driver)._extract_papers_from_page()
+        self.assertEqual(papers[0]["链接"], "https://kns.cnki.net/kcms/detail?id=1")
+
+    def test_saved_excel_can_be_enriched(self):
+        """save_to_excel 保留链接列，保存的文件可以交给 enrich"""
+        driver = FakeDriver(html=result_page([1]), url="https://kns.cnki.net/search")
+        crawler = CNKICrawlerImproved(driver=driver)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "张三_papers.xlsx")
+            crawler.save_to_excel(crawler._extract_papers_from_page(), path)
+            [(_, papers)] = read_output(path)
+        self.assertEqual(papers[0]["链接"], "https://kns.cnki.net/kcms/detail?id=1")
+
+
+class TestEnricher(unittest.TestCase):
+    """标签页获取、按链接去重和缓存"""
+
+    def setUp(self):
+        self.base = "https://kns.cnki.net"
+        self.driver = FakeDriver(pages=detail_pages(self.base, 3))
+        crawler = CNKICrawlerImproved(driver=self.driver)
+        self.fetcher = TabDetailFetcher(crawler, tabs=2, poll_interval=0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def papers(self, *numbers):
+        return [
+            {"标题": f"论文{n}", "链接": f"{self.base}/kcms/detail?id={n}"}
+            for n in numbers
+        ]
+
+    def test_each_url_fetched_once(self):
+        enricher = Enricher(self.fetcher, cache_dir=self.tmp.name)
+        first = enricher.enrich(self.papers(1, 2))
+        second = enricher.enrich(self.papers(2, 3) + [{"标题": "无链接"}])
+
+        self.assertEqual(first[0]["DOI"], "10.1000/论文1")
+        self.assertEqual(second[0]["摘要"], first[1]["摘要"])
+        self.assertNotIn("摘要", second[2])
+        self.assertEqual(
+            sorted(self.driver.history), sorted(detail_pages(self.base, 3))
+        )
+        self.assertEqual(enricher.stats["fetched"], 3)
+        self.assertEqual(enricher.stats["no_url"], 1)
+
+        # 新的运行命中磁盘缓存
+        cached = Enricher(self.fetcher, cache_dir=self.tmp.name)
+        cached.enrich(self.papers(1))
+        self.assertEqual(
+            cached.stats,
+            {"fetched": 0, "cached": 1, "failed": 0, "blocked": 0, "no_url": 0},
+        )
+
+    def test_blocked_not_cached(self):
+        """验证码页面不解析、不缓存，停止打开新的详情页并冷却后重新获取"""
+        clock = FakeClock()
+        patcher = patch("office_auto.enrich.time", clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        captcha_url = f"{self.base}/kcms/detail?id=1"
+        self.driver.pages[captcha_url] = (
+            "<html><head><title>安全验证</title></head><body>拖动滑块</body></html>"
+        )
+        self.fetcher.tabs = 1
+        enricher = Enricher(self.fetcher, cache_dir=self.tmp.name, cooldown=30)
+        papers = enricher.enrich(self.papers(1, 2))
+
+        self.assertEqual([p.get("摘要") for p in papers], [None, None])
+        self.assertEqual(enricher.stats["blocked"], 2)
+        # 第二个详情页没有打开，被拦截的标签页回到空白页
+        self.assertEqual(self.driver.history, [captcha_url, "about:blank"])
+        self.assertIsNone(enricher.cache.get(captcha_url))
+
+        # 验证通过后，下一次获取先等待冷却结束
+        self.driver.pages.update(detail_pages(self.base, 2))
+        start = clock.now
+        papers = enricher.enrich(self.papers(1, 2))
+        self.assertEqual(clock.sleeps[0], 30)
+        self.assertGreaterEqual(clock.now - start, 30)
+        self.assertEqual(papers[0]["DOI"], "10.1000/论文1")
+        self.assertEqual(enricher.stats["fetched"], 2)
+
+    def test_enrich_output(self):
+        path = os.path.join(self.tmp.name, "papers.csv")
+        with CsvSink(path) as sink:
+            sink.write({"name": "张三", "institution": ""}, self.papers(1, 2))
+
+        sink = ListSink()
+        stats = enrich_output(path, sink, Enricher(self.fetcher))
+        self.assertEqual(stats["authors"], 1)
+        self.assertEqual(sink.rows, [("张三", ["论文1", "论文2"])])
+
+
+class TestHttpDetailFetcher(unittest.TestCase):
+    """通过本地HTTP服务获取详情页"""
+
+    def test_fetch_many(self):
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if "missing" in self.path:
+                    self.send_error(404)
+                    return
+                if "verify" in self.path:
+                    body = "<html><head><title>安全验证</title></head></html>"
+                else:
+                    body = DETAIL_PAGE.format(title="论文1")
+                body = body.encode("utf-8")
+                self.send_response(200)
+                if "nocharset" in self.path:
+                    self.send_header("Content-Type", "text/html")
+                else:
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        fetcher = HttpDetailFetcher(workers=2, timeout=5)
+        self.addCleanup(fetcher.close)
+        enricher = Enricher(fetcher, cooldown=0)
+        papers = enricher.enrich(
+            [{"链接": f"{base}/kcms/detail?id=1"}, {"链接": f"{base}/missing"}]
+        )
+
+        self.assertEqual(papers[0]["关键词"], "深度学习; 图像识别")
+        self.assertNotIn("摘要", papers[1])
+        self.assertEqual(enricher.stats["failed"], 1)
+
+        # 响应头没有声明编码时按内容识别，中文不乱码
+        papers = enricher.enrich([{"链接": f"{base}/nocharset/detail?id=3"}])
+        self.assertEqual(papers[0]["摘要"], "论文1的摘要 第二行")
+
+        # 被重定向到验证页面时记为被拦截
+        papers = enricher.enrich([{"链接": f"{base}/verify/detail?id=2"}])
+        self.assertNotIn("摘要", papers[0])
+        self.assertEqual(enricher.stats["blocked"], 1)
+        self.assertEqual(enricher.stats["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+论文提取逻辑测试（使用FakeDriver，无需浏览器）
+"""
+
+import os
+import sys
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from selenium.common.exceptions import InvalidSelectorException
+from selenium.webdriver.common.by import By
+
+from office_auto.cnki_crawler import CNKICrawler
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.fake_driver import FakeDriver
+
+BASE_URL = "https://kns.cnki.net"
+
+ROW = """<tr>
+<td class="name"><a class="fz14" href="/kcms/detail?id={n}">论文标题{n}</a></td>
+<td class="author"><a href="/kcms/author?name=a">张三</a>; <a href="/kcms/author?name=b">李四</a></td>
+<td class="source"><a href="/knavi/journals/XB/detail">测试学报</a></td>
+<td class="date">2023-05-{n:02d}</td>
+<td class="quote"><span class="cite">被引:{n}</span></td>
+<td class="download"><span class="download">下载:1{n}</span></td>
+</tr>"""
+
+
+def result_page(numbers, next_href=None):
+    rows = "\n".join(ROW.format(n=n) for n in numbers)
+    pager = (
+        f'<a id="PageNext" title="下页" href="{next_href}">下页</a>'
+        if next_href
+        else ""
+    )
+    return (
+        "<html><head><title>检索-中国知网</title></head><body>"
+        "<table class='result-table-list'><tr><th>题名</th></tr>"
+        f"{rows}</table><div class='pages'>{pager}</div></body></html>"
+    )
+
+
+class TestImprovedExtraction(unittest.TestCase):
+    """测试CNKICrawlerImproved的提取逻辑"""
+
+    def setUp(self):
+        self.driver = FakeDriver(
+            pages={
+                f"{BASE_URL}/page1": result_page([1, 2, 3], next_href="/page2"),
+                f"{BASE_URL}/page2": result_page([4, 5]),
+            }
+        )
+        self.driver.get(f"{BASE_URL}/page1")
+        self.crawler = CNKICrawlerImproved(driver=self.driver)
+
+    def test_extract_papers_from_page(self):
+        """提取整页论文的全部字段"""
+        papers = self.crawler._extract_papers_from_page()
+
+        self.assertEqual(len(papers), 3)
+        self.assertEqual(papers[0]["标题"], "论文标题1")
+        self.assertEqual(papers[0]["作者"], "张三; 李四")
+        self.assertEqual(papers[0]["期刊"], "测试学报")
+        self.assertEqual(papers[0]["发表日期"], "2023-05-01")
+        self.assertEqual(papers[0]["被引次数"], "被引:1")
+        self.assertEqual(papers[0]["下载次数"], "下载:11")
+
+    def test_next_page(self):
+        """点击下一页后到达第二页，最后一页没有下一页"""
+        self.assertTrue(self.crawler._click_next_page())
+        self.assertEqual(self.driver.current_url, f"{BASE_URL}/page2")
+        self.assertEqual(len(self.crawler._extract_papers_from_page()), 2)
+        self.assertFalse(self.crawler._click_next_page())
+
+    def test_missing_title_returns_none(self):
+        """没有标题的行不返回结果"""
+        self.driver.load_html("<table><tr><td>2023-01-01</td></tr></table>")
+        row = self.driver.find_element(By.CSS_SELECTOR, "tr")
+        self.assertIsNone(self.crawler._extract_paper_info(row))
+
+
+class TestClassicExtraction(unittest.TestCase):
+    """测试CNKICrawler的XPath提取逻辑"""
+
+    def test_extract_papers_from_page(self):
+        driver = FakeDriver(html=result_page([7, 8]), url=f"{BASE_URL}/page1")
+        crawler = CNKICrawler(driver=driver)
+
+        papers = crawler._extract_papers_from_page()
+
+        self.assertEqual([p["标题"] for p in papers], ["论文标题7", "论文标题8"])
+        self.assertEqual(papers[1]["被引次数"], "被引:8")
+
+
+class TestFakeDriver(unittest.TestCase):
+    """测试FakeDriver与浏览器行为一致的部分"""
+
+    def test_contains_selector_is_invalid(self):
+        """Chrome不支持:contains()，FakeDriver同样报错"""
+        driver = FakeDriver(html="<a>下页</a>")
+        with self.assertRaises(InvalidSelectorException):
+            driver.find_element(By.CSS_SELECTOR, "a:contains('下页')")
+
+    def test_href_is_absolute(self):
+        driver = FakeDriver(html=result_page([1]), url=f"{BASE_URL}/search")
+        link = driver.find_element(By.CSS_SELECTOR, "a.fz14")
+        self.assertEqual(link.get_attribute("href"), f"{BASE_URL}/kcms/detail?id=1")
+
+
+if __name__ == "__main__":
+    unittest.main()
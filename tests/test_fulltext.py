@@ -0,0 +1,107 @@
+"""
+全文检索测试
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.fulltext import match_query, ngram_tokens
+from office_auto.store import PaperStore
+from tests.test_dedup import paper
+
+ZHANG = {"name": "张三", "institution": "测试大学"}
+LI = {"name": "李四", "institution": ""}
+
+
+class TestTokenizer(unittest.TestCase):
+    def test_ngram_tokens(self):
+        self.assertEqual(
+            ngram_tokens("深度学习的AI芯片 Deep-Learning"),
+            [
+                "深度",
+                "度学",
+                "学习",
+                "习的",
+                "的",
+                "ai",
+                "芯片",
+                "片",
+                "deep",
+                "learning",
+            ],
+        )
+
+    def test_match_query(self):
+        self.assertEqual(match_query("深度学习"), '"深度 度学 学习"')
+        self.assertEqual(match_query("学 AI"), '"学"* AND "ai"')
+        with self.assertRaises(ValueError):
+            match_query("？！")
+
+
+class TestSearchLocal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "papers.db")
+        self.store = PaperStore(self.path)
+        self.addCleanup(self.store.close)
+
+        self.store.add(
+            ZHANG,
+            [
+                paper("基于深度学习的图像识别", date="2021-01-01"),
+                {
+                    **paper("卷积网络综述", date="2019-01-01"),
+                    "摘要": "回顾深度学习方法",
+                },
+            ],
+        )
+        self.store.add(LI, [paper("基于深度学习的图像识别", date="2021-01-01")])
+
+    def titles(self, query, **kwargs):
+        return [p["标题"] for p in self.store.search_local(query, **kwargs)]
+
+    def test_ranking_and_filters(self):
+        """标题命中排在摘要命中之前，可按作者和年份筛选"""
+        self.assertEqual(
+            self.titles("深度学习"), ["基于深度学习的图像识别", "卷积网络综述"]
+        )
+        self.assertEqual(
+            self.titles("深度学习", year_range=(None, 2020)), ["卷积网络综述"]
+        )
+        self.assertEqual(
+            self.titles("图像 识", author="李四"), ["基于深度学习的图像识别"]
+        )
+        self.assertEqual(self.titles("学习 图片"), [])
+
+        result = self.store.search_local("图像识别")[0]
+        self.assertEqual(result["检索作者"], "张三; 李四")
+
+    def test_index_follows_updates(self):
+        """补充摘要后可以检索到"""
+        self.store.add(
+            LI, [{**paper("卷积网络综述", date="2019-01-01"), "摘要": "注意力机制"}]
+        )
+        self.assertEqual(self.titles("注意力"), ["卷积网络综述"])
+        self.assertEqual(self.titles("回顾"), [])
+
+    def test_rebuild_for_existing_store(self):
+        """没有全文索引的旧论文库打开时补建索引"""
+        self.store.close()
+        db = sqlite3.connect(self.path)
+        db.execute("DROP TABLE papers_fts")
+        db.commit()
+        db.close()
+
+        self.store = PaperStore(self.path)
+        self.assertEqual(len(self.titles("卷积")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+增量刷新测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.batch import STATUS_SUCCESS, run_batch
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.dedup import paper_fingerprint
+from office_auto.fake_driver import FakeDriver
+from office_auto.sinks import StoreSink
+from tests.test_dedup import paper
+from tests.test_extraction import result_page
+from tests.test_reextract import ListSink
+
+SORT_OPTION = (
+    '<div id="orderList">'
+    '<a data-sort="PT" href="/kns8s/search?sort=PT">发表时间</a></div>'
+)
+
+
+def sortable_site(url: str, pages=((6, 5), (4, 3), (2, 1))) -> str:
+    """三页结果的模拟站点，带发表时间排序选项，论文编号越大发表日期越晚"""
+    for page, numbers in enumerate(pages[1:], 2):
+        if f"page={page}" in url:
+            next_href = "/kns8s/search?sort=PT&page=3" if page == 2 else None
+            return result_page(numbers, next_href=next_href)
+    html = result_page(pages[0], next_href="/kns8s/search?sort=PT&page=2")
+    return html.replace("<body>", f"<body>{SORT_OPTION}")
+
+
+def unsorted_site(url: str) -> str:
+    """排序点击没有生效，结果仍按相关度排列"""
+    return sortable_site(url, pages=((2, 6), (4, 5), (1, 3)))
+
+
+def titles(papers):
+    return [p["标题"] for p in papers]
+
+
+class TestIncrementalSearch(unittest.TestCase):
+    """按发表时间排序后遇到已有论文停止翻页"""
+
+    def setUp(self):
+        self.driver = FakeDriver(loader=sortable_site)
+        self.crawler = CNKICrawlerImproved(driver=self.driver)
+        self.known = {
+            paper_fingerprint(paper(f"论文标题{n}", date=f"2023-05-{n:02d}"))
+            for n in (1, 2, 3, 4)
+        }
+
+    def test_stops_at_known_paper(self):
+        papers = self.crawler.search_papers(
+            "张三", max_pages=5, known=self.known, refresh_days=365
+        )
+
+        self.assertEqual(titles(papers), ["论文标题6", "论文标题5"])
+        self.assertTrue(any("sort=PT" in url for url in self.driver.history))
+        self.assertFalse(any("page=3" in url for url in self.driver.history))
+        self.assertEqual(
+            self.crawler.metrics.summary()["counters"]["incremental_stops"], 1
+        )
+
+    def test_refresh_window_keeps_known_papers(self):
+        """刷新窗口内的已有论文保留，以更新计数"""
+        papers = self.crawler.search_papers(
+            "张三", max_pages=5, known=self.known, refresh_days=365 * 100
+        )
+        self.assertEqual(len(papers), 6)
+
+    def test_unsorted_results(self):
+        """结果日期不是降序时不提前停止"""
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=unsorted_site))
+        papers = crawler.search_papers("张三", max_pages=5, known=self.known)
+
+        self.assertEqual(len(papers), 6)
+        counters = crawler.metrics.summary()["counters"]
+        self.assertEqual(counters["incremental_unsorted"], 1)
+        self.assertNotIn("incremental_stops", counters)
+
+    def test_without_sort_option(self):
+        """找不到排序选项时完整爬取"""
+        driver = FakeDriver(
+            loader=lambda url: sortable_site(url).replace(SORT_OPTION, "")
+        )
+        crawler = CNKICrawlerImproved(driver=driver)
+        papers = crawler.search_papers("张三", max_pages=5, known=self.known)
+        self.assertEqual(len(papers), 6)
+
+
+class TestIncrementalBatch(unittest.TestCase):
+    @patch("office_auto.batch.create_crawler")
+    def test_store_output(self, create_crawler):
+        """增量结果合并到论文库，之前保存的论文保留"""
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=sortable_site)
+        )
+        author_info = {"name": "张三", "institution": ""}
+        with tempfile.TemporaryDirectory() as tmp:
+            options = dict(
+                max_pages=5,
+                incremental=True,
+                refresh_days=0,
+                dedup_path=os.path.join(tmp, "dedup.db"),
+            )
+            path = os.path.join(tmp, "papers.db")
+            with StoreSink(path) as sink:
+                first = run_batch([author_info], sink, **options)
+            with StoreSink(path) as sink:
+                second = run_batch([author_info], sink, **options)
+                stored = list(sink.store.query(author="张三"))
+
+        self.assertEqual(first[0]["count"], 6)
+        self.assertEqual(second[0], {**second[0], "count": 0, "status": STATUS_SUCCESS})
+        self.assertEqual(len(stored), 6)
+
+    def test_rejects_overwriting_outputs(self):
+        """按作者覆盖的输出会被增量结果替换，不允许"""
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                run_batch(
+                    [],
+                    ListSink(),
+                    incremental=True,
+                    dedup_path=os.path.join(tmp, "dedup.db"),
+                )
+
+    def test_requires_dedup_db(self):
+        with self.assertRaises(ValueError):
+            run_batch([], ListSink(), incremental=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                run_batch(
+                    [],
+                    ListSink(),
+                    incremental=True,
+                    dedup_path=os.path.join(tmp, "dedup.db"),
+                    backend="classic",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+运行指标测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.fake_driver import FakeDriver
+from office_auto.metrics import Metrics, percentile
+from tests.test_page_archive import site
+
+HOME_PAGE = """<html><body><form action="/kns8s/search">
+<input name="kw" placeholder="请输入检索词"></form></body></html>"""
+
+
+class TestPercentile(unittest.TestCase):
+    def test_interpolation(self):
+        values = [4, 1, 3, 2]
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(values, 100), 4)
+        self.assertEqual(percentile(values, 50), 2.5)
+        self.assertAlmostEqual(percentile(values, 95), 3.85)
+
+    def test_edge_cases(self):
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(percentile([7], 95), 7)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+        for seconds in (1.0, 2.0, 3.0):
+            self.metrics.observe("save", seconds)
+        self.metrics.incr("pages")
+        self.metrics.incr("rows", 20)
+        self.metrics.gauge("queue_write", 3)
+        self.metrics.gauge("queue_write", 1)
+
+    def test_summary(self):
+        summary = self.metrics.summary()
+        self.assertEqual(
+            summary["timings"]["save"],
+            {"count": 3, "total": 6.0, "mean": 2.0, "p50": 2.0, "p95": 2.9, "max": 3.0},
+        )
+        self.assertEqual(summary["counters"], {"pages": 1, "rows": 20})
+        self.assertEqual(summary["gauges"], {"queue_write": {"last": 1, "max": 3}})
+
+    def test_to_prometheus(self):
+        lines = self.metrics.to_prometheus().splitlines()
+        for line in (
+            "# TYPE office_auto_phase_seconds summary",
+            'office_auto_phase_seconds{phase="save",quantile="0.5"} 2.000000',
+            'office_auto_phase_seconds{phase="save",quantile="0.95"} 2.900000',
+            'office_auto_phase_seconds_sum{phase="save"} 6.000000',
+            'office_auto_phase_seconds_count{phase="save"} 3',
+            "# TYPE office_auto_events_total counter",
+            'office_auto_events_total{event="rows"} 20',
+            'office_auto_gauge{name="queue_write"} 1',
+            'office_auto_gauge_max{name="queue_write"} 3',
+        ):
+            self.assertIn(line, lines)
+        self.assertTrue(lines[-1].startswith("office_auto_run_duration_seconds "))
+
+        # 每个指标名只声明一次类型
+        types = [line.split()[2] for line in lines if line.startswith("# TYPE")]
+        self.assertEqual(len(types), len(set(types)))
+
+    def test_write_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "office_auto.prom")
+            self.metrics.write_prometheus(path)
+            self.assertEqual(os.listdir(tmp), ["office_auto.prom"])
+            with open(path, encoding="utf-8") as f:
+                self.assertIn('event="pages"', f.read())
+
+
+class TestCrawlerCounters(unittest.TestCase):
+    def test_form_fallback(self):
+        """直接搜索失败后改用表单搜索，计入 form_fallbacks"""
+
+        def loader(url):
+            if "crossref" in url:
+                return "<html><body>加载中</body></html>"
+            if "/kns8s/search" in url:
+                return site(url)
+            return HOME_PAGE
+
+        metrics = Metrics()
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=loader), metrics=metrics)
+        papers = crawler.search_papers("张三", max_pages=1)
+
+        self.assertEqual(len(papers), 2)
+        counters = metrics.summary()["counters"]
+        self.assertEqual(counters["form_fallbacks"], 1)
+        self.assertEqual(counters["search_ok"], 1)
+
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=site), metrics=metrics)
+        crawler.search_papers("李四", max_pages=1)
+        self.assertEqual(metrics.summary()["counters"]["form_fallbacks"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+页面录制与回放测试
+"""
+
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.fake_driver import FakeDriver
+from office_auto.page_archive import (
+    PageRecorder,
+    read_archive,
+    replay_archive,
+    replay_search,
+)
+from tests.test_extraction import result_page
+
+
+def site(url: str) -> str:
+    """两页结果的模拟站点"""
+    if "page=2" in url:
+        return result_page([3, 4])
+    return result_page([1, 2], next_href="/kns8s/search?page=2")
+
+
+class TestRecordReplay(unittest.TestCase):
+    """录制一次搜索后回放"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "pages.jsonl.gz")
+
+        with PageRecorder(self.path) as recorder:
+            crawler = CNKICrawlerImproved(
+                driver=FakeDriver(loader=site), recorder=recorder
+            )
+            self.recorded = crawler.search_papers("张三", "测试大学", max_pages=3)
+
+    def test_archive_contents(self):
+        """归档记录搜索参数和每个同步点的页面，相同HTML不重复保存"""
+        records = list(read_archive(self.path))
+        self.assertEqual(len(records), 1)
+        record = records[0]
+        self.assertEqual(record["author"], "张三")
+        self.assertEqual(
+            [p["label"] for p in record["pages"]],
+            ["navigate", "results", "page", "page"],
+        )
+        self.assertTrue(all(p["html"] for p in record["pages"]))
+
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            self.assertIn('"repeat": true', f.read())
+
+    def test_replay_matches_recording(self):
+        """回放得到与录制时相同的结果，且不偏离录制"""
+        results = list(replay_archive(self.path))
+        self.assertEqual(len(results), 1)
+        author_info, papers, status, diverged = results[0]
+        self.assertEqual(author_info, {"name": "张三", "institution": "测试大学"})
+        self.assertEqual(papers, self.recorded)
+        self.assertEqual(len(papers), 4)
+        self.assertEqual(status, "ok")
+        self.assertFalse(diverged)
+
+    def test_replay_detects_divergence(self):
+        """回放时页数限制不同会被标记为偏离"""
+        record = next(read_archive(self.path))
+        record["max_pages"] = 1
+        papers, _, driver = replay_search(record)
+        self.assertEqual(len(papers), 2)
+        self.assertTrue(driver.diverged)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+页面分类测试
+"""
+
+import os
+import sys
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.page_classifier import (
+    PAGE_BLOCKED,
+    PAGE_CAPTCHA,
+    PAGE_LOGIN,
+    PAGE_OK,
+    classify_page,
+)
+
+
+class TestClassifyPage(unittest.TestCase):
+    """测试classify_page函数"""
+
+    def test_result_page_is_ok(self):
+        """正常结果页即使页头有登录入口也应判定为正常"""
+        html = "<a>机构登录</a><table class='result-table-list'></table>"
+        self.assertEqual(
+            classify_page("https://kns.cnki.net/kns8s/search", "检索", html), PAGE_OK
+        )
+
+    def test_blocking_pages(self):
+        """识别验证码、登录墙和封禁页面"""
+        self.assertEqual(
+            classify_page("https://kns.cnki.net/verify/home", "", ""), PAGE_CAPTCHA
+        )
+        self.assertEqual(
+            classify_page("", "", "<div>请完成安全验证后继续</div>"), PAGE_CAPTCHA
+        )
+        self.assertEqual(classify_page("", "用户登录", "<form></form>"), PAGE_LOGIN)
+        self.assertEqual(
+            classify_page("", "", "<h1>访问过于频繁，请稍后再试</h1>"), PAGE_BLOCKED
+        )
+
+    def test_query_string_is_ignored(self):
+        """检索词中的关键词不应触发误判"""
+        url = "https://kns.cnki.net/kns8s/search?kw=作者:verify"
+        self.assertEqual(classify_page(url, "检索", "<html></html>"), PAGE_OK)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+流水线测试
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.batch import STATUS_FAILED, run_batch
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.fake_driver import FakeDriver
+from office_auto.metrics import Metrics
+from office_auto.pipeline import Pipeline, Stage
+from tests.test_page_archive import site
+from tests.test_reextract import ListSink
+
+
+class TestPipeline(unittest.TestCase):
+    def test_stages_and_backpressure(self):
+        """有界队列限制在途数量，出错的项目不影响其它项目"""
+        output = []
+
+        def double(n):
+            if n == 3:
+                raise ValueError("坏数据")
+            return [n * 2]
+
+        def write(n):
+            time.sleep(0.001)
+            output.append(n)
+
+        metrics = Metrics()
+        pipeline = Pipeline(
+            [
+                Stage("double", double, workers=3, queue_size=2),
+                Stage("write", write, queue_size=2),
+            ],
+            metrics,
+        )
+        with pipeline:
+            for n in range(20):
+                pipeline.put(n)
+                self.assertLessEqual(pipeline.depths()["double"], 2)
+
+        self.assertEqual(sorted(output), [n * 2 for n in range(20) if n != 3])
+        stats = pipeline.stats()
+        self.assertEqual(stats["double"]["errors"], 1)
+        self.assertEqual(stats["write"]["processed"], 19)
+        self.assertLessEqual(stats["write"]["max_depth"], 2)
+        self.assertIn("queue_write", metrics.summary()["gauges"])
+
+
+class TestCrawlerHandOff(unittest.TestCase):
+    def test_on_page(self):
+        """流水线模式下浏览器线程只交出页面HTML"""
+        pages = []
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=site))
+        papers = crawler.search_papers(
+            "张三", max_pages=3, on_page=lambda url, html: pages.append(url)
+        )
+        self.assertEqual(papers, [])
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(crawler.pages_handed_off, 2)
+        self.assertEqual(crawler.last_status, "ok")
+
+
+class TestPipelineBatch(unittest.TestCase):
+    @patch("office_auto.batch.create_crawler")
+    def test_same_output_as_inline(self, create_crawler):
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=site)
+        )
+        authors = [{"name": f"作者{n}", "institution": ""} for n in range(5)]
+
+        inline, piped = ListSink(), ListSink()
+        run_batch(authors, inline, max_pages=3, author_budget=None)
+        results = run_batch(
+            authors, piped, max_pages=3, author_budget=None, parse_workers=2
+        )
+
+        self.assertEqual(sorted(piped.rows), sorted(inline.rows))
+        self.assertEqual([r["count"] for r in results], [4] * 5)
+
+    @patch("office_auto.batch.create_crawler")
+    def test_parse_error_fails_author(self, create_crawler):
+        """解析出错的页面不会让作者一直等待，该作者记为失败"""
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=site)
+        )
+        extract = CNKICrawlerImproved._extract_papers_from_page
+        failures = []
+
+        def flaky_extract(crawler):
+            if "page=2" in crawler.driver.current_url and not failures:
+                failures.append(crawler.driver.current_url)
+                raise ValueError("无法解析")
+            return extract(crawler)
+
+        authors = [{"name": f"作者{n}", "institution": ""} for n in range(3)]
+        with patch.object(
+            CNKICrawlerImproved,
+            "_extract_papers_from_page",
+            autospec=True,
+            side_effect=flaky_extract,
+        ):
+            results = run_batch(
+                authors, ListSink(), max_pages=3, author_budget=None, parse_workers=2
+            )
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual([r["status"] for r in results].count(STATUS_FAILED), 1)
+        self.assertEqual(sorted(r["count"] for r in results), [0, 4, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
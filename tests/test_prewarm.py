@@ -0,0 +1,132 @@
+"""
+浏览器预热测试
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto import prewarm
+from office_auto.batch import run_batch
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.fake_driver import FakeDriver
+from office_auto.metrics import Metrics
+from office_auto.prewarm import Prewarmer
+from tests.test_page_archive import site
+from tests.test_reextract import ListSink
+
+AUTHORS = [{"name": f"作者{n}", "institution": "测试大学"} for n in range(3)]
+
+
+class Browser:
+    def __init__(self, n):
+        self.n = n
+        self.closed = False
+        self.thread = threading.current_thread().name
+
+    def close(self):
+        self.closed = True
+
+
+class CountingFactory:
+    def __init__(self, fail_first=False):
+        self.created = []
+        self.fail_first = fail_first
+
+    def __call__(self):
+        if self.fail_first and not self.created:
+            self.created.append(None)
+            raise RuntimeError("启动失败")
+        browser = Browser(len(self.created))
+        self.created.append(browser)
+        return browser
+
+
+class TestPrewarmer(unittest.TestCase):
+    def test_take_prebuilt_and_refill(self):
+        """取走的是后台创建的对象，取走后后台补充一个"""
+        factory = CountingFactory()
+        with Prewarmer(factory) as warm:
+            first = warm.take()
+            second = warm.take()
+        self.assertTrue(first.thread.startswith("prewarm"))
+        self.assertEqual((first.n, second.n), (0, 1))
+        self.assertEqual((warm.hits, warm.misses), (2, 0))
+        # 最后补充的备用对象在退出时关闭
+        self.assertEqual(len(factory.created), 3)
+        self.assertTrue(factory.created[2].closed)
+        self.assertFalse(second.closed)
+
+    def test_without_refill(self):
+        factory = CountingFactory()
+        with Prewarmer(factory, refill=False) as warm:
+            warm.take()
+            warm.take()
+        self.assertEqual((warm.hits, warm.misses), (1, 1))
+        self.assertEqual(len(factory.created), 2)
+
+    def test_failed_prewarm_falls_back(self):
+        """后台创建失败时在调用线程中重新创建"""
+        factory = CountingFactory(fail_first=True)
+        with Prewarmer(factory, refill=False) as warm:
+            browser = warm.take()
+        self.assertEqual(browser.thread, threading.current_thread().name)
+        self.assertEqual((warm.hits, warm.misses), (0, 1))
+
+
+class TestChromedriverPath(unittest.TestCase):
+    @patch("office_auto.prewarm.ChromeDriverManager")
+    def test_resolved_once(self, manager):
+        manager.return_value.install.return_value = "/tmp/chromedriver"
+        with patch.object(prewarm, "_driver_path", None):
+            self.assertEqual(prewarm.chromedriver_path(), "/tmp/chromedriver")
+            self.assertEqual(prewarm.chromedriver_path(), "/tmp/chromedriver")
+        self.assertEqual(manager.return_value.install.call_count, 1)
+
+
+@patch("office_auto.batch.create_crawler")
+class TestWarmSpare(unittest.TestCase):
+    def run_authors(self, **kwargs):
+        sink = ListSink()
+        metrics = Metrics()
+        run_batch(
+            AUTHORS, sink, max_pages=3, author_budget=None, metrics=metrics, **kwargs
+        )
+        return sink.rows, metrics.summary()["counters"]
+
+    def test_same_output_with_spare(self, create_crawler):
+        """浏览器达到重启阈值时换用备用浏览器，Cookie随之转移，结果不变"""
+        crawlers = []
+
+        def make(*args, **kwargs):
+            driver = FakeDriver(loader=site)
+            crawler = CNKICrawlerImproved(driver=driver)
+            crawler.needs_recycle = lambda: True
+            if not crawlers:
+                driver.add_cookie({"name": "session", "value": "1"})
+            crawlers.append(crawler)
+            return crawler
+
+        create_crawler.side_effect = make
+        plain, _ = self.run_authors()
+        crawlers.clear()
+        warm, counters = self.run_authors(warm_spare=True)
+
+        self.assertEqual(warm, plain)
+        self.assertGreaterEqual(counters["prewarm_hits"], 2)
+        self.assertIn(
+            {"name": "session", "value": "1"}, crawlers[1].driver.get_cookies()
+        )
+
+    def test_rejects_classic_backend(self, create_crawler):
+        with self.assertRaises(ValueError):
+            run_batch([], ListSink(), backend="classic", warm_spare=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+运行剖析模块测试
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.profiling import Profiler, parse_profile
+
+
+def busy_work():
+    return sum(len(str(i)) for i in range(20000))
+
+
+class TestParseProfile(unittest.TestCase):
+    """测试剖析模式解析"""
+
+    def test_modes(self):
+        self.assertEqual(parse_profile(None), [])
+        self.assertEqual(parse_profile("cpu, sample"), ["cpu", "sample"])
+        self.assertEqual(parse_profile("all"), ["cpu", "memory"])
+        self.assertEqual(parse_profile(["memory", "memory"]), ["memory"])
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            parse_profile("gpu")
+
+
+class TestProfiler(unittest.TestCase):
+    """测试剖析结果文件"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_disabled_writes_nothing(self):
+        with Profiler(None, self.tmp.name) as profiler:
+            with profiler.thread():
+                busy_work()
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_writes_all_outputs(self):
+        """cpu统计包含工作线程中的函数，memory和sample写入各自的文件"""
+        with Profiler("cpu,memory,sample", self.tmp.name, "run") as profiler:
+
+            def worker():
+                with profiler.thread():
+                    busy_work()
+
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        suffixes = sorted(
+            os.path.basename(path).split(".", 1)[1] for path in profiler.paths
+        )
+        self.assertEqual(
+            suffixes,
+            [
+                "cpu.txt",
+                "memory.txt",
+                "pstats",
+                "samples.txt",
+                "samples_top.txt",
+                "tracemalloc",
+            ],
+        )
+        for path in profiler.paths:
+            self.assertTrue(os.path.exists(path))
+        with open(
+            os.path.join(self.tmp.name, f"{profiler.name}.cpu.txt"), encoding="utf-8"
+        ) as f:
+            self.assertIn("busy_work", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+"""
+合并检索测试
+"""
+
+import os
+import re
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from urllib.parse import unquote
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.batch import STATUS_NO_RESULT, SearchCache, run_batch
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.fake_driver import FakeDriver
+from office_auto.metrics import Metrics
+from office_auto.query_batch import (
+    build_or_query,
+    demultiplex,
+    plan_groups,
+    split_authors,
+)
+from tests.test_extraction import ROW, result_page
+from tests.test_reextract import ListSink
+
+ORIGINAL_AUTHORS = (
+    '<a href="/kcms/author?name=a">张三</a>; <a href="/kcms/author?name=b">李四</a>'
+)
+
+# 论文编号 -> 作者
+PAPERS = {1: ["张三", "王五"], 2: ["李四"], 3: ["赵六"], 4: ["张三", "李四"]}
+
+# 合并检索时显示的结果总数超出翻页上限的作者
+PROLIFIC = "王五"
+
+
+def row(n):
+    authors = "; ".join(f'<a href="/kcms/author?name={a}">{a}</a>' for a in PAPERS[n])
+    return ROW.format(n=n).replace(ORIGINAL_AUTHORS, authors)
+
+
+def author_site(url: str) -> str:
+    """按检索式中的作者返回结果的模拟站点，每页两条"""
+    names = set(re.findall(r"作者:([^\s)&]+)", unquote(url)))
+    numbers = [n for n, authors in PAPERS.items() if names & set(authors)]
+    page = 2 if "page=2" in url else 1
+    next_href = f"{url}&page=2" if page == 1 and len(numbers) > 2 else None
+    html = result_page([], next_href=next_href).replace(
+        "</tr></table>",
+        "</tr>"
+        + "".join(row(n) for n in numbers[(page - 1) * 2 : page * 2])
+        + "</table>",
+    )
+    if " OR " in url and PROLIFIC in names:
+        html = html.replace(
+            "<body>",
+            "<body><div class='pagerTitleCell'>共找到 <em>1,500</em> 条结果</div>",
+        )
+    return html
+
+
+def paper(title, authors):
+    return {"标题": title, "作者": authors}
+
+
+class TestQueryPlanning(unittest.TestCase):
+    def test_build_or_query(self):
+        self.assertEqual(build_or_query(["张三", "李四"]), "作者:张三 OR 作者:李四")
+        self.assertEqual(
+            build_or_query(["张三", "李四"], "测试大学"),
+            "(作者:张三 OR 作者:李四) AND 单位:测试大学",
+        )
+
+    def test_plan_groups(self):
+        """同一单位的作者才合并，每组不超过指定人数"""
+        authors = [
+            {"name": "张三", "institution": "甲大学"},
+            {"name": "李四", "institution": "乙大学"},
+            {"name": "王五", "institution": "甲大学"},
+            {"name": "赵六", "institution": "甲大学 "},
+        ]
+        groups = plan_groups(authors, 2)
+        self.assertEqual(
+            [[a["name"] for a in group] for group in groups],
+            [["张三", "王五"], ["赵六"], ["李四"]],
+        )
+
+    def test_demultiplex(self):
+        """合著论文分给每位作者，姓名按完整姓名匹配"""
+        papers = [
+            paper("合著", "张三; 李四"),
+            paper("独著", "李 四"),
+            paper("同姓", "张三丰，王五"),
+        ]
+        by_author, unmatched = demultiplex(papers, ["张三", "李四"])
+        self.assertEqual([p["标题"] for p in by_author["张三"]], ["合著"])
+        self.assertEqual([p["标题"] for p in by_author["李四"]], ["合著", "独著"])
+        self.assertEqual([p["标题"] for p in unmatched], ["同姓"])
+        self.assertEqual(split_authors("张三丰，王五"), ["张三丰", "王五"])
+
+
+class TestTruncation(unittest.TestCase):
+    def test_result_count_over_limit(self):
+        """结果总数超出翻页上限时不再翻页"""
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=author_site))
+        papers = crawler.search_papers(
+            "张三 / 王五",
+            max_pages=3,
+            query=build_or_query(["张三", "王五"]),
+            abort_if_truncated=True,
+        )
+        self.assertEqual(crawler.result_count, 1500)
+        self.assertTrue(crawler.truncated)
+        self.assertEqual(len(papers), 2)
+
+    def test_page_limit_reached(self):
+        """读不到结果总数时，到达翻页上限仍有下一页同样视为超出"""
+        crawler = CNKICrawlerImproved(driver=FakeDriver(loader=author_site))
+        crawler.search_papers(
+            "张三 / 李四", max_pages=1, query="作者:张三 OR 作者:李四"
+        )
+        self.assertIsNone(crawler.result_count)
+        self.assertTrue(crawler.truncated)
+
+        crawler.search_papers("张三", max_pages=2)
+        self.assertFalse(crawler.truncated)
+
+
+@patch("office_auto.batch.create_crawler")
+class TestOrBatch(unittest.TestCase):
+    def run_authors(self, authors, **kwargs):
+        sink = ListSink()
+        metrics = Metrics()
+        results = run_batch(
+            authors, sink, max_pages=2, author_budget=None, metrics=metrics, **kwargs
+        )
+        return sink, results, metrics.summary()["counters"]
+
+    def test_same_output_as_individual(self, create_crawler):
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=author_site)
+        )
+        authors = [
+            {"name": "张三", "institution": ""},
+            {"name": "孙七", "institution": "测试大学"},
+            {"name": "李四", "institution": ""},
+            {"name": "赵六", "institution": ""},
+        ]
+
+        single, _, _ = self.run_authors(authors)
+        combined, results, counters = self.run_authors(authors, or_batch=3)
+
+        self.assertEqual(sorted(combined.rows), sorted(single.rows))
+        self.assertEqual(
+            [r["author"] for r in results], ["张三", "孙七", "李四", "赵六"]
+        )
+        self.assertEqual([r["count"] for r in results], [2, 0, 2, 1])
+        self.assertEqual(counters["or_queries"], 1)
+        self.assertNotIn("or_fallbacks", counters)
+
+    def test_fallback_when_too_many_results(self, create_crawler):
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=author_site)
+        )
+        authors = [{"name": name, "institution": ""} for name in ("张三", PROLIFIC)]
+
+        sink, results, counters = self.run_authors(authors, or_batch=2)
+
+        self.assertEqual(counters["or_fallbacks"], 1)
+        self.assertEqual(
+            sorted(sink.rows),
+            [("张三", ["论文标题1", "论文标题4"]), ("王五", ["论文标题1"])],
+        )
+
+    def test_unmatched_authors_searched_individually(self, create_crawler):
+        """作者字段写法不同导致没有分到论文的作者单独检索，合并检索的空结果不缓存"""
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(
+                loader=lambda url: author_site(url).replace(">赵六<", ">赵六1<")
+            )
+        )
+        authors = [
+            {"name": name, "institution": ""} for name in ("张三", "赵六", "孙七")
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            sink, results, counters = self.run_authors(
+                authors, or_batch=3, cache_dir=tmp
+            )
+            cached = {a["name"]: SearchCache(tmp).get(a, 2) for a in authors}
+
+        self.assertEqual([r["count"] for r in results], [2, 1, 0])
+        self.assertEqual(results[2]["status"], STATUS_NO_RESULT)
+        self.assertEqual(counters["or_fallbacks"], 1)
+        self.assertEqual(counters["or_unmatched"], 1)
+        self.assertEqual(sink.rows[-1], ("赵六", ["论文标题3"]))
+        # 孙七 在逐个检索中也没有结果，这个空结果可以缓存
+        self.assertEqual(cached["孙七"], [])
+        self.assertEqual(len(cached["赵六"]), 1)
+
+    def test_or_empty_results_not_cached(self, create_crawler):
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=author_site)
+        )
+        authors = [{"name": name, "institution": ""} for name in ("张三", "孙七")]
+        with tempfile.TemporaryDirectory() as tmp:
+            _, results, _ = self.run_authors(authors, or_batch=2, cache_dir=tmp)
+            self.assertIsNone(SearchCache(tmp).get(authors[1], 2))
+        self.assertEqual(results[1]["status"], STATUS_NO_RESULT)
+
+    def test_rejects_tabs(self, create_crawler):
+        with self.assertRaises(ValueError):
+            run_batch([], ListSink(), tabs=2, or_batch=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
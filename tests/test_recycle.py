@@ -0,0 +1,97 @@
+"""
+浏览器重启测试（使用FakeDriver）
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.config import CRAWLER_CONFIG
+from office_auto.fake_driver import FakeDriver
+from office_auto.tabs import MultiTabCrawler
+from tests.test_page_archive import site
+
+
+class TestRecycle(unittest.TestCase):
+    def setUp(self):
+        self.drivers = [FakeDriver(loader=site)]
+        self.crawler = CNKICrawlerImproved(driver=self.drivers[0])
+        # 重启时换上新的FakeDriver，代替启动Chrome
+        patcher = patch.object(
+            self.crawler, "setup_driver", side_effect=self.new_driver
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def new_driver(self, headless=True):
+        self.drivers.append(FakeDriver(loader=site))
+        self.crawler.attach_driver(self.drivers[-1])
+
+    def test_pages_served(self):
+        """打开页面和翻页都计入已加载页面数"""
+        self.crawler.search_papers("张三", max_pages=3)
+        self.assertEqual(self.crawler.pages_served, 2)
+
+    def test_needs_recycle(self):
+        self.crawler.pages_served = 5
+        self.assertTrue(self.crawler.needs_recycle(max_pages=5, max_rss_mb=None))
+        self.assertFalse(self.crawler.needs_recycle(max_pages=6, max_rss_mb=None))
+        self.assertFalse(self.crawler.needs_recycle(max_pages=None, max_rss_mb=None))
+
+        with patch.object(self.crawler, "browser_rss_mb", return_value=900.0):
+            self.assertTrue(self.crawler.needs_recycle(max_pages=None, max_rss_mb=800))
+            self.assertFalse(
+                self.crawler.needs_recycle(max_pages=None, max_rss_mb=1000)
+            )
+        # 无法统计内存时不重启
+        with patch.object(self.crawler, "browser_rss_mb", return_value=None):
+            self.assertFalse(self.crawler.needs_recycle(max_pages=None, max_rss_mb=1))
+
+        # 默认取配置
+        with patch.dict(CRAWLER_CONFIG, recycle_pages=5, recycle_rss_mb=None):
+            self.assertTrue(self.crawler.needs_recycle())
+
+    def test_recycle_keeps_cookies(self):
+        self.drivers[0].add_cookie({"name": "SID", "value": "abc"})
+        self.crawler.pages_served = 10
+
+        with patch.dict(CRAWLER_CONFIG, recycle_pages=10, recycle_rss_mb=None):
+            self.assertTrue(self.crawler.maybe_recycle())
+
+        self.assertIs(self.crawler.driver, self.drivers[1])
+        self.assertEqual(self.drivers[0].window_handles, [])
+        self.assertEqual(self.drivers[1].cookies, [{"name": "SID", "value": "abc"}])
+        self.assertEqual(self.drivers[1].history, [self.crawler.base_url])
+        # 恢复Cookie时打开的首页计入新浏览器
+        self.assertEqual(self.crawler.pages_served, 1)
+
+        with patch.dict(CRAWLER_CONFIG, recycle_pages=10, recycle_rss_mb=None):
+            self.assertFalse(self.crawler.maybe_recycle())
+
+    def test_recycle_without_cookies(self):
+        self.crawler.recycle()
+        self.assertEqual(self.drivers[1].history, [])
+        self.assertEqual(self.crawler.pages_served, 0)
+
+    def test_tab_mode_counts_pages(self):
+        """多标签页模式的导航同样计入页面数，达到阈值后在作者之间重启"""
+        multi_tab = MultiTabCrawler(
+            self.crawler, tabs=2, poll_interval=0, page_delay=0, settle=0
+        )
+        authors = [(i, {"name": f"作者{i}"}) for i in range(3)]
+        with patch.dict(CRAWLER_CONFIG, recycle_pages=4, recycle_rss_mb=None):
+            results = list(multi_tab.search_many(authors, max_pages=2))
+
+        self.assertEqual([len(papers) for _, _, papers, _ in results], [4, 4, 4])
+        # 前两个作者共4个页面（2次打开、2次翻页），第三个作者在重启后的浏览器中处理
+        self.assertEqual(len(self.drivers), 2)
+        self.assertEqual(self.crawler.pages_served, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+离线批量重新提取测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.fake_driver import FakeDriver
+from office_auto.page_archive import PageRecorder
+from office_auto.reextract import reextract
+from office_auto.sinks import OutputSink
+from tests.test_extraction import result_page
+from tests.test_page_archive import site
+
+
+class ListSink(OutputSink):
+    """把输出保存在内存中"""
+
+    def __init__(self):
+        self.rows = []
+
+    def write(self, author_info, papers):
+        self.rows.append((author_info["name"], [p["标题"] for p in papers]))
+        return "memory"
+
+
+class TestReextract(unittest.TestCase):
+    """测试从目录和归档重新提取"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_directory(self):
+        """目录中每个HTML文件作为一个作者，多进程结果按输入顺序输出"""
+        pages_dir = os.path.join(self.tmp.name, "pages")
+        os.makedirs(pages_dir)
+        for i in range(6):
+            with open(
+                os.path.join(pages_dir, f"author{i}.html"), "w", encoding="utf-8"
+            ) as f:
+                f.write(result_page([i * 2 + 1, i * 2 + 2]))
+        with open(os.path.join(pages_dir, "notes.txt"), "w") as f:
+            f.write("不是HTML")
+
+        sink = ListSink()
+        stats = reextract(pages_dir, sink, workers=2)
+
+        self.assertEqual(stats["authors"], 6)
+        self.assertEqual(stats["papers"], 12)
+        self.assertEqual(sink.rows[0], ("author0", ["论文标题1", "论文标题2"]))
+        self.assertEqual(
+            [name for name, _ in sink.rows], [f"author{i}" for i in range(6)]
+        )
+
+    def test_archive(self):
+        """归档中只提取结果页，每次搜索输出一次"""
+        path = os.path.join(self.tmp.name, "pages.jsonl.gz")
+        with PageRecorder(path) as recorder:
+            crawler = CNKICrawlerImproved(
+                driver=FakeDriver(loader=site), recorder=recorder
+            )
+            crawler.search_papers("张三", max_pages=3)
+
+        sink = ListSink()
+        stats = reextract(path, sink, workers=1)
+
+        self.assertEqual(stats["pages"], 2)
+        self.assertEqual(
+            sink.rows, [("张三", ["论文标题1", "论文标题2", "论文标题3", "论文标题4"])]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
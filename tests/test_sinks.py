@@ -0,0 +1,201 @@
+"""
+输出模块测试
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.batch import STATUS_WRITE_FAILED, BatchJournal, SearchCache, run_batch
+from office_auto.sinks import (
+    BackgroundSink,
+    CsvSink,
+    ExcelDirSink,
+    ExcelFileSink,
+    JsonlSink,
+    OutputSink,
+    StoreSink,
+    open_sink,
+    read_output,
+)
+from tests.test_dedup import paper
+from tests.test_reextract import ListSink
+
+
+class SlowSink(ListSink):
+    """写出前等待放行，张三的写出失败"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, author_info, papers):
+        self.release.wait(5)
+        if author_info["name"] == "张三":
+            raise OSError("磁盘已满")
+        return super().write(author_info, papers)
+
+
+class TestSinks(unittest.TestCase):
+    zhang = {"name": "张三", "institution": "测试大学"}
+    li = {"name": "李四", "institution": ""}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_abstract_base(self):
+        with self.assertRaises(TypeError):
+            OutputSink()
+
+    def test_open_sink(self):
+        """按输出路径选择输出类型"""
+        for name, cls in (
+            ("papers.csv", CsvSink),
+            ("papers.JSONL", JsonlSink),
+            ("papers.xlsx", ExcelFileSink),
+            ("papers.db", StoreSink),
+            ("output_dir", ExcelDirSink),
+        ):
+            with open_sink(self.path(name)) as sink:
+                self.assertIsInstance(sink, cls)
+
+    def test_excel_dir(self):
+        """每个作者一个Excel文件，文件名带单位，列按EXCEL_COLUMNS排序"""
+        output_dir = self.path("excel")
+        with ExcelDirSink(output_dir) as sink:
+            written = sink.write(self.zhang, [paper("A"), paper("B")])
+            sink.write(self.li, [paper("C")])
+        self.assertEqual(written, os.path.join(output_dir, "张三_测试大学_papers.xlsx"))
+        self.assertEqual(
+            sorted(os.listdir(output_dir)),
+            ["张三_测试大学_papers.xlsx", "李四_papers.xlsx"],
+        )
+        groups = dict(
+            (author_info["name"], papers)
+            for author_info, papers in read_output(output_dir)
+        )
+        self.assertEqual([p["标题"] for p in groups["张三"]], ["A", "B"])
+        self.assertEqual(list(groups["李四"][0]), ["标题", "期刊", "发表日期"])
+
+    def test_excel_dir_underscore_names(self):
+        """作者和单位从文件中的列读回，名称含下划线也不会拆错"""
+        output_dir = self.path("excel")
+        author_info = {"name": "John_Smith", "institution": "MIT_CSAIL"}
+        with ExcelDirSink(output_dir) as sink:
+            sink.write(author_info, [paper("A")])
+        [(read_info, papers)] = read_output(output_dir)
+        self.assertEqual(read_info, author_info)
+        self.assertEqual(list(papers[0]), ["标题", "期刊", "发表日期"])
+
+    def test_csv_append(self):
+        """追加时不重复写表头，未知的列被忽略"""
+        path = self.path("papers.csv")
+        with CsvSink(path) as sink:
+            sink.write(self.zhang, [dict(paper("A"), 额外="x")])
+        with CsvSink(path, append=True) as sink:
+            sink.write(self.li, [paper("B")])
+
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["标题"] for row in rows], ["A", "B"])
+        self.assertEqual(rows[0]["检索单位"], "测试大学")
+        self.assertNotIn("额外", rows[0])
+
+        # 不追加时覆盖已有文件
+        with CsvSink(path) as sink:
+            sink.write(self.li, [paper("C")])
+        self.assertEqual(
+            [
+                (a["name"], [p["标题"] for p in papers])
+                for a, papers in read_output(path)
+            ],
+            [("李四", ["C"])],
+        )
+
+    def test_jsonl(self):
+        path = self.path("papers.jsonl")
+        with JsonlSink(path) as sink:
+            sink.write(self.zhang, [paper("A")])
+        with JsonlSink(path, append=True) as sink:
+            sink.write(self.li, [paper("B")])
+
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(
+            rows[0], {"检索作者": "张三", "检索单位": "测试大学", **paper("A")}
+        )
+        self.assertEqual(
+            [(a["name"], len(papers)) for a, papers in read_output(path)],
+            [("张三", 1), ("李四", 1)],
+        )
+
+
+class TestBackgroundSink(unittest.TestCase):
+    def test_write_returns_before_save(self):
+        inner = SlowSink()
+        sink = BackgroundSink(inner, queue_size=4)
+        with tempfile.TemporaryDirectory() as tmp:
+            with BackgroundSink(ExcelDirSink(tmp)) as excel:
+                self.assertEqual(
+                    excel.target_for({"name": "李四"}),
+                    os.path.join(tmp, "李四_papers.xlsx"),
+                )
+
+        sink.write({"name": "李四"}, [paper("A")])
+        sink.write({"name": "张三"}, [paper("B")])
+        self.assertEqual(inner.rows, [])
+
+        # 关闭时写完队列中剩余的结果
+        inner.release.set()
+        sink.close()
+        self.assertEqual(inner.rows, [("李四", ["A"])])
+        self.assertEqual(sink.errors, [({"name": "张三"}, "磁盘已满")])
+        with self.assertRaises(RuntimeError):
+            sink.write({"name": "王五"}, [])
+
+
+class TestBatchBackgroundWrite(unittest.TestCase):
+    def test_write_errors_in_summary(self):
+        """写出失败出现在批量结果中，续跑时重新处理"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SearchCache(tmp)
+            authors = [
+                {"name": "张三", "institution": ""},
+                {"name": "李四", "institution": ""},
+            ]
+            for author_info in authors:
+                cache.put(author_info, 2, [paper(author_info["name"])])
+
+            sink = SlowSink()
+            sink.release.set()
+            journal_path = os.path.join(tmp, "journal.jsonl")
+            results = run_batch(
+                authors,
+                sink,
+                max_pages=2,
+                cache_dir=tmp,
+                journal_path=journal_path,
+                background_write=True,
+            )
+            finished = BatchJournal(journal_path).finished_keys()
+
+        self.assertEqual(results[0]["status"], STATUS_WRITE_FAILED)
+        self.assertEqual(results[0]["error"], "磁盘已满")
+        self.assertEqual(results[1]["count"], 1)
+        self.assertEqual(sink.rows, [("李四", ["李四"])])
+        self.assertEqual(finished, {"李四\t"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+溢出缓冲测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto import spill
+from office_auto.sinks import ExcelFileSink, open_sink, read_output
+from office_auto.spill import SpillBuffer
+from tests.test_dedup import paper
+
+
+class TestSpillBuffer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def check_round_trip(self, spill_format):
+        rows = [{"标题": f"论文{n}", "被引次数": str(n)} for n in range(10)]
+        # 块中第一行之后才出现的列也要保留
+        rows[4]["额外"] = "x"
+        del rows[3]["被引次数"]
+        with SpillBuffer(3, self.tmp.name, spill_format) as buffer:
+            buffer.extend(rows)
+            self.assertEqual(buffer.spilled_chunks, 3)
+            self.assertEqual(len(buffer._rows), 1)
+            self.assertEqual(len(buffer), 10)
+            self.assertEqual(list(buffer), rows)
+            # 可以重复读取
+            self.assertEqual(list(buffer), rows)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_jsonl(self):
+        self.check_round_trip("jsonl")
+
+    @unittest.skipIf(spill.pq is None, "未安装pyarrow")
+    def test_parquet(self):
+        self.check_round_trip("parquet")
+
+    @unittest.skipIf(spill.pq is None, "未安装pyarrow")
+    def test_parquet_mixed_types(self):
+        """同一列的值类型不同时按字符串保存"""
+        rows = [{"标题": "论文1", "被引次数": 5}, {"标题": "论文2", "被引次数": "7"}]
+        with SpillBuffer(2, self.tmp.name, "parquet") as buffer:
+            buffer.extend(rows)
+            self.assertEqual(buffer.spilled_chunks, 1)
+            self.assertEqual(
+                list(buffer),
+                [
+                    {"标题": "论文1", "被引次数": "5"},
+                    {"标题": "论文2", "被引次数": "7"},
+                ],
+            )
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            SpillBuffer(spill_format="csv")
+
+
+class TestExcelFileSink(unittest.TestCase):
+    def test_consolidated_workbook(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "papers.xlsx")
+            with open_sink(path) as sink:
+                self.assertIsInstance(sink, ExcelFileSink)
+
+            with ExcelFileSink(path, max_rows=2, spill_dir=tmp) as sink:
+                sink.write({"name": "张三", "institution": "测试大学"}, [paper("A")])
+                sink.write(
+                    {"name": "李四", "institution": ""}, [paper("B"), paper("C")]
+                )
+                self.assertEqual(sink.buffer.spilled_chunks, 1)
+
+            groups = [
+                (author["name"], [p["标题"] for p in papers])
+                for author, papers in read_output(path)
+            ]
+            self.assertEqual(sorted(os.listdir(tmp)), ["papers.xlsx"])
+        self.assertEqual(groups, [("张三", ["A"]), ("李四", ["B", "C"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
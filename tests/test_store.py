@@ -0,0 +1,104 @@
+"""
+SQLite论文库测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.sinks import StoreSink, open_sink, read_output
+from office_auto.store import PaperStore
+from tests.test_dedup import paper
+
+ZHANG = {"name": "张三", "institution": "测试大学"}
+LI = {"name": "李四", "institution": ""}
+
+
+class TestPaperStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "papers.db")
+        self.store = PaperStore(self.path)
+        self.addCleanup(self.store.close)
+
+    def test_upsert_updates_counts(self):
+        """同一论文再次写入时更新计数，空值不覆盖已有字段"""
+        self.store.add(ZHANG, [{**paper("A"), "被引次数": "1", "摘要": "摘要A"}])
+        self.store.add(LI, [{**paper("A", date="2023/5/1"), "被引次数": "5"}])
+
+        self.assertEqual(len(self.store), 1)
+        rows = list(self.store.query())
+        self.assertEqual([author["name"] for author, _ in rows], ["张三", "李四"])
+        self.assertEqual(rows[0][1]["被引次数"], "5")
+        self.assertEqual(rows[0][1]["摘要"], "摘要A")
+
+    def test_rollback_forgets_author_ids(self):
+        """回滚后作者编号会被重用，缓存不能把论文记到其他作者名下"""
+
+        def failing_items():
+            yield ZHANG, [paper("A")]
+            raise OSError("中断")
+
+        with self.assertRaises(OSError):
+            self.store.add_many(failing_items())
+        self.store.add(LI, [paper("B")])
+        self.store.add(ZHANG, [paper("C")])
+
+        titles = lambda name: [p["标题"] for _, p in self.store.query(author=name)]
+        self.assertEqual(titles("李四"), ["B"])
+        self.assertEqual(titles("张三"), ["C"])
+
+    def test_wal_mode(self):
+        (mode,) = self.store._db.execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode, "wal")
+
+    def test_query_filters(self):
+        self.store.add_many(
+            [
+                (ZHANG, [paper("A", date="2019-12-31"), paper("B", date="2021-03-01")]),
+                (LI, [paper("C", date="2020-06-01")]),
+            ]
+        )
+        titles = lambda **filters: [p["标题"] for _, p in self.store.query(**filters)]
+
+        self.assertEqual(titles(author="张三"), ["B", "A"])
+        self.assertEqual(titles(date_from="2020", date_to="2020"), ["C"])
+        self.assertEqual(titles(date_to="2019-12-31"), ["A"])
+        self.assertEqual(self.store.authors(), [ZHANG, LI])
+
+    def test_export_excel(self):
+        self.store.add(ZHANG, [paper("A"), paper("B")])
+        self.store.add(LI, [paper("B")])
+        path = os.path.join(self.tmp.name, "export.xlsx")
+
+        self.assertEqual(self.store.export_excel(path, author="李四"), 1)
+        df = pd.read_excel(path)
+        self.assertEqual(list(df.columns[:4]), ["检索作者", "检索单位", "标题", "作者"])
+        self.assertEqual(df["标题"].tolist(), ["B"])
+
+
+class TestStoreSink(unittest.TestCase):
+    def test_write_and_read_back(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "papers.db")
+            with open_sink(path) as sink:
+                self.assertIsInstance(sink, StoreSink)
+                sink.write(ZHANG, [paper("A")])
+                sink.write(LI, [paper("A"), paper("B", date="2022-01-01")])
+
+            groups = [
+                (author["name"], [p["标题"] for p in papers])
+                for author, papers in read_output(path)
+            ]
+        self.assertEqual(groups, [("张三", ["A"]), ("李四", ["A", "B"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+多标签页爬取测试（使用FakeDriver和假时钟）
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.cnki_crawler_improved import STATUS_EMPTY, CNKICrawlerImproved
+from office_auto.deadline import Deadline
+from office_auto.fake_driver import FakeDriver
+from office_auto.page_classifier import PAGE_CAPTCHA, PAGE_OK
+from office_auto.rate_limit import RateLimiter
+from office_auto.tabs import (
+    _LOADING,
+    _PAGING,
+    _STARTING,
+    _WAITING,
+    MultiTabCrawler,
+    _TabTask,
+)
+from tests.test_deadline import FakeClock
+from tests.test_extraction import result_page
+from tests.test_page_archive import site
+
+CAPTCHA_PAGE = "<html><head><title>安全验证</title></head><body>拖动滑块</body></html>"
+
+
+def tab_site(url):
+    """作者 空 没有结果，作者 验证 遇到验证码，其余作者两页结果"""
+    if "空" in url:
+        return result_page([])
+    if "验证" in url:
+        return CAPTCHA_PAGE
+    return site(url)
+
+
+class TestMultiTabCrawler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("office_auto.tabs.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.driver = FakeDriver(loader=tab_site)
+        self.crawler = CNKICrawlerImproved(driver=self.driver)
+        self.multi_tab = MultiTabCrawler(
+            self.crawler, tabs=2, poll_interval=0, page_delay=1, settle=5
+        )
+        self.multi_tab._open_tabs()
+
+    def start(self, name):
+        task = _TabTask(self.multi_tab.handles[0], name, {"name": name}, Deadline())
+        self.multi_tab._start(task)
+        return task
+
+    def test_start(self):
+        """在指定标签页中打开检索URL，记录原URL"""
+        task = _TabTask(self.multi_tab.handles[1], 1, {"name": "张三"}, Deadline())
+        self.multi_tab._start(task)
+
+        self.assertEqual(self.driver.current_window_handle, task.handle)
+        self.assertEqual(task.previous_url, "about:blank")
+        self.assertEqual(self.driver.current_url, self.crawler.build_search_url("张三"))
+        self.assertEqual(task.loading_since, self.clock.now)
+
+    def test_pages(self):
+        """提取第一页后等待翻页间隔，第一条结果变化后提取第二页"""
+        task = self.start("张三")
+        self.assertIsNone(self.multi_tab._step(task, max_pages=3))
+        self.assertEqual(task.state, _WAITING)
+        self.assertEqual(len(task.papers), 2)
+
+        # 翻页间隔未到
+        self.assertIsNone(self.multi_tab._step(task, max_pages=3))
+        self.assertEqual(task.page, 1)
+
+        self.clock.advance(1)
+        self.assertIsNone(self.multi_tab._step(task, max_pages=3))
+        self.assertEqual((task.page, task.state), (2, _LOADING))
+        self.assertIsNone(self.multi_tab._step(task, max_pages=3))
+        self.assertEqual(
+            [p["标题"] for p in task.papers][2:], ["论文标题3", "论文标题4"]
+        )
+
+        self.clock.advance(1)
+        self.assertEqual(self.multi_tab._step(task, max_pages=3), PAGE_OK)
+        timings = self.crawler.metrics.summary()["timings"]
+        self.assertEqual(timings["ready_search"]["count"], 1)
+        self.assertEqual(timings["ready_page"]["count"], 1)
+
+    def test_waits_for_new_rows(self):
+        """页面还是上一个作者的结果、或第一条结果没有变化时继续等待"""
+        task = self.start("张三")
+        task.previous_url = self.driver.current_url
+        self.assertIsNone(self.multi_tab._step(task, max_pages=3))
+        self.assertEqual(task.papers, [])
+
+        task.previous_url = None
+        task.signature = self.multi_tab._signature()
+        self.assertIsNone(self.multi_tab._step(task, max_pages=3))
+        self.assertEqual(task.papers, [])
+
+    def test_empty_after_settle(self):
+        """结果列表没有结果行时等待 settle 秒，仍为空才认为没有结果"""
+        task = self.start("空")
+        self.assertIsNone(self.multi_tab._step(task, max_pages=3))
+        self.clock.advance(4)
+        self.assertIsNone(self.multi_tab._step(task, max_pages=3))
+        self.clock.advance(1)
+        self.assertEqual(self.multi_tab._step(task, max_pages=3), STATUS_EMPTY)
+
+    def test_blocked(self):
+        task = self.start("验证")
+        self.assertEqual(self.multi_tab._step(task, max_pages=3), PAGE_CAPTCHA)
+
+    def test_rate_limit_does_not_block_other_tabs(self):
+        """限速只推迟需要发请求的标签页，轮询线程不休眠，其它标签页照常处理"""
+        for patcher in (
+            patch("office_auto.rate_limit.time", self.clock),
+            patch("office_auto.cnki_crawler_improved.PAGE_REQUESTS", RateLimiter(2)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.crawler.offline = False
+
+        first = self.start("张三")
+        second = _TabTask(
+            self.multi_tab.handles[1], "李四", {"name": "李四"}, Deadline()
+        )
+        self.multi_tab._start(second)
+        self.assertEqual((first.state, second.state), (_LOADING, _STARTING))
+        self.assertEqual(second.ready_at, self.clock.now + 2)
+
+        # 第二个标签页未到预约时刻，不切换也不休眠；第一个标签页照常提取
+        self.assertIsNone(self.multi_tab._step(second, max_pages=3))
+        self.assertIsNone(self.multi_tab._step(first, max_pages=3))
+        self.assertEqual((len(first.papers), first.state), (2, _WAITING))
+        self.assertEqual(self.clock.sleeps, [])
+
+        # 翻页间隔到了，但下一个请求时刻已被第二个标签页占用，排在其后
+        self.clock.advance(1)
+        self.assertIsNone(self.multi_tab._step(first, max_pages=3))
+        self.assertEqual((first.state, first.ready_at), (_PAGING, self.clock.now + 3))
+
+        self.clock.advance(1)
+        self.assertIsNone(self.multi_tab._step(second, max_pages=3))
+        self.assertEqual(second.state, _LOADING)
+        self.assertEqual(self.driver.current_url, self.crawler.build_search_url("李四"))
+
+        self.clock.advance(2)
+        self.assertIsNone(self.multi_tab._step(first, max_pages=3))
+        self.assertEqual((first.page, first.state), (2, _LOADING))
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_search_many(self):
+        self.multi_tab.settle = self.multi_tab.page_delay = 0
+        authors = [(i, {"name": name}) for i, name in enumerate(["张三", "空", "李四"])]
+        results = {
+            key: (len(papers), status)
+            for key, _, papers, status in self.multi_tab.search_many(
+                authors, max_pages=2
+            )
+        }
+        self.assertEqual(
+            results, {0: (4, PAGE_OK), 1: (0, STATUS_EMPTY), 2: (4, PAGE_OK)}
+        )
+
+        self.multi_tab.close_tabs()
+        self.assertEqual(len(self.driver.window_handles), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
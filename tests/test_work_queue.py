@@ -0,0 +1,242 @@
+"""
+分布式任务队列测试
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from office_auto.batch import run_batch
+from office_auto.cli import main
+from office_auto.cnki_crawler_improved import CNKICrawlerImproved
+from office_auto.fake_driver import FakeDriver
+from office_auto.work_queue import (
+    TASK_DONE,
+    TASK_FAILED,
+    TASK_LEASED,
+    TASK_PENDING,
+    LeaseKeeper,
+    MemoryWorkQueue,
+    SQLiteWorkQueue,
+    WorkQueue,
+    open_work_queue,
+)
+from tests.test_page_archive import site
+from tests.test_reextract import ListSink
+
+AUTHORS = [{"name": f"作者{n}", "institution": "测试大学"} for n in range(6)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class WorkQueueTests:
+    """两种后端共用的测试"""
+
+    def make_queue(self, **kwargs):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.queue = self.make_queue(clock=self.clock, max_expirations=2)
+        self.addCleanup(self.queue.close)
+
+    def test_enqueue_is_idempotent(self):
+        self.assertEqual(self.queue.enqueue(AUTHORS[:4]), 4)
+        self.assertEqual(self.queue.enqueue(AUTHORS), 2)
+        self.assertEqual(self.queue.counts()[TASK_PENDING], 6)
+
+    def test_claim_complete(self):
+        """每个作者只被领取一次，完成后不再分配"""
+        self.queue.enqueue(AUTHORS[:2])
+        first = self.queue.claim("a", 60)
+        second = self.queue.claim("b", 60)
+        self.assertIsNone(self.queue.claim("c", 60))
+        self.assertEqual(
+            [first.author_info["name"], second.author_info["name"]], ["作者0", "作者1"]
+        )
+
+        self.assertTrue(self.queue.complete(first, "成功", 3))
+        self.assertTrue(self.queue.release(second, "被拦截"))
+        self.assertEqual(self.queue.claim("c", 60).author_info["name"], "作者1")
+        self.assertEqual(self.queue.counts()[TASK_DONE], 1)
+
+    def test_expired_lease_is_reassigned(self):
+        """持有者崩溃后租约过期，作者交给其它进程；原持有者不能再提交"""
+        self.queue.enqueue(AUTHORS[:1])
+        crashed = self.queue.claim("a", 60)
+        self.assertTrue(self.queue.heartbeat(crashed, 60))
+
+        self.clock.now += 61
+        survivor = self.queue.claim("b", 60)
+        self.assertEqual(survivor.task_id, crashed.task_id)
+        self.assertFalse(self.queue.heartbeat(crashed, 60))
+        self.assertFalse(self.queue.complete(crashed, "成功"))
+        self.assertTrue(self.queue.complete(survivor, "成功"))
+
+    def test_poison_author_fails_then_requeue(self):
+        """租约反复过期的作者不再分配，可手动放回队列"""
+        self.queue.enqueue(AUTHORS[:1])
+        for _ in range(2):
+            self.assertIsNotNone(self.queue.claim("a", 60))
+            self.clock.now += 61
+        self.assertIsNone(self.queue.claim("a", 60))
+        self.assertEqual(self.queue.counts()[TASK_FAILED], 1)
+
+        self.assertEqual(self.queue.requeue(statuses=["被拦截"]), 1)
+        self.assertIsNotNone(self.queue.claim("a", 60))
+
+    def test_requeue_by_status(self):
+        self.queue.enqueue(AUTHORS[:2])
+        self.queue.complete(self.queue.claim("a", 60), "成功")
+        self.queue.complete(self.queue.claim("a", 60), "错误")
+        self.assertEqual(self.queue.requeue(statuses=["错误"]), 1)
+        self.assertEqual(self.queue.claim("a", 60).author_info["name"], "作者1")
+
+
+class TestMemoryWorkQueue(WorkQueueTests, unittest.TestCase):
+    def make_queue(self, **kwargs):
+        return MemoryWorkQueue(**kwargs)
+
+
+class TestSQLiteWorkQueue(WorkQueueTests, unittest.TestCase):
+    def make_queue(self, **kwargs):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "tasks.db")
+        return SQLiteWorkQueue(self.path, **kwargs)
+
+    def test_concurrent_claims_across_connections(self):
+        """多个进程（各自的连接）同时领取，不会重复分配"""
+        authors = [{"name": f"作者{n}", "institution": ""} for n in range(50)]
+        self.queue.enqueue(authors)
+        claimed = []
+        lock = threading.Lock()
+
+        def worker(name):
+            with SQLiteWorkQueue(self.path) as queue:
+                while (lease := queue.claim(name, 60)) is not None:
+                    with lock:
+                        claimed.append(lease.task_id)
+
+        threads = [threading.Thread(target=worker, args=(f"w{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(claimed), list(range(1, 51)))
+
+
+class TestOpenWorkQueue(unittest.TestCase):
+    def test_backends(self):
+        self.assertRaises(TypeError, WorkQueue)
+        with open_work_queue("memory") as queue:
+            self.assertIsInstance(queue, MemoryWorkQueue)
+        with tempfile.TemporaryDirectory() as tmp:
+            with open_work_queue(os.path.join(tmp, "tasks.db")) as queue:
+                self.assertIsInstance(queue, SQLiteWorkQueue)
+
+    @patch("office_auto.batch.create_crawler")
+    def test_cli_memory_queue(self, create_crawler):
+        """--queue memory 使用进程内队列，不创建名为 memory 的文件"""
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=site)
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            self.addCleanup(os.chdir, cwd)
+            with open("authors.csv", "w", encoding="utf-8") as f:
+                f.write("姓名,单位\n张三,测试大学\n")
+            code = main(
+                ["crawl", "-i", "authors.csv", "--queue", "memory", "-o", "out.csv"]
+            )
+            self.assertEqual(code, 0)
+            self.assertFalse(os.path.exists("memory"))
+
+
+class TestLeaseKeeper(unittest.TestCase):
+    def test_heartbeat_keeps_lease(self):
+        queue = MemoryWorkQueue()
+        queue.enqueue(AUTHORS[:1])
+        lease = queue.claim("a", 0.3)
+        keeper = LeaseKeeper(queue, lease_seconds=0.3)
+        keeper.add(lease)
+        time.sleep(0.6)
+        self.assertIsNone(queue.claim("b", 0.3))
+        keeper.close()
+        self.assertEqual(keeper.lost, [])
+
+
+@patch("office_auto.batch.create_crawler")
+class TestQueueBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "tasks.db")
+
+    def test_workers_share_queue(self, create_crawler):
+        """两个工作进程共享一个队列，每个作者只处理一次"""
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=site)
+        )
+        sinks = [ListSink(), ListSink()]
+        results = [None, None]
+
+        def host(n):
+            with SQLiteWorkQueue(self.path) as queue:
+                results[n] = run_batch(
+                    AUTHORS,
+                    sinks[n],
+                    max_pages=3,
+                    author_budget=None,
+                    work_queue=queue,
+                    worker_id=f"host{n}",
+                )
+
+        threads = [threading.Thread(target=host, args=(n,)) for n in range(2)]
+        # 先完成的进程等待另一个进程持有的租约
+        with patch.dict("office_auto.batch.CRAWLER_CONFIG", {"lease_poll": 0.05}):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        names = sorted(name for sink in sinks for name, _ in sink.rows)
+        self.assertEqual(names, sorted(a["name"] for a in AUTHORS))
+        self.assertEqual(sum(len(r) for r in results), len(AUTHORS))
+        with SQLiteWorkQueue(self.path) as queue:
+            self.assertEqual(queue.counts()[TASK_DONE], len(AUTHORS))
+
+    def test_takes_over_crashed_lease(self, create_crawler):
+        """崩溃进程持有的作者在租约过期后由其它进程处理"""
+        create_crawler.side_effect = lambda *args, **kwargs: CNKICrawlerImproved(
+            driver=FakeDriver(loader=site)
+        )
+        with SQLiteWorkQueue(self.path) as queue:
+            queue.enqueue(AUTHORS[:2])
+            queue.claim("crashed", lease_seconds=0.2)
+
+            with patch.dict("office_auto.batch.CRAWLER_CONFIG", {"lease_poll": 0.1}):
+                sink = ListSink()
+                results = run_batch([], sink, max_pages=3, work_queue=queue)
+
+            self.assertEqual([r["author"] for r in results], ["作者0", "作者1"])
+            counts = queue.counts()
+        self.assertEqual((counts[TASK_DONE], counts[TASK_LEASED]), (2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()